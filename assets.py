@@ -0,0 +1,218 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from atlas import IMAGE_EXTENSIONS
+
+# CARREGAMENTO DE ASSETS EM SEGUNDO PLANO
+#
+# O pgzero carrega images/ e sounds/ na primeira vez que cada um é usado, o
+# que dava travadas no primeiro pulo, na primeira batida e no primeiro
+# desenho do menu. O AssetManager lê os diretórios uma vez, confere o que o
+# jogo declarou que usa (require) e avisa de uma vez só o que está faltando;
+# depois decodifica tudo (e faz o convert_alpha das imagens) num pool de
+# threads enquanto a tela de carregamento é desenhada. poll() não bloqueia:
+# diz se terminou e quanto falta. A partir daí image(), sound() e music()
+# são consultas num dicionário, e o que falta devolve None sem tocar no disco.
+#
+# Hot-reload (opcional, watch()): uma thread confere o mtime dos arquivos e
+# manda os que mudaram para o mesmo pool. A versão nova só entra quando
+# swap() é chamado no começo de um quadro; até lá o jogo continua usando a
+# antiga, então nunca aparece um asset pela metade.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOUND_EXTENSIONS = ('.wav', '.ogg', '.oga')
+MUSIC_EXTENSIONS = ('.ogg', '.oga', '.mp3', '.wav')
+
+KINDS = ('images', 'sounds', 'music')
+KIND_NAMES = {'images': 'imagens', 'sounds': 'sons', 'music': 'música'}
+EXTENSIONS = {'images': IMAGE_EXTENSIONS, 'sounds': SOUND_EXTENSIONS, 'music': MUSIC_EXTENSIONS}
+
+WATCH_INTERVAL = 0.5
+
+
+def load_image(path):
+    image = pygame.image.load(path)
+    if pygame.display.get_surface() is not None:
+        image = image.convert_alpha()
+    return image
+
+
+def load_sound(path):
+    return pygame.mixer.Sound(path)
+
+
+# A música é tocada em streaming pelo pygame; basta saber que o arquivo existe
+LOADERS = {'images': load_image, 'sounds': load_sound}
+
+
+def scan(directory, extensions):
+    found = {}
+    try:
+        filenames = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return found
+    for filename in filenames:
+        name, ext = os.path.splitext(filename)
+        if ext.lower() in extensions and name not in found:
+            found[name] = os.path.join(directory, filename)
+    return found
+
+
+class AssetManager:
+    def __init__(self, root=ROOT, workers=None):
+        self.dirs = {kind: os.path.join(root, kind) for kind in KINDS}
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.required = {kind: set() for kind in KINDS}
+        # nome -> caminho, do que existe no disco
+        self.paths = {kind: {} for kind in KINDS}
+        # nome -> asset pronto (a música guarda o caminho)
+        self.assets = {kind: {} for kind in KINDS}
+        self.missing = {kind: set() for kind in KINDS}
+        self.failed = []
+
+        self._executor = None
+        self._pending = []
+        self.total = 0
+        self.loaded = 0
+        self.ready = False
+        # Tempos em segundos, para os benchmarks
+        self.started = None
+        self.load_time = None
+
+        self._mtimes = {}
+        self._reloads = queue.Queue()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def require(self, kind, names):
+        self.required[kind].update(names)
+
+    # Lê os diretórios, avisa o que falta e manda tudo para o pool
+    def start(self):
+        self.started = time.perf_counter()
+        for kind in KINDS:
+            self.paths[kind] = scan(self.dirs[kind], EXTENSIONS[kind])
+            self.missing[kind] = self.required[kind] - self.paths[kind].keys()
+        self.report_missing()
+
+        self.assets['music'] = dict(self.paths['music'])
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='assets')
+        for kind, loader in LOADERS.items():
+            for name, path in self.paths[kind].items():
+                self._mtimes[path] = self._mtime(path)
+                future = self._executor.submit(loader, path)
+                self._pending.append((kind, name, path, future))
+        self.total = len(self._pending)
+        return self
+
+    def report_missing(self):
+        parts = [f"{KIND_NAMES[kind]}: {', '.join(sorted(self.missing[kind]))}"
+                 for kind in KINDS if self.missing[kind]]
+        if parts:
+            print(f"AVISO: Assets não encontrados - {'; '.join(parts)}")
+
+    # Recolhe o que já ficou pronto; True quando tudo terminou
+    def poll(self):
+        if self.ready:
+            return True
+        pending = []
+        for item in self._pending:
+            if item[3].done():
+                self._collect(*item)
+            else:
+                pending.append(item)
+        self._pending = pending
+        if not pending:
+            self._finish()
+        return self.ready
+
+    def wait(self):
+        for item in self._pending:
+            self._collect(*item)
+        self._pending = []
+        self._finish()
+
+    @property
+    def progress(self):
+        return self.loaded / self.total if self.total else 1.0
+
+    def _collect(self, kind, name, path, future):
+        try:
+            self.assets[kind][name] = future.result()
+        except (pygame.error, OSError) as e:
+            self.failed.append(name)
+            print(f"AVISO: {os.path.basename(path)} não pôde ser carregado - {e}")
+        self.loaded += 1
+
+    def _finish(self):
+        if not self.ready:
+            self.ready = True
+            self.load_time = time.perf_counter() - self.started
+
+    def image(self, name):
+        return self.assets['images'].get(name)
+
+    def sound(self, name):
+        return self.assets['sounds'].get(name)
+
+    def music(self, name):
+        return self.assets['music'].get(name)
+
+    # HOT-RELOAD
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def watch(self, interval=WATCH_INTERVAL):
+        if self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name='assets-watch', daemon=True)
+        self._watcher.start()
+
+    def _watch(self, interval):
+        files = [(kind, name, path) for kind in LOADERS for name, path in self.paths[kind].items()]
+        while not self._stop.wait(interval):
+            for kind, name, path in files:
+                mtime = self._mtime(path)
+                if mtime is None or mtime == self._mtimes.get(path):
+                    continue
+                self._mtimes[path] = mtime
+                future = self._executor.submit(LOADERS[kind], path)
+                future.add_done_callback(lambda f, kind=kind, name=name, path=path:
+                                         self._reloads.put((kind, name, path, f)))
+
+    # Troca o que já foi recarregado; devolve [(tipo, nome, asset novo)].
+    # Chamado pelo loop do jogo, entre um quadro e outro
+    def swap(self):
+        swapped = []
+        while True:
+            try:
+                kind, name, path, future = self._reloads.get_nowait()
+            except queue.Empty:
+                return swapped
+            try:
+                asset = future.result()
+            except (pygame.error, OSError) as e:
+                # Arquivo ainda sendo gravado: fica a versão antiga até o próximo mtime
+                print(f"AVISO: {os.path.basename(path)} não pôde ser recarregado - {e}")
+                continue
+            self.assets[kind][name] = asset
+            swapped.append((kind, name, asset))
+
+    def close(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,127 @@
+import os
+
+import pygame
+
+# ATLAS DE TEXTURAS
+#
+# Junta as imagens pequenas de images/ numa única folha e guarda o retângulo
+# de cada quadro. As variantes espelhadas e escaladas de cada quadro são
+# geradas uma vez no carregamento, então o desenho só indexa uma lista de
+# superfícies prontas, sem procurar imagens por nome nem transformar nada
+# a cada quadro. As imagens podem vir já carregadas (pelo AssetManager, em
+# outra thread); replace() troca uma delas no lugar, para o hot-reload.
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'images')
+
+
+class Atlas:
+    def __init__(self, sheet, rects):
+        self.sheet = sheet
+        self.names = list(rects)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.rects = [rects[name] for name in self.names]
+        self.surfaces = [sheet.subsurface(rect) for rect in self.rects]
+        # escala -> [(normal, espelhado), ...] na mesma ordem de self.names
+        self._variants = {}
+        self._missing = set()
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def frame_id(self, name, fallback='slime1'):
+        frame = self.index.get(name)
+        if frame is None:
+            if name not in self._missing:
+                self._missing.add(name)
+                print(f"AVISO: Imagem {name} não encontrada no atlas")
+            frame = self.index.get(fallback, 0)
+        return frame
+
+    def frame_ids(self, names):
+        return [self.frame_id(name) for name in names]
+
+    def variants(self, scale=1.0):
+        table = self._variants.get(scale)
+        if table is None:
+            table = [self._variant(surf, scale) for surf in self.surfaces]
+            self._variants[scale] = table
+        return table
+
+    @staticmethod
+    def _variant(surf, scale):
+        if scale != 1.0:
+            w, h = surf.get_size()
+            surf = pygame.transform.scale(surf, (round(w * scale), round(h * scale)))
+        return (surf, pygame.transform.flip(surf, True, False))
+
+    # Redesenha o quadro na folha e refaz as variantes dele nas mesmas listas,
+    # então quem já guardou variants() ou surface() vê a imagem nova. Só
+    # funciona com o mesmo tamanho (senão a folha teria de ser reempacotada)
+    def replace(self, name, image):
+        frame = self.index.get(name)
+        if frame is None or image.get_size() != self.rects[frame].size:
+            return False
+        rect = self.rects[frame]
+        self.sheet.fill((0, 0, 0, 0), rect)
+        self.sheet.blit(image, rect)
+        for scale, table in self._variants.items():
+            table[frame] = self._variant(self.surfaces[frame], scale)
+        return True
+
+    def surface(self, name, flip_x=False, scale=1.0):
+        return self.variants(scale)[self.frame_id(name)][flip_x]
+
+
+def pack(sizes, sheet_width, padding=1):
+    # Empacotamento em prateleiras: as imagens mais altas primeiro, da esquerda
+    # para a direita, abrindo uma prateleira nova quando a linha enche
+    order = sorted(sizes, key=lambda name: (-sizes[name][1], name))
+    positions = {}
+    x = y = shelf_height = 0
+    for name in order:
+        w, h = sizes[name]
+        if x + w > sheet_width and x > 0:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        positions[name] = (x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+
+def load_images(directory=IMAGES_DIR):
+    images = {}
+    for filename in sorted(os.listdir(directory)):
+        name, ext = os.path.splitext(filename)
+        if ext.lower() not in IMAGE_EXTENSIONS:
+            continue
+        try:
+            images[name] = pygame.image.load(os.path.join(directory, filename))
+        except pygame.error:
+            print(f"AVISO: Imagem {filename} não pôde ser carregada")
+    return images
+
+
+# images: nome -> superfície já carregada; sem ele, lê tudo de directory
+def build_atlas(directory=IMAGES_DIR, max_size=256, sheet_width=512, padding=1, images=None):
+    if images is None:
+        images = load_images(directory)
+    # Fundos de tela cheia ficam fora da folha
+    images = {name: image for name, image in images.items() if max(image.get_size()) <= max_size}
+
+    sizes = {name: image.get_size() for name, image in images.items()}
+    width = max([sheet_width] + [w for w, _ in sizes.values()])
+    positions, height = pack(sizes, width, padding)
+
+    sheet = pygame.Surface((width, max(height, 1)), pygame.SRCALPHA)
+    rects = {}
+    for name in sorted(positions):
+        x, y = positions[name]
+        sheet.blit(images[name], (x, y))
+        rects[name] = pygame.Rect((x, y), sizes[name])
+
+    if pygame.display.get_surface() is not None:
+        sheet = sheet.convert_alpha()
+    return Atlas(sheet, rects)
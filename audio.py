@@ -0,0 +1,147 @@
+import time
+
+import pygame
+
+# MIXER DOS EFEITOS SONOROS
+#
+# O jogo não toca os sons na hora: trigger() só marca o efeito num conjunto, e
+# flush(), uma vez por quadro, toca o que foi marcado. Assim o mesmo efeito
+# pedido várias vezes no quadro (vários ticks de simulação, várias batidas)
+# vira um só, e o update não paga nada além de um set.add por pedido.
+#
+# Cada efeito tem prioridade, uma janela mínima entre dois toques (pedidos
+# dentro dela são juntados ao anterior) e um máximo de vozes simultâneas. O
+# mixer reserva um número fixo de canais do pygame e escolhe o canal de cada
+# toque: um livre, senão o de menor prioridade (o mais antigo, no empate)
+# abaixo da do efeito novo; se nenhum servir, o toque é descartado. Os sons
+# vêm já decodificados do AssetManager.
+
+
+class Effect:
+    __slots__ = ('sound', 'priority', 'window', 'max_voices')
+
+    def __init__(self, sound, priority=1, window=0.05, max_voices=1):
+        self.sound = sound
+        self.priority = priority
+        self.window = window
+        self.max_voices = max_voices
+
+
+# Nome do evento (world.events e botões) -> efeito. O dash toca o som do
+# pulo, como sempre tocou, mas com evento próprio: pulo e dash no mesmo
+# quadro não se fundem num só
+EFFECTS = {
+    'sfx_hurt': Effect('sfx_hurt', priority=3, window=0.1),
+    'sfx_gem': Effect('sfx_gem', priority=3, max_voices=2),
+    'sfx_select': Effect('sfx_select', priority=2),
+    'sfx_jump': Effect('sfx_jump', priority=2, max_voices=2),
+    'sfx_dash': Effect('sfx_jump', priority=2, max_voices=2),
+    'sfx_bump': Effect('sfx_bump', priority=0, window=0.12),
+}
+# Eventos sem entrada na tabela tocam o arquivo de mesmo nome
+DEFAULT_PRIORITY = 1
+
+NUM_CHANNELS = 8
+
+
+def effect_sounds(effects=EFFECTS):
+    return sorted({effect.sound for effect in effects.values()})
+
+
+class SoundMixer:
+    def __init__(self, assets, num_channels=NUM_CHANNELS, effects=EFFECTS):
+        self.assets = assets
+        self.effects = dict(effects)
+        self.pending = set()
+        self.last_played = {}
+
+        # Sem dispositivo de áudio o mixer só descarta os pedidos
+        self.channels = []
+        if pygame.mixer.get_init():
+            if pygame.mixer.get_num_channels() < num_channels:
+                pygame.mixer.set_num_channels(num_channels)
+            pygame.mixer.set_reserved(num_channels)
+            self.channels = [pygame.mixer.Channel(i) for i in range(num_channels)]
+        # Por canal: evento tocando, prioridade e quando começou
+        self.voices = [None] * len(self.channels)
+        self.priorities = [0] * len(self.channels)
+        self.started = [0.0] * len(self.channels)
+
+        # Contadores, para o benchmark
+        self.played = 0
+        self.merged = 0
+        self.restarted = 0
+        self.stolen = 0
+        self.dropped = 0
+
+    def effect(self, name):
+        effect = self.effects.get(name)
+        if effect is None:
+            effect = self.effects[name] = Effect(name, DEFAULT_PRIORITY)
+        return effect
+
+    def trigger(self, name):
+        self.pending.add(name)
+
+    def stop(self):
+        self.pending.clear()
+        for channel in self.channels:
+            channel.stop()
+
+    # Toca o que foi pedido desde o último flush, maior prioridade primeiro
+    def flush(self, now=None):
+        if not self.pending:
+            return
+        if now is None:
+            now = time.perf_counter()
+        requested = sorted(self.pending, key=lambda name: -self.effect(name).priority)
+        self.pending.clear()
+        for name in requested:
+            self.play(name, now)
+
+    def play(self, name, now):
+        effect = self.effect(name)
+        last = self.last_played.get(name)
+        if last is not None and now - last < effect.window:
+            self.merged += 1
+            return
+        sound = self.assets.sound(effect.sound)
+        if sound is None or not self.channels:
+            return
+
+        slot = self.pick_channel(name, effect)
+        if slot is None:
+            self.dropped += 1
+            return
+        if self.channels[slot].get_busy():
+            if self.voices[slot] == name:
+                self.restarted += 1
+            else:
+                self.stolen += 1
+        self.channels[slot].play(sound)
+        self.voices[slot] = name
+        self.priorities[slot] = effect.priority
+        self.started[slot] = now
+        self.last_played[name] = now
+        self.played += 1
+
+    def pick_channel(self, name, effect):
+        free = None
+        same = []
+        victim = None
+        for slot, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                if free is None:
+                    free = slot
+                continue
+            if self.voices[slot] == name:
+                same.append(slot)
+            elif self.priorities[slot] < effect.priority and (
+                    victim is None or (self.priorities[slot], self.started[slot]) <
+                    (self.priorities[victim], self.started[victim])):
+                victim = slot
+
+        # No limite de vozes do efeito, reinicia a mais antiga dele
+        if len(same) >= effect.max_voices:
+            return min(same, key=self.started.__getitem__)
+        return free if free is not None else victim
@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pygame
+
+from assets import AssetManager, scan, SOUND_EXTENSIONS
+from atlas import build_atlas, IMAGE_EXTENSIONS
+
+# BENCHMARK: CARREGAMENTO DE ASSETS
+#
+# Antes: o atlas era montado na importação do main.py (o jogo não desenha
+# nada até terminar) e o fundo do menu e cada som eram carregados pelo pgzero
+# na primeira vez que apareciam, travando aquele quadro. Um som que não
+# existe voltava a procurar no disco a cada play_sfx.
+#
+# Depois: o tempo até o primeiro quadro é só ler os diretórios e mandar tudo
+# para o pool (a tela de carregamento aparece em seguida), e o primeiro uso
+# de cada asset é uma consulta num dicionário.
+
+REPEATS = 5
+
+
+def best_of(func, repeats=REPEATS):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def old_first_uses():
+    from pgzero import loaders
+
+    # Loaders novos, sem nada em cache, como na primeira execução
+    images = loaders.ImageLoader('images')
+    sounds = loaders.SoundLoader('sounds')
+    hitches = {}
+    start = time.perf_counter()
+    images.load('bg_menu')
+    hitches['bg_menu'] = time.perf_counter() - start
+    for name in scan(os.path.join(ROOT, 'sounds'), SOUND_EXTENSIONS):
+        start = time.perf_counter()
+        getattr(sounds, name)
+        hitches[name] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        sounds.sfx_inexistente
+    except AttributeError:
+        pass
+    missing = time.perf_counter() - start
+    return hitches, missing
+
+
+def new_load():
+    manager = AssetManager(ROOT)
+    start = time.perf_counter()
+    manager.start()
+    first_frame = time.perf_counter() - start
+    # Um "quadro" da tela de carregamento por volta
+    while not manager.poll():
+        time.sleep(0.001)
+    total = time.perf_counter() - start
+    atlas_start = time.perf_counter()
+    build_atlas(images=manager.assets['images'])
+    atlas_time = time.perf_counter() - atlas_start
+    manager.close()
+    return manager, first_frame, total, atlas_time
+
+
+def main():
+    from pgzero import loaders
+
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+    loaders.set_root(ROOT)
+
+    print(f"{len(scan(os.path.join(ROOT, 'images'), IMAGE_EXTENSIONS))} imagens, "
+          f"{len(scan(os.path.join(ROOT, 'sounds'), SOUND_EXTENSIONS))} sons (melhor de {REPEATS})")
+
+    startup = best_of(build_atlas)
+    hitches, missing = old_first_uses()
+    print("\nAntes (atlas na importação, resto no primeiro uso)")
+    print(f"  até o primeiro quadro       {startup * 1000:8.1f} ms")
+    worst = max(hitches, key=hitches.get)
+    print(f"  pior primeiro uso           {hitches[worst] * 1000:8.1f} ms ({worst})")
+    print(f"  soma dos primeiros usos     {sum(hitches.values()) * 1000:8.1f} ms")
+    print(f"  som inexistente, por play   {missing * 1e6:8.0f} µs")
+
+    runs = [new_load() for _ in range(REPEATS)]
+    first_frame = min(run[1] for run in runs)
+    total = min(run[2] for run in runs)
+    atlas_time = min(run[3] for run in runs)
+    manager = runs[-1][0]
+
+    names = list(manager.assets['sounds'])
+    start = time.perf_counter()
+    for name in names:
+        manager.sound(name)
+    lookup = (time.perf_counter() - start) / len(names)
+    start = time.perf_counter()
+    manager.sound('sfx_inexistente')
+    missing_lookup = time.perf_counter() - start
+
+    print(f"\nDepois (AssetManager, {manager.workers} thread(s))")
+    print(f"  até o primeiro quadro       {first_frame * 1000:8.1f} ms")
+    print(f"  carregamento em 2º plano    {total * 1000:8.1f} ms (+ {atlas_time * 1000:.1f} ms do atlas)")
+    print(f"  primeiro uso                {lookup * 1e6:8.1f} µs")
+    print(f"  som inexistente, por play   {missing_lookup * 1e6:8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import random
+import sys
+import time
+
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from assets import AssetManager
+from audio import SoundMixer, EFFECTS
+
+# BENCHMARK: EFEITOS SONOROS EM CENAS CHEIAS
+#
+# Cada quadro pede uma rajada de efeitos, como numa tela com muitos inimigos
+# batendo e o jogador pulando (vários ticks de simulação por quadro). Antes
+# cada pedido era um Sound.play() na hora; com o SoundMixer os pedidos do
+# quadro viram um conjunto e o flush escolhe os canais. Mede o tempo gasto no
+# update por quadro e quantos sons chegaram de fato ao mixer do SDL.
+
+FRAMES = 180
+FPS = 60
+# (efeito, pedidos por quadro) em cada cenário
+SCENARIOS = (
+    ('tranquilo', {'sfx_jump': 0.05, 'sfx_bump': 0.05}),
+    ('cheio', {'sfx_jump': 1, 'sfx_bump': 20, 'sfx_gem': 2, 'sfx_dash': 1}),
+    ('lotado', {'sfx_jump': 4, 'sfx_bump': 200, 'sfx_gem': 10, 'sfx_hurt': 1, 'sfx_dash': 4}),
+)
+
+
+def requests(rates, rng):
+    frames = []
+    for _ in range(FRAMES):
+        frame = []
+        for name, rate in rates.items():
+            count = int(rate) + (rng.random() < rate - int(rate))
+            frame.extend([name] * count)
+        rng.shuffle(frame)
+        frames.append(frame)
+    return frames
+
+
+# Roda os quadros no ritmo do jogo (os canais se liberam em tempo real)
+def paced(frames, handle):
+    deadline = time.perf_counter()
+    for frame in frames:
+        handle(frame)
+        deadline += 1 / FPS
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+    pygame.mixer.stop()
+
+
+# Os mesmos quadros em sequência, sem pausa: só o custo das chamadas
+def timed(frames, handle):
+    start = time.perf_counter()
+    for frame in frames:
+        handle(frame)
+    pygame.mixer.stop()
+    return (time.perf_counter() - start) / len(frames)
+
+
+def direct_handler(assets, counts):
+    sounds = {name: assets.sound(effect.sound) for name, effect in EFFECTS.items()}
+
+    # Sound.play() devolve None quando o SDL não tem canal livre
+    def handle(frame):
+        for name in frame:
+            if sounds[name].play() is None:
+                counts[1] += 1
+            else:
+                counts[0] += 1
+    return handle
+
+
+def mixer_handler(mixer):
+    def handle(frame):
+        for name in frame:
+            mixer.trigger(name)
+        mixer.flush()
+    return handle
+
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((100, 100))
+    assets = AssetManager()
+    assets.start()
+    assets.wait()
+
+    print(f"{FRAMES} quadros; tempo no update por quadro, sons tocados e descartados")
+    print(f"{'':12}{'pedidos':>9}{'direto':>10}{'tocados':>9}{'descart.':>10}{'mixer':>10}{'tocados':>9}"
+          f"{'juntados':>10}{'reinic.':>9}{'roubados':>10}{'descart.':>10}")
+    rng = random.Random(0)
+    for name, rates in SCENARIOS:
+        frames = requests(rates, rng)
+        total = sum(len(frame) for frame in frames)
+
+        counts = [0, 0]
+        paced(frames, direct_handler(assets, counts))
+        direct = timed(frames, direct_handler(assets, [0, 0]))
+
+        mixer = SoundMixer(assets)
+        paced(frames, mixer_handler(mixer))
+        pooled = timed(frames, mixer_handler(SoundMixer(assets)))
+        pygame.mixer.set_reserved(0)
+
+        print(f"{name:12}{total:9}{direct * 1e6:8.1f}µs{counts[0]:9}{counts[1]:10}"
+              f"{pooled * 1e6:8.1f}µs{mixer.played:9}{mixer.merged:10}{mixer.restarted:9}"
+              f"{mixer.stolen:10}{mixer.dropped:10}")
+
+if __name__ == "__main__":
+    main()
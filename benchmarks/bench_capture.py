@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pygame
+
+from bench_suite import load_game
+
+# BENCHMARK: CAPTURA DE QUADROS
+#
+# Desenha a fase com o main.py sem janela e mede a captura de cada quadro
+# para o anel de arrays (ver FrameCapture), nos formatos usados por testes
+# visuais (tela inteira em RGB) e por bots (reduzida, RGB ou cinza). Mede a
+# captura sozinha, sobre o mesmo quadro, e junto com o draw(); também confere
+# o resultado contra surfarray.array3d e conta a memória alocada por captura.
+
+FRAMES = 2000
+CONFIGS = (
+    ('800x600 RGB', (800, 600), False),
+    ('160x120 RGB', (160, 120), False),
+    ('84x84 cinza', (84, 84), True),
+)
+
+
+def check(capture, surface):
+    frame = capture.capture(surface).astype(np.int32)
+    size = capture.size
+    if size != surface.get_size():
+        surface = pygame.transform.smoothscale(surface, size) if capture.smooth else \
+            pygame.transform.scale(surface, size)
+    expected = pygame.surfarray.array3d(surface).transpose(1, 0, 2).astype(np.int32)
+    if capture.grayscale:
+        expected = (expected * (77, 150, 29)).sum(axis=2) >> 8
+    return np.array_equal(frame, expected)
+
+
+def allocated_per_capture(capture, surface, count=200):
+    capture.capture(surface)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(count):
+        capture.capture(surface)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def main():
+    mod = load_game()
+    mod.start_game()
+    mod.update(1 / 60)
+    mod.draw()
+    surface = mod.screen.surface
+
+    print(f"{FRAMES} capturas por formato")
+    print(f"{'':14}{'captura/s':>11}{'draw+captura/s':>16}{'bytes/captura':>15}{'confere':>9}")
+    for label, size, grayscale in CONFIGS:
+        capture = mod.capture_frames(size, grayscale=grayscale)
+        ok = check(capture, surface)
+        allocated = allocated_per_capture(capture, surface)
+
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            capture.capture(surface)
+        alone = FRAMES / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            mod.draw()
+        with_draw = FRAMES / (time.perf_counter() - start)
+
+        print(f"{label:14}{alone:11,.0f}{with_draw:16,.0f}{allocated:15.0f}{'sim' if ok else 'NÃO':>9}")
+    mod.stop_capture()
+
+
+if __name__ == "__main__":
+    main()
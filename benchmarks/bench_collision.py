@@ -0,0 +1,145 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pygame import Rect
+
+from collision import SpatialHash
+
+# BENCHMARK: BROADPHASE x FORÇA BRUTA
+#
+# 10k plataformas estáticas e 1k inimigos patrulhando numa fase de
+# 100000 x 4000 px. A força bruta repete o que o update() fazia antes:
+# testar a hitbox do jogador contra cada plataforma e cada inimigo.
+#
+# Só o índice de plataformas ficou no jogo. Os inimigos passaram para o
+# EnemyBatch (bench_enemies.py), sem spatial hash; a linha de inimigos fica
+# aqui como registro da alternativa descartada.
+
+LEVEL_W = 100000
+LEVEL_H = 4000
+NUM_PLATFORMS = 10000
+NUM_ENEMIES = 1000
+TICKS = 200
+
+
+class Body:
+    def __init__(self, rect, vx=0, patrol=0):
+        self.rect = rect
+        self.vx = vx
+        self.limit_left = rect.x - patrol
+        self.limit_right = rect.x + patrol
+
+    def patrol_area(self):
+        return Rect(self.limit_left, self.rect.y,
+                    self.limit_right - self.limit_left + self.rect.width, self.rect.height)
+
+
+def build_level(seed=1):
+    rng = random.Random(seed)
+    platforms = [
+        Body(Rect(rng.randrange(LEVEL_W), rng.randrange(LEVEL_H), rng.choice((50, 100, 150, 200)), 20))
+        for _ in range(NUM_PLATFORMS)
+    ]
+    enemies = [
+        Body(Rect(rng.randrange(LEVEL_W), rng.randrange(LEVEL_H), 52, 52), rng.choice((-2, -1, 1, 2)), 100)
+        for _ in range(NUM_ENEMIES)
+    ]
+    hitboxes = [Rect(rng.randrange(LEVEL_W), rng.randrange(LEVEL_H), 30, 30) for _ in range(TICKS)]
+    return platforms, enemies, hitboxes
+
+
+def move_enemies(enemies):
+    for enemy in enemies:
+        enemy.rect.x += enemy.vx
+        if enemy.rect.x > enemy.limit_right or enemy.rect.x < enemy.limit_left:
+            enemy.vx *= -1
+
+
+def check_collision(hitbox, rect):
+    if not hitbox.colliderect(rect):
+        return False
+    return True
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) / TICKS * 1000, result
+
+
+def brute_platforms(platforms, hitboxes):
+    hits = 0
+    for hitbox in hitboxes:
+        for plat in platforms:
+            if check_collision(hitbox, plat.rect):
+                hits += 1
+    return hits
+
+
+def hash_platforms(platform_index, hitboxes):
+    hits = 0
+    for hitbox in hitboxes:
+        hits += len(platform_index.query(hitbox))
+    return hits
+
+
+def brute_enemies(enemies, hitboxes):
+    hits = 0
+    for hitbox in hitboxes:
+        move_enemies(enemies)
+        for enemy in enemies:
+            if check_collision(hitbox, enemy.rect):
+                hits += 1
+    return hits
+
+
+def hash_patrolling_enemies(enemy_index, enemies, hitboxes):
+    hits = 0
+    for hitbox in hitboxes:
+        move_enemies(enemies)
+        for enemy in enemy_index.query(hitbox):
+            if check_collision(hitbox, enemy.rect):
+                hits += 1
+    return hits
+
+
+def main():
+    platforms, enemies, hitboxes = build_level()
+
+    start = time.perf_counter()
+    platform_index = SpatialHash()
+    for plat in platforms:
+        platform_index.insert(plat, plat.rect)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    brute_plat_ms, brute_plat_hits = timed(brute_platforms, platforms, hitboxes)
+    hash_plat_ms, hash_plat_hits = timed(hash_platforms, platform_index, hitboxes)
+
+    brute_enemy_ms, brute_enemy_hits = timed(brute_enemies, enemies, hitboxes)
+
+    # Cada variante começa do mesmo estado inicial dos inimigos
+    platforms, enemies, hitboxes = build_level()
+    patrol_index = SpatialHash()
+    for enemy in enemies:
+        patrol_index.insert(enemy, enemy.patrol_area())
+    patrol_ms, patrol_hits = timed(hash_patrolling_enemies, patrol_index, enemies, hitboxes)
+
+    if not (brute_plat_hits == hash_plat_hits and brute_enemy_hits == patrol_hits):
+        print("ERRO: força bruta e spatial hash encontraram colisões diferentes")
+        sys.exit(1)
+
+    print(f"{NUM_PLATFORMS} plataformas, {NUM_ENEMIES} inimigos, {TICKS} ticks "
+          f"(índice de plataformas montado em {build_ms:.1f} ms)")
+    print(f"{'':28}{'força bruta':>14}{'spatial hash':>14}")
+    print(f"{'plataformas (consulta)':28}{brute_plat_ms:11.3f} ms{hash_plat_ms:11.3f} ms")
+    print(f"{'inimigos (descartado)':28}{brute_enemy_ms:11.3f} ms{patrol_ms:11.3f} ms")
+    print("(os tempos de inimigos incluem mover os 1k inimigos, igual nos dois lados; no jogo eles usam o")
+    print(" EnemyBatch, medido em bench_enemies.py)")
+
+
+if __name__ == "__main__":
+    main()
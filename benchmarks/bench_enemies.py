@@ -0,0 +1,84 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pygame import Rect
+
+from engine import SlimeEnemy, SPRITE_SIZE, SIM_DT, WIDTH, HEIGHT
+from enemy_batch import EnemyBatch
+
+# BENCHMARK: INIMIGOS UM A UM x LOTE NUMPY
+#
+# Cada passo move e anima todos os inimigos, testa a hitbox do jogador contra
+# eles e sincroniza os objetos Enemy que estão na tela.
+
+NUM_ENEMIES = 10000
+STEPS = 300
+LEVEL_W = 200000
+
+
+def build_enemies(seed=1):
+    rng = random.Random(seed)
+    enemies = []
+    for _ in range(NUM_ENEMIES):
+        x = rng.randrange(LEVEL_W)
+        enemies.append(SlimeEnemy(
+            frames=['slime1', 'slime2'],
+            frame_rate=rng.choice((0.1, 0.25, 0.35)),
+            pos=(x, rng.randrange(HEIGHT)),
+            vx=rng.choice((60, 96, 108)),
+            limit_left=x - 100,
+            limit_right=x + 100
+        ))
+    return enemies
+
+
+def run_scalar(enemies, hitbox):
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        for enemy in enemies:
+            enemy.update(SIM_DT)
+        for enemy in enemies:
+            if enemy.check_collision(hitbox):
+                break
+    return (time.perf_counter() - start) / STEPS * 1000
+
+
+def run_batch(enemies, hitbox, view):
+    batch = EnemyBatch(SPRITE_SIZE)
+    batch.load(enemies)
+
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        batch.store_previous()
+        batch.step(SIM_DT)
+        batch.overlaps(hitbox)
+        batch.sync(enemies, batch.overlapping(view, 64))
+    return (time.perf_counter() - start) / STEPS * 1000, batch
+
+
+def main():
+    hitbox = Rect(400, 300, 30, 30)
+    view = Rect(0, 0, WIDTH, HEIGHT)
+
+    scalar_enemies = build_enemies()
+    scalar_ms = run_scalar(scalar_enemies, hitbox)
+
+    batch_enemies = build_enemies()
+    batch_ms, batch = run_batch(batch_enemies, hitbox, view)
+
+    drift = max(abs(a.x - b) for a, b in zip(scalar_enemies, batch.x.tolist()))
+    if drift > 1e-6:
+        print(f"ERRO: posições divergiram ({drift})")
+        sys.exit(1)
+
+    print(f"{NUM_ENEMIES} inimigos, {STEPS} passos")
+    print(f"Um a um:    {scalar_ms:8.3f} ms/passo")
+    print(f"Lote NumPy: {batch_ms:8.3f} ms/passo ({scalar_ms / batch_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
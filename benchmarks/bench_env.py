@@ -0,0 +1,53 @@
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from engine import SIM_HZ
+from vec_env import VectorEnv, ProcessVectorEnv, NUM_ACTIONS, FRAME_SKIP
+
+# BENCHMARK: AMBIENTES VETORIZADOS
+#
+# Bots aleatórios em N partidas da fase padrão, no processo atual e
+# divididas entre processos (um por núcleo). "x tempo real" compara os ticks
+# simulados por segundo com os SIM_HZ de uma janela rodando o jogo.
+
+STEPS = 300
+
+
+def measure(env, num_envs, rng):
+    actions = rng.integers(0, NUM_ACTIONS, size=(STEPS, num_envs), dtype=np.uint8)
+    env.reset()
+    start = time.perf_counter()
+    for step_actions in actions:
+        env.step(step_actions)
+    return time.perf_counter() - start
+
+
+def main():
+    cores = multiprocessing.cpu_count()
+    rng = np.random.default_rng(0)
+    print(f"{STEPS} passos por partida, {FRAME_SKIP} ticks por passo, {cores} núcleo(s)")
+    print(f"{'':28}{'passos/s':>12}{'ticks/s':>12}{'x tempo real':>14}")
+
+    configs = [('processo atual', n, None) for n in (1, 16, 64)]
+    configs.append((f'{cores} processo(s)', 64, cores))
+    for label, num_envs, workers in configs:
+        if workers is None:
+            env = VectorEnv(num_envs)
+        else:
+            env = ProcessVectorEnv(num_envs, num_workers=workers)
+        with env:
+            elapsed = measure(env, num_envs, rng)
+        steps = STEPS * num_envs / elapsed
+        ticks = steps * FRAME_SKIP
+        name = f"{label}, {num_envs} partidas"
+        print(f"{name:28}{steps:12,.0f}{ticks:12,.0f}{ticks / SIM_HZ:14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
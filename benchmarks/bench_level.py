@@ -0,0 +1,80 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pygame import Rect
+
+from engine import World, Platform, MovingPlatform, SlimeEnemy, SIM_DT, NO_INPUT
+from level import write_level, load_world
+
+# BENCHMARK: FASE GRANDE EM ARQUIVO COM STREAMING
+#
+# Gera uma fase de 400000 x 2048 px, mede quanto tempo load_world() leva
+# para começar e quantas entidades ficam carregadas enquanto o jogador
+# atravessa a fase inteira.
+
+LEVEL_W = 400000
+LEVEL_H = 2048
+NUM_PLATFORMS = 40000
+NUM_MOVING = 2000
+NUM_ENEMIES = 20000
+
+
+def build_big_world(seed=1):
+    rng = random.Random(seed)
+    world = World(LEVEL_W, LEVEL_H, empty=True)
+    for _ in range(NUM_PLATFORMS):
+        world.add_platform(Platform(Rect(rng.randrange(LEVEL_W), rng.randrange(100, LEVEL_H - 50),
+                                         rng.choice((50, 100, 150, 200)), 20), use_sprite=True))
+    for _ in range(NUM_MOVING):
+        x = rng.randrange(200, LEVEL_W - 300)
+        world.add_moving_platform(MovingPlatform(x, rng.randrange(100, LEVEL_H - 50), 50, 20, 90,
+                                                 x - 100, x + 150, use_sprite=True))
+    for _ in range(NUM_ENEMIES):
+        x = rng.randrange(100, LEVEL_W - 100)
+        world.add_enemy(SlimeEnemy(['slime1', 'slime2'], 0.25, (x, rng.randrange(LEVEL_H)), 60, x - 80, x + 80))
+    return world
+
+
+def main():
+    path = os.path.join(tempfile.gettempdir(), 'bench_level.lvl')
+
+    start = time.perf_counter()
+    write_level(path, build_big_world())
+    write_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    world = load_world(path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    most_platforms = most_enemies = 0
+    step_times = []
+    for x in range(50, LEVEL_W, 97):
+        world.player.x = x
+        world.player.y = 60
+        start = time.perf_counter()
+        world.step(NO_INPUT, SIM_DT)
+        step_times.append(time.perf_counter() - start)
+        world.outcome = None
+        most_platforms = max(most_platforms, len(world.platforms_static) + len(world.moving_platforms))
+        most_enemies = max(most_enemies, len(world.enemies))
+
+    step_times.sort()
+    total = NUM_PLATFORMS + NUM_MOVING
+    print(f"Arquivo: {os.path.getsize(path) / 1024:.0f} KiB "
+          f"({total} plataformas, {NUM_ENEMIES} inimigos), gravado em {write_s:.1f} s")
+    print(f"load_world(): {load_ms:.2f} ms")
+    print(f"Máximo carregado ao mesmo tempo: {most_platforms} plataformas, {most_enemies} inimigos")
+    print(f"Passo durante a travessia: mediana {step_times[len(step_times) // 2] * 1000:.3f} ms, "
+          f"pior {step_times[-1] * 1000:.3f} ms (troca de chunk)")
+
+    world.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pygame import Rect
+
+from engine import (World, Input, Player, Platform, MovingPlatform, Enemy, SlimeEnemy, BeeEnemy, SIM_DT,
+                    PLAYER_SPAWN)
+
+# BENCHMARK: MEMÓRIA DAS ENTIDADES E PAUSAS DO GC
+#
+# 1) Bytes por instância de cada entidade com __slots__ e com o __dict__ que
+#    elas tinham antes (mesmos atributos, mesmos valores; só muda o
+#    contêiner, então Rects e tuplas compartilhados não entram na conta).
+# 2) Uma fase "cheia de spawners", em dois padrões: troca contínua (a cada
+#    tick alguns inimigos somem e outros nascem) e ondas (nascem aos poucos
+#    até WAVE_SIZE e somem todos juntos). Compara alocar instâncias novas
+#    (add_enemy/remove_enemy) com o pool (spawn_enemy/despawn_enemy),
+#    contando as coletas do GC e o tempo parado nelas.
+#
+# Na troca contínua o CPython libera cada inimigo na hora (contagem de
+# referências), então o contador do GC não sobe nem sem pool; nas ondas o
+# número de objetos vivos cresce e aí o pool é o que evita as coletas.
+
+INSTANCES = 20000
+TICKS = 3000
+LIVE_ENEMIES = 500
+SPAWNS_PER_TICK = 20
+WAVE_SIZE = 1500
+
+# As fases compartilham as listas de quadros entre inimigos iguais
+FRAMES = ('slime1', 'slime2')
+
+
+def templates():
+    frames = ['slime1', 'slime2']
+    return [
+        (Player, Player(PLAYER_SPAWN)),
+        (Platform, Platform(Rect(0, 0, 100, 20))),
+        (MovingPlatform, MovingPlatform(0, 0, 50, 20, 90, 0, 200)),
+        (Enemy, Enemy(frames, 0.25, (10, 10))),
+        (SlimeEnemy, SlimeEnemy(frames, 0.25, (10, 10), 60, 0, 100)),
+        (BeeEnemy, BeeEnemy(frames, 0.1, (10, 10), 96, 0, 100, 1.2)),
+    ]
+
+
+def slot_names(cls):
+    names = []
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get('__slots__', ()):
+            if name != '__weakref__' and name not in names:
+                names.append(name)
+    return names
+
+
+def bytes_per_instance(make):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = [make() for _ in range(INSTANCES)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Tira a própria lista da conta
+    size = (after - before - sys.getsizeof(objs)) / INSTANCES
+    del objs
+    return size
+
+
+def measure_sizes():
+    print(f"Bytes por instância ({INSTANCES} instâncias, só o objeto e seu contêiner de atributos)")
+    print(f"{'':18}{'__dict__':>10}{'__slots__':>11}")
+    for cls, template in templates():
+        names = slot_names(cls)
+        values = [(name, getattr(template, name)) for name in names]
+
+        # Mesma classe de antes, sem slots: os atributos vão para o __dict__
+        plain_cls = type('Dict' + cls.__name__, (), {})
+
+        def make_plain():
+            obj = plain_cls()
+            for name, value in values:
+                setattr(obj, name, value)
+            return obj
+
+        def make_slotted():
+            obj = cls.__new__(cls)
+            for name, value in values:
+                setattr(obj, name, value)
+            return obj
+
+        print(f"{cls.__name__:18}{bytes_per_instance(make_plain):10.0f}{bytes_per_instance(make_slotted):11.0f}")
+
+
+def spawner_world():
+    world = World(empty=True)
+    world.enemy_batch.overlaps = lambda rect: False
+    return world
+
+
+def enemy_args(n):
+    x = 100 + (n * 37) % 2000
+    return (FRAMES, 0.25, (x, 100 + n % 300), 60, x - 50, x + 50)
+
+
+def spawn(world, pooled, n):
+    if pooled:
+        return world.spawn_enemy(SlimeEnemy, *enemy_args(n))
+    enemy = SlimeEnemy(*enemy_args(n))
+    world.add_enemy(enemy)
+    return enemy
+
+
+def despawn(world, pooled, enemy):
+    if pooled:
+        world.despawn_enemy(enemy)
+    else:
+        world.remove_enemy(enemy)
+
+
+# Troca contínua: LIVE_ENEMIES vivos, SPAWNS_PER_TICK substituídos por tick
+def churn(world, pooled):
+    live = [spawn(world, pooled, n) for n in range(LIVE_ENEMIES)]
+    n = len(live)
+
+    def tick(t):
+        nonlocal n
+        for _ in range(SPAWNS_PER_TICK):
+            i = (t * 7 + n) % len(live)
+            despawn(world, pooled, live[i])
+            live[i] = spawn(world, pooled, n)
+            n += 1
+    return tick
+
+
+# Ondas: SPAWNS_PER_TICK nascem por tick até WAVE_SIZE, depois somem todos
+def waves(world, pooled):
+    live = []
+    n = 0
+
+    def tick(t):
+        nonlocal n
+        if len(live) >= WAVE_SIZE:
+            for enemy in live:
+                despawn(world, pooled, enemy)
+            live.clear()
+        for _ in range(SPAWNS_PER_TICK):
+            live.append(spawn(world, pooled, n))
+            n += 1
+    return tick
+
+
+def run_spawner(pattern, pooled):
+    world = spawner_world()
+    tick_spawns = pattern(world, pooled)
+
+    pauses = []
+    counts = [0, 0, 0]
+    started = [0.0]
+
+    def callback(phase, info):
+        if phase == 'start':
+            started[0] = time.perf_counter()
+        else:
+            pauses.append(time.perf_counter() - started[0])
+            counts[info['generation']] += 1
+
+    inp = Input(right=True)
+    gc.collect()
+    gc.callbacks.append(callback)
+    start = time.perf_counter()
+    try:
+        for t in range(TICKS):
+            tick_spawns(t)
+            world.step(inp, SIM_DT)
+            if world.outcome:
+                world.reset()
+    finally:
+        gc.callbacks.remove(callback)
+    elapsed = time.perf_counter() - start
+    return elapsed, counts, pauses
+
+
+def measure_gc():
+    print(f"\nSpawners ({TICKS} ticks, {SPAWNS_PER_TICK} spawns por tick)")
+    print(f"{'':30}{'tempo':>9}{'gen0':>7}{'gen1':>6}{'gen2':>6}{'pausa total':>13}{'pior pausa':>12}")
+    for pattern, title in ((churn, f"troca ({LIVE_ENEMIES} vivos)"), (waves, f"ondas de {WAVE_SIZE}")):
+        for label, pooled in (('alocando', False), ('pool', True)):
+            elapsed, counts, pauses = run_spawner(pattern, pooled)
+            total = sum(pauses) * 1000
+            worst = max(pauses, default=0) * 1000
+            name = f"{title}, {label}"
+            print(f"{name:30}{elapsed * 1000:7.0f}ms{counts[0]:7}{counts[1]:6}{counts[2]:6}"
+                  f"{total:11.2f}ms{worst:10.3f}ms")
+
+
+def main():
+    measure_sizes()
+    measure_gc()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import multiprocessing
+import os
+import select
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from engine import Input, SIM_DT, SIM_HZ, SIM_MARGIN
+from level import load_world
+from net import NetClient, serve, capture, look, PORT, SNAPSHOT_EVERY, INTERP_TICKS
+
+# BENCHMARK: CORRIDA EM REDE
+#
+# Primeira parte, sem rede: uma partida de robô no World, capturando um
+# snapshot a cada SNAPSHOT_EVERY ticks, e o tamanho de cada um em float64 sem
+# compressão, quantizado completo (zlib, sem base) e em delta contra o
+# anterior, que é o que o servidor manda quando os acks chegam.
+#
+# Segunda parte: servidor num processo separado em 127.0.0.1 e N clientes
+# neste, cada um mandando Input no ritmo da simulação. Mede os bytes
+# recebidos por tick e a latência do Input até o snapshot que o inclui; a
+# latência até a tela soma o atraso da interpolação (INTERP_TICKS).
+
+SECONDS = 4
+CLIENTS = (1, 4)
+
+
+# Corre para a direita pulando e dando dash em ritmos diferentes por robô
+def bot_input(tick, n):
+    jump = (tick + 17 * n) % 50 < 4
+    dash = (tick + 31 * n) % 90 == 0
+    return Input(right=True, jump=jump, dash=dash)
+
+
+def snapshot_sizes(seconds=SECONDS):
+    world = load_world()
+    world.sim_margin = SIM_MARGIN
+    world.reset()
+    raw = []
+    full = []
+    delta = []
+    base = None
+    for tick in range(int(seconds * SIM_HZ)):
+        if world.outcome:
+            world.reset()
+        world.step(bot_input(tick, 0), SIM_DT)
+        if tick % SNAPSHOT_EVERY:
+            continue
+        player = world.player
+        snapshot = capture(world, [(0, player.x, player.y, look(player.current_frame_index, player.flip_x))],
+                           seq=tick + 1, tick=tick)
+        raw.append(sum(values.size * 8 + ids.size * 4 for ids, values in snapshot.sections.values()))
+        full.append(len(snapshot.encode()))
+        if base is not None:
+            delta.append(len(snapshot.encode(base)))
+        base = snapshot
+    world.close()
+    return np.mean(raw), np.mean(full), np.mean(delta)
+
+
+def race(num_clients, port, seconds=SECONDS):
+    server = multiprocessing.Process(target=serve, kwargs={'port': port, 'duration': seconds + 3})
+    server.start()
+    try:
+        world = load_world()
+        level_crc = world.level_crc
+        world.close()
+        clients = []
+        for n in range(num_clients):
+            client = NetClient(('127.0.0.1', port), level_crc)
+            if not client.connect(5.0):
+                raise RuntimeError("servidor não respondeu")
+            clients.append(client)
+
+        ticks = int(seconds * SIM_HZ)
+        deadline = time.perf_counter()
+        for tick in range(ticks):
+            for n, client in enumerate(clients):
+                client.send_input(bot_input(client.tick, n))
+                client.receive()
+                # Morreu ou venceu: recomeça
+                if client.snapshots and client.snapshots[-1].outcome:
+                    client.restart()
+                if tick % 2:
+                    client.sample(2 * SIM_DT)
+            deadline += SIM_DT
+            # Espera o próximo tick recebendo o que chegar, para a latência
+            # não ficar arredondada para um tick
+            sockets = {client.sock: client for client in clients}
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                readable, _, _ = select.select(list(sockets), [], [], remaining)
+                for sock in readable:
+                    sockets[sock].receive()
+
+        time.sleep(0.1)
+        for client in clients:
+            client.receive()
+        received = sum(client.bytes_received for client in clients) / num_clients
+        latencies = np.concatenate([client.latencies for client in clients]) * 1000
+        for client in clients:
+            client.close()
+        return received / ticks, np.percentile(latencies, (50, 95, 99))
+    finally:
+        server.join()
+
+
+def main():
+    raw, full, delta = snapshot_sizes()
+    print(f"Snapshot (um a cada {SNAPSHOT_EVERY} ticks), bytes médios:")
+    print(f"  float64 sem compressão {raw:8.0f}")
+    print(f"  quantizado completo    {full:8.0f}")
+    print(f"  delta                  {delta:8.0f}   ({delta / SNAPSHOT_EVERY:.0f} bytes/tick)")
+
+    interp = INTERP_TICKS * SIM_DT * 1000
+    print(f"\n127.0.0.1, {SECONDS}s a {SIM_HZ} ticks/s; interpolação soma {interp:.1f} ms até a tela")
+    print(f"{'clientes':>9}{'bytes/tick':>12}{'lat. p50':>10}{'p95':>8}{'p99':>8}  (ms, Input -> snapshot)")
+    for port, num_clients in enumerate(CLIENTS, PORT + 10):
+        per_tick, (p50, p95, p99) = race(num_clients, port)
+        print(f"{num_clients:9}{per_tick:12.1f}{p50:10.2f}{p95:8.2f}{p99:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from particles import ParticleSystem, Emitter, CAPACITY
+
+# BENCHMARK: PARTÍCULAS
+#
+# N partículas vivas espalhadas pela tela (vida longa, para o número não cair
+# durante a medição), com o custo por quadro do step() e do draw() na tela de
+# 800x600. Para comparar, o mesmo desenho feito com um blits de superfícies
+# 3x3, que é o que o draw() evita.
+
+SIZES = (1000, 10000, 30000, 60000)
+FRAMES = 60
+BURST = 1000
+
+SPREAD = Emitter(BURST, 0, 180, (0, 350), (1000, 1000), drag=0.5, colors=((255, 255, 255), (255, 120, 0)))
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    view = screen.get_rect()
+    dot = pygame.Surface((3, 3)).convert()
+    dot.fill((255, 200, 0))
+
+    print(f"{'vivas':>8}{'step':>10}{'draw':>10}{'total':>10}{'blits':>10}  (ms/quadro, média de {FRAMES})")
+    for size in SIZES:
+        particles = ParticleSystem(CAPACITY, {'spread': SPREAD})
+        while len(particles) < size:
+            particles.emit('spread', 400, 300)
+        particles.step(1 / 60)
+
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            particles.step(1 / 60)
+        step = (time.perf_counter() - start) / FRAMES
+
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            particles.draw(screen, view)
+        draw = (time.perf_counter() - start) / FRAMES
+
+        n = particles.used
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            positions = zip((particles.x[:n] - view.x).tolist(), (particles.y[:n] - view.y).tolist())
+            screen.blits([(dot, pos) for pos in positions], doreturn=False)
+        blits = (time.perf_counter() - start) / FRAMES
+
+        print(f"{len(particles):8}{step * 1000:10.3f}{draw * 1000:10.3f}{(step + draw) * 1000:10.3f}"
+              f"{blits * 1000:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from pygame import Rect
+
+from engine import GROUND_Y, PLAYER_SPAWN
+from reach import Geometry, build_graph, graph_for
+
+# BENCHMARK: GRAFO DE ALCANCE
+#
+# Fases geradas com N plataformas aleatórias (algumas móveis), com uma
+# plataforma a cada PLATFORM_SPACING px de largura em média, como nas fases
+# de verdade: tempo para montar o grafo do zero, para carregar do cache em
+# disco e para as consultas de caminho que um inimigo perseguidor faria.
+
+SIZES = (1000, 5000, 20000)
+MOVING_FRACTION = 0.1
+QUERIES = 1000
+PLATFORM_SPACING = 25
+SCREEN_WIDTH = 800
+
+
+def random_geometry(num_platforms, rng):
+    width = max(3 * SCREEN_WIDTH, num_platforms * PLATFORM_SPACING)
+    platforms = [(0, width, GROUND_Y, width, 0)]
+    for _ in range(num_platforms):
+        w = rng.choice((50, 100, 150))
+        x = rng.randrange(0, width - w)
+        y = rng.randrange(60, GROUND_Y - 40)
+        if rng.random() < MOVING_FRACTION:
+            platforms.append((x, min(width, x + w + 200), y, w, 1))
+        else:
+            platforms.append((x, x + w, y, w, 0))
+    goal = Rect(width - 100, 150, 40, 40)
+    return Geometry(width, GROUND_Y + 50, PLAYER_SPAWN, goal, platforms)
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'plataformas':>12}{'arestas':>10}{'montar':>10}{'cache':>10}{'caminho':>10}{'alcançáveis':>13}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for size in SIZES:
+            geometry = random_geometry(size, rng)
+
+            start = time.perf_counter()
+            graph = build_graph(geometry)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            graph_for(geometry, cache_dir)
+            start = time.perf_counter()
+            graph_for(geometry, cache_dir)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            pairs = np.random.default_rng(size).integers(0, len(graph), size=(QUERIES, 2)).tolist()
+            start = time.perf_counter()
+            for src, dst in pairs:
+                graph.path(src, dst)
+            path_us = (time.perf_counter() - start) / QUERIES * 1e6
+
+            reachable = int(graph.reachable().sum())
+            print(f"{size:12}{graph.num_edges:10}{build_ms:8.0f}ms{load_ms:8.1f}ms{path_us:8.0f}µs"
+                  f"{reachable:13}")
+
+
+if __name__ == "__main__":
+    main()
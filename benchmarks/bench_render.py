@@ -0,0 +1,56 @@
+import os
+import random
+import sys
+import time
+
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from atlas import build_atlas
+from render import blit_batch
+
+# BENCHMARK: BLIT POR SPRITE x BLITS EM LOTE
+#
+# N sprites do atlas (quadros e espelhamentos variados) em posições
+# aleatórias da tela, desenhados com um blit por sprite, como o draw_world
+# faz, e com uma chamada de blits com a lista já pronta, que é só o trabalho
+# de pixels e serve de piso. A diferença fica em poucos por cento: o custo
+# é dos pixels, não das chamadas. Por isso o draw_world desenha direto, sem
+# fila de desenho; o blit_batch fica só para os tiles de cada plataforma,
+# que já saem numa lista.
+
+SIZES = (100, 500, 2000)
+FRAMES = 200
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    atlas = build_atlas()
+    variants = atlas.variants()
+    rng = random.Random(0)
+
+    print(f"{'sprites':>8}{'um blit':>12}{'só pixels':>12}  (ms/quadro, média de {FRAMES})")
+    for size in SIZES:
+        sprites = [(variants[rng.randrange(len(variants))][rng.randrange(2)],
+                    (rng.uniform(-20, 800), rng.uniform(-20, 600))) for _ in range(size)]
+
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            blit = screen.blit
+            for surf, pos in sprites:
+                blit(surf, pos)
+        direct = (time.perf_counter() - start) / FRAMES
+
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            blit_batch(screen, sprites)
+        floor = (time.perf_counter() - start) / FRAMES
+
+        print(f"{size:8}{direct * 1000:12.3f}{floor * 1000:12.3f}")
+
+
+if __name__ == "__main__":
+    main()
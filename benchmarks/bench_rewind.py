@@ -0,0 +1,105 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from bench_level import build_big_world
+from engine import Input, SIM_DT, SIM_HZ, SIM_MARGIN
+from level import write_level, load_world
+from rewind import RewindBuffer
+
+# BENCHMARK: REWIND
+#
+# Na fase padrão (robô correndo e pulando) e na fase grande do bench_level
+# (400000 px, 20000 inimigos, com streaming; o jogador é levado pela fase
+# inteira), mede o custo do capture() por tick, as palavras de delta por
+# tick e a memória do buffer; depois volta tudo o que foi guardado,
+# conferindo o estado em vários pontos contra snapshots tirados na ida, e
+# compara o restart pelo snapshot com o World.reset().
+
+TICKS = 12 * SIM_HZ
+CHECK_EVERY = 97
+
+
+def run(world, move, ticks=TICKS):
+    rewinder = RewindBuffer(world)
+    # Como o begin_run: o primeiro restart tira o snapshot do começo
+    rewinder.restart()
+    rng = random.Random(0)
+    snapshots = {}
+    capture_times = []
+    words = []
+    for tick in range(ticks):
+        move(world, tick, rng)
+        if world.outcome:
+            world.outcome = None
+        start = time.perf_counter()
+        rewinder.capture()
+        capture_times.append(time.perf_counter() - start)
+        words.append(rewinder.tick_words[(rewinder.last - 1) % rewinder.max_ticks])
+        if tick % CHECK_EVERY == 0:
+            snapshots[tick] = rewinder.snapshot()
+
+    # Volta um tick por vez, como segurando a tecla
+    tick = ticks - 1
+    checked = failed = 0
+    start = time.perf_counter()
+    while rewinder.rewind(1):
+        tick -= 1
+        if tick in snapshots:
+            checked += 1
+            failed += rewinder.snapshot() != snapshots[tick]
+    rewind_time = (time.perf_counter() - start) / max(1, ticks - 1 - tick)
+
+    start = time.perf_counter()
+    world.reset()
+    reset_ms = (time.perf_counter() - start) * 1000
+    # Leva o jogador de volta para longe, para o restart ter o mesmo trabalho
+    for n in range(ticks):
+        move(world, n, rng)
+    start = time.perf_counter()
+    rewinder.restart()
+    restart_ms = (time.perf_counter() - start) * 1000
+
+    capture_times = np.array(capture_times) * 1e6
+    print(f"  registro {rewinder.layout.size * 8} bytes; buffer {rewinder.memory / 1024:.0f} KiB "
+          f"para {rewinder.max_ticks / SIM_HZ:.0f} s")
+    print(f"  capture: mediana {np.median(capture_times):.1f} µs, p99 {np.percentile(capture_times, 99):.1f} µs; "
+          f"delta médio {np.mean(words):.1f} palavras/tick")
+    print(f"  rewind: {rewind_time * 1e6:.1f} µs/tick; estado igual ao da ida em {checked - failed}/{checked} pontos")
+    print(f"  World.reset(): {reset_ms:.2f} ms   restart pelo snapshot: {restart_ms:.2f} ms")
+
+
+def bot(world, tick, rng):
+    world.step(Input(right=rng.random() < 0.8, jump=rng.random() < 0.3, dash=rng.random() < 0.05), SIM_DT)
+
+
+def fly(world, tick, rng):
+    world.player.x = 50 + tick * 40
+    world.player.y = 60
+    world.step(Input(), SIM_DT)
+
+
+def main():
+    print("Fase padrão")
+    world = load_world()
+    world.sim_margin = SIM_MARGIN
+    run(world, bot)
+
+    path = os.path.join(tempfile.gettempdir(), 'bench_rewind.lvl')
+    write_level(path, build_big_world())
+    print("Fase grande (streaming)")
+    world = load_world(path)
+    world.sim_margin = SIM_MARGIN
+    run(world, fly)
+    world.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import types
+
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pygame
+
+# SUÍTE DE BENCHMARKS DO JOGO
+#
+# Roda o main.py de verdade (update e draw do pgzero) com os drivers dummy do
+# SDL, sem janela nem som, e mede cada quadro por partes. Os cenários
+# aumentam o número de plataformas, inimigos e textos na tela. O resultado
+# vai para um JSON; com --baseline cada métrica é comparada com uma execução
+# anterior e as que pioraram além da tolerância são apontadas.
+#
+#   python benchmarks/bench_suite.py                  (roda e compara)
+#   python benchmarks/bench_suite.py --save-baseline  (grava a referência)
+
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+LAST_RUN = os.path.join(ROOT, 'benchmarks', 'last_run.json')
+
+FPS = 60
+FRAMES = 600
+WARMUP = 60
+# Piora maior que isso (relativa e absoluta, na mediana) conta como regressão
+TOLERANCE = 0.25
+MIN_DELTA_MS = 0.02
+
+SCENARIOS = (
+    ('base', 0, 0, 0),
+    ('plataformas_1000', 1000, 0, 0),
+    ('plataformas_10000', 10000, 0, 0),
+    ('inimigos_1000', 0, 1000, 0),
+    ('inimigos_10000', 0, 10000, 0),
+    ('texto_20', 0, 0, 20),
+    ('texto_100', 0, 0, 100),
+)
+
+
+# CARREGAMENTO DO JOGO
+
+
+def load_game():
+    from pgzero import loaders, runner
+    from pgzero.game import PGZeroGame
+    import pgzero.builtins  # noqa: F401 (registra keyboard, screen etc.)
+
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+
+    path = os.path.join(ROOT, 'main.py')
+    mod = types.ModuleType('main')
+    mod.__file__ = path
+    sys.modules['main'] = mod
+    # Faz o pgzrun.go() do fim do main.py voltar sem abrir o loop do jogo
+    sys._pgzrun = True
+    loaders.set_root(ROOT)
+    runner.prepare_mod(mod)
+
+    with open(path, encoding='utf-8') as f:
+        code = compile(f.read(), path, 'exec')
+    exec(code, mod.__dict__)
+
+    PGZeroGame(mod).reinit_screen()
+    # Sem a tela de carregamento: espera os assets e vai direto ao menu
+    mod.finish_loading()
+    mod.music_on = False
+    # Sem gravar replays nem ranking das partidas do benchmark (o begin_run
+    # continua: é ele que recomeça o World a cada partida)
+    mod.end_run = lambda: None
+    mod.record_score = lambda: None
+    return mod
+
+
+class Timings:
+    def __init__(self):
+        self.totals = {}
+        self.samples = {}
+
+    # Troca obj.name por uma versão que soma o tempo gasto no quadro atual
+    def wrap(self, obj, name, label):
+        original = getattr(obj, name)
+        totals = self.totals
+        totals[label] = 0.0
+        self.samples[label] = []
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                totals[label] += clock() - start
+
+        setattr(obj, name, timed)
+        return original
+
+    def end_frame(self, record):
+        for label, total in self.totals.items():
+            if record:
+                self.samples[label].append(total * 1000)
+            self.totals[label] = 0.0
+
+    def summary(self):
+        result = {}
+        for label, samples in self.samples.items():
+            samples = sorted(samples)
+            result[label] = {
+                'mean_ms': round(statistics.fmean(samples), 4),
+                'median_ms': round(statistics.median(samples), 4),
+                'p95_ms': round(samples[int(len(samples) * 0.95) - 1], 4),
+            }
+        return result
+
+
+# CENÁRIOS
+
+
+def populate(mod, num_platforms, num_enemies, rng):
+    from engine import Platform, SlimeEnemy, GROUND_Y
+    from pygame import Rect
+
+    world = mod.world
+    added = []
+    for _ in range(num_platforms):
+        rect = Rect(rng.randrange(0, world.width - 100), rng.randrange(60, GROUND_Y - 40),
+                    rng.choice((50, 100, 150)), 20)
+        platform_obj = Platform(rect, use_sprite=True)
+        world.add_platform(platform_obj)
+        added.append(('platform', platform_obj))
+
+    # Longe do chão e do começo da fase, para o jogador não morrer logo
+    for _ in range(num_enemies):
+        x = rng.randrange(300, world.width - 100)
+        enemy = SlimeEnemy(frames=['slime1', 'slime2'], frame_rate=0.25, pos=(x, rng.randrange(30, 200)),
+                           vx=rng.choice((-60, 60)), limit_left=x - 80, limit_right=x + 80)
+        world.add_enemy(enemy)
+        added.append(('enemy', enemy))
+    return added
+
+
+def depopulate(mod, added):
+    world = mod.world
+    for kind, obj in added:
+        if kind == 'platform':
+            world.remove_platform(obj)
+        else:
+            world.remove_enemy(obj)
+    mod.invalidate_background()
+
+
+def text_overlay(mod, count):
+    draw_hud = mod.draw_hud
+    frame = [0]
+
+    # Rótulos que mudam de vez em quando, como contadores de um HUD maior
+    def draw_hud_with_labels():
+        draw_hud()
+        frame[0] += 1
+        for i in range(count):
+            value = (frame[0] // (10 + i % 20)) % 1000
+            mod.draw_text(f"ITEM {i}: {value}", topleft=(10 + (i % 5) * 150, 140 + (i // 5) * 18),
+                          fontsize=16, color="white", owidth=1, ocolor="black")
+
+    return draw_hud_with_labels
+
+
+def run_scenario(mod, num_platforms, num_enemies, num_texts, frames, seed=1):
+    from pgzero.constants import keys
+    from pgzero.keyboard import keyboard
+
+    rng = random.Random(seed)
+    mod.reset_game()
+    added = populate(mod, num_platforms, num_enemies, rng)
+    mod.invalidate_background()
+    mod.start_game()
+
+    world = mod.world
+    # Player usa __slots__, então o método é trocado na classe
+    player_cls = type(world.player)
+    timings = Timings()
+    originals = [
+        (player_cls, 'apply_physics', timings.wrap(player_cls, 'apply_physics', 'apply_physics')),
+        (world, 'resolve_platform_collisions',
+         timings.wrap(world, 'resolve_platform_collisions', 'colisao_plataformas')),
+        (world, 'update_enemies', timings.wrap(world, 'update_enemies', 'inimigos')),
+        (mod, 'draw_tiles', timings.wrap(mod, 'draw_tiles', 'draw_tiles')),
+    ]
+    if num_texts:
+        originals.append((mod, 'draw_hud', mod.draw_hud))
+        mod.draw_hud = text_overlay(mod, num_texts)
+    originals.append((mod, 'draw_hud', timings.wrap(mod, 'draw_hud', 'hud')))
+    originals.append((mod, 'update', timings.wrap(mod, 'update', 'update')))
+    originals.append((mod, 'draw', timings.wrap(mod, 'draw', 'draw')))
+
+    resets = 0
+    try:
+        for frame in range(WARMUP + frames):
+            # Anda para a direita pulando, para a câmera e o streaming trabalharem
+            keyboard._press(keys.RIGHT)
+            if frame % 40 < 3:
+                keyboard._press(keys.SPACE)
+            else:
+                keyboard._release(keys.SPACE)
+
+            mod.update(1 / FPS)
+            mod.draw()
+            timings.end_frame(frame >= WARMUP)
+
+            if mod.game_state != "playing":
+                mod.reset_game()
+                resets += 1
+    finally:
+        keyboard._release(keys.RIGHT)
+        keyboard._release(keys.SPACE)
+        for obj, name, original in reversed(originals):
+            if obj is world:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, original)
+        depopulate(mod, added)
+
+    result = timings.summary()
+    result['resets'] = resets
+    return result
+
+
+# RESULTADOS
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for scenario, metrics in results['scenarios'].items():
+        old_metrics = baseline.get('scenarios', {}).get(scenario)
+        if old_metrics is None:
+            continue
+        for metric, values in metrics.items():
+            old = old_metrics.get(metric)
+            if not isinstance(values, dict) or old is None:
+                continue
+            new_ms, old_ms = values['median_ms'], old['median_ms']
+            if new_ms > old_ms * (1 + tolerance) and new_ms - old_ms > MIN_DELTA_MS:
+                regressions.append((scenario, metric, old_ms, new_ms))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de update() e draw() sem janela")
+    parser.add_argument('--frames', type=int, default=FRAMES)
+    parser.add_argument('--only', nargs='*', help="nomes dos cenários a rodar")
+    parser.add_argument('--out', default=LAST_RUN)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    mod = load_game()
+
+    results = {
+        'commit': git_commit(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'machine': platform.machine(),
+        'fps': FPS,
+        'frames': args.frames,
+        'scenarios': {},
+    }
+
+    for name, num_platforms, num_enemies, num_texts in SCENARIOS:
+        if args.only and name not in args.only:
+            continue
+        scenario = run_scenario(mod, num_platforms, num_enemies, num_texts, args.frames)
+        results['scenarios'][name] = scenario
+
+        print(f"\n{name} ({scenario['resets']} resets)")
+        print(f"{'':24}{'média':>10}{'mediana':>10}{'p95':>10}  (ms/quadro)")
+        for metric, values in scenario.items():
+            if isinstance(values, dict):
+                print(f"  {metric:22}{values['mean_ms']:10.3f}{values['median_ms']:10.3f}{values['p95_ms']:10.3f}")
+
+    target = args.baseline if args.save_baseline else args.out
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResultados gravados em {target}")
+    if args.save_baseline:
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Sem baseline para comparar (use --save-baseline)")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.tolerance)
+    if not regressions:
+        print(f"Nenhuma regressão em relação a {baseline.get('commit')} (tolerância {args.tolerance:.0%})")
+        return 0
+    print(f"REGRESSÕES em relação a {baseline.get('commit')}:")
+    for scenario, metric, old_ms, new_ms in regressions:
+        print(f"  {scenario}/{metric}: {old_ms:.3f} -> {new_ms:.3f} ms ({new_ms / old_ms - 1:+.0%})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from pgzero import ptext
+
+from render import TextCache, TextWidget
+
+# BENCHMARK: TEXTO DO HUD E DAS TELAS DE SOBREPOSIÇÃO
+#
+# "ptext" é o caminho antigo (screen.draw.text chama ptext.draw a cada quadro,
+# que já tem o cache interno do próprio ptext). "cache" usa TextWidget no HUD
+# e TextCache nos textos fixos.
+
+FRAMES = 3000
+FPS = 60
+
+OUTLINE = dict(owidth=1, ocolor="black")
+
+GAMEOVER_TEXTS = [
+    ("GAME OVER", dict(center=(400, 240), fontsize=60, color="red")),
+    ("Score Final: 1234", dict(center=(400, 300), fontsize=40, color="white")),
+    ("Tempo: 12s", dict(center=(400, 340), fontsize=30, color="white")),
+    ("Press R to Restart", dict(center=(400, 380), fontsize=40, color="red")),
+]
+
+
+def hud_values(frame):
+    timer = frame / FPS
+    cooldown = max(0.0, 0.5 - (frame % 90) / FPS)
+    dash = f"DASH: {cooldown:.1f}s" if cooldown > 0 else "DASH: PRONTO"
+    return f"SCORE: {int(timer * 10)}", f"TIME: {int(timer)}s", dash
+
+
+def hud_ptext(screen):
+    for frame in range(FRAMES):
+        score, timer, dash = hud_values(frame)
+        ptext.draw(score, topleft=(10, 10), fontsize=30, color="white", surf=screen, **OUTLINE)
+        ptext.draw(timer, topleft=(10, 45), fontsize=25, color="white", surf=screen, **OUTLINE)
+        ptext.draw(dash, topleft=(10, 75), fontsize=20, color=(100, 255, 100), surf=screen, **OUTLINE)
+        ptext.draw("PULO DUPLO OK", topleft=(10, 100), fontsize=20, color=(100, 200, 255), surf=screen, **OUTLINE)
+
+
+def hud_cache(screen):
+    cache = TextCache()
+    score_w = TextWidget(cache, fontsize=30, color="white", topleft=(10, 10), **OUTLINE)
+    time_w = TextWidget(cache, fontsize=25, color="white", topleft=(10, 45), **OUTLINE)
+    dash_w = TextWidget(cache, fontsize=20, color=(100, 255, 100), topleft=(10, 75), **OUTLINE)
+    double_w = TextWidget(cache, fontsize=20, color=(100, 200, 255), topleft=(10, 100), **OUTLINE)
+    for frame in range(FRAMES):
+        score, timer, dash = hud_values(frame)
+        score_w.draw(screen, score)
+        time_w.draw(screen, timer)
+        dash_w.draw(screen, dash)
+        double_w.draw(screen, "PULO DUPLO OK")
+
+
+def overlay_ptext(screen):
+    for _ in range(FRAMES):
+        for text, kwargs in GAMEOVER_TEXTS:
+            ptext.draw(text, surf=screen, **kwargs)
+
+
+def overlay_cache(screen):
+    cache = TextCache()
+    for _ in range(FRAMES):
+        for text, kwargs in GAMEOVER_TEXTS:
+            cache.draw(screen, text, **kwargs)
+
+
+def timed(fn, screen):
+    # Começa sempre com o cache do ptext vazio, como na primeira partida
+    ptext._surf_cache.clear()
+    ptext._surf_tick_usage.clear()
+    ptext._surf_size_total = 0
+    start = time.perf_counter()
+    fn(screen)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+
+    rows = [
+        ("HUD (4 textos com contorno)", timed(hud_ptext, screen), timed(hud_cache, screen)),
+        ("tela de game over (4 textos)", timed(overlay_ptext, screen), timed(overlay_cache, screen)),
+    ]
+
+    print(f"{FRAMES} quadros")
+    print(f"{'':32}{'ptext':>12}{'cache':>12}")
+    for name, old_ms, new_ms in rows:
+        print(f"{name:32}{old_ms:9.4f} ms{new_ms:9.4f} ms  ({old_ms / new_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from pygame import Rect
+
+# CÂMERA
+#
+# Segue o jogador numa fase maior que a janela. Tudo que é desenhado no mundo
+# passa por world_to_screen; o HUD continua em coordenadas de tela.
+
+
+class Camera:
+    def __init__(self, view_width, view_height, level_width, level_height):
+        self.rect = Rect(0, 0, view_width, view_height)
+        self.level_width = level_width
+        self.level_height = level_height
+
+    @property
+    def offset(self):
+        return self.rect.topleft
+
+    def set_level_size(self, level_width, level_height):
+        self.level_width = level_width
+        self.level_height = level_height
+        self.clamp()
+
+    def clamp(self):
+        rect = self.rect
+        rect.x = max(0, min(rect.x, self.level_width - rect.width))
+        rect.y = max(0, min(rect.y, self.level_height - rect.height))
+
+    def follow(self, pos):
+        x, y = pos
+        self.rect.center = (int(x), int(y))
+        self.clamp()
+
+    def world_to_screen(self, x, y):
+        return x - self.rect.x, y - self.rect.y
+
+    def screen_to_world(self, x, y):
+        return x + self.rect.x, y + self.rect.y
+
+    def is_visible(self, rect, margin=0):
+        return self.rect.inflate(2 * margin, 2 * margin).colliderect(rect)
@@ -0,0 +1,177 @@
+from pygame import Rect
+
+# BROADPHASE DE COLISÃO
+#
+# Grade uniforme (spatial hash): cada objeto é registrado em todas as células
+# que o seu retângulo toca. Uma consulta só olha as células da área pedida,
+# então o custo depende de quantos objetos existem por perto e não do
+# tamanho da fase.
+
+
+class SpatialHash:
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}
+        # obj -> [rect, faixa de células, ordem de inserção]
+        self.entries = {}
+        self._next_order = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, obj):
+        return obj in self.entries
+
+    def _cell_range(self, rect):
+        size = self.cell_size
+        return (
+            rect.left // size,
+            rect.top // size,
+            (rect.right - 1) // size,
+            (rect.bottom - 1) // size
+        )
+
+    def _add_to_cells(self, obj, cell_range):
+        cells = self.cells
+        x0, y0, x1, y1 = cell_range
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = {obj}
+                else:
+                    bucket.add(obj)
+
+    def _remove_from_cells(self, obj, cell_range):
+        cells = self.cells
+        x0, y0, x1, y1 = cell_range
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells[(cx, cy)]
+                bucket.discard(obj)
+                if not bucket:
+                    del cells[(cx, cy)]
+
+    def insert(self, obj, rect):
+        if obj in self.entries:
+            self.update(obj, rect)
+            return
+
+        rect = Rect(rect)
+        cell_range = self._cell_range(rect)
+        self.entries[obj] = [rect, cell_range, self._next_order]
+        self._next_order += 1
+        self._add_to_cells(obj, cell_range)
+
+    def remove(self, obj):
+        entry = self.entries.pop(obj, None)
+        if entry is not None:
+            self._remove_from_cells(obj, entry[1])
+
+    def update(self, obj, rect):
+        entry = self.entries[obj]
+        stored = entry[0]
+        stored.update(rect)
+
+        # Só mexe nas células se o objeto mudou de célula
+        size = self.cell_size
+        cell_range = (
+            stored.left // size,
+            stored.top // size,
+            (stored.right - 1) // size,
+            (stored.bottom - 1) // size
+        )
+        if cell_range != entry[1]:
+            self._remove_from_cells(obj, entry[1])
+            self._add_to_cells(obj, cell_range)
+            entry[1] = cell_range
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self._next_order = 0
+
+    # Objetos cujo retângulo sobrepõe rect, na ordem em que foram inseridos
+    def query(self, rect):
+        cells = self.cells
+        entries = self.entries
+        x0, y0, x1, y1 = self._cell_range(rect)
+
+        if x0 == x1 and y0 == y1:
+            bucket = cells.get((x0, y0), ())
+            found = [obj for obj in bucket if entries[obj][0].colliderect(rect)]
+        else:
+            seen = set()
+            found = []
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    bucket = cells.get((cx, cy))
+                    if not bucket:
+                        continue
+                    for obj in bucket:
+                        if obj in seen:
+                            continue
+                        seen.add(obj)
+                        if entries[obj][0].colliderect(rect):
+                            found.append(obj)
+
+        if len(found) > 1:
+            found.sort(key=lambda obj: entries[obj][2])
+        return found
+
+
+# COLISÃO CONTÍNUA (SWEPT AABB)
+#
+# Testar só a sobreposição na posição final deixa um objeto rápido atravessar
+# outro quando o deslocamento do passo é maior que a espessura dos dois. Aqui
+# a caixa móvel é varrida ao longo do deslocamento (dx, dy) e o resultado é o
+# instante do primeiro toque (0 a 1, fração do passo) e a normal da face
+# atingida. Caixas são tuplas (left, top, width, height) em float; para um
+# alvo que também se move, passe o deslocamento relativo (o do móvel menos o
+# do alvo) e a caixa do alvo no início do passo.
+
+
+def sweep_aabb(box, dx, dy, target):
+    # Devolve (t, nx, ny) ou None se não houver toque durante o passo. Caixas
+    # que já começam sobrepostas ou só encostam de lado também dão None; a
+    # normal aponta do alvo para a caixa móvel (ny = -1: bateu por cima)
+    left, top, width, height = box
+    t_left, t_top, t_width, t_height = target
+
+    if dx > 0:
+        x_entry = (t_left - (left + width)) / dx
+        x_exit = (t_left + t_width - left) / dx
+    elif dx < 0:
+        x_entry = (t_left + t_width - left) / dx
+        x_exit = (t_left - (left + width)) / dx
+    elif left < t_left + t_width and left + width > t_left:
+        x_entry, x_exit = float('-inf'), float('inf')
+    else:
+        return None
+
+    if dy > 0:
+        y_entry = (t_top - (top + height)) / dy
+        y_exit = (t_top + t_height - top) / dy
+    elif dy < 0:
+        y_entry = (t_top + t_height - top) / dy
+        y_exit = (t_top - (top + height)) / dy
+    elif top < t_top + t_height and top + height > t_top:
+        y_entry, y_exit = float('-inf'), float('inf')
+    else:
+        return None
+
+    entry = max(x_entry, y_entry)
+    if entry < 0 or entry > 1 or entry >= min(x_exit, y_exit):
+        return None
+
+    if x_entry > y_entry:
+        return (entry, -1.0 if dx > 0 else 1.0, 0.0)
+    return (entry, 0.0, -1.0 if dy > 0 else 1.0)
+
+
+# Retângulo que cobre a caixa durante todo o deslocamento, para o broadphase
+def swept_rect(box, dx, dy):
+    left, top, width, height = box
+    x0 = min(left, left + dx)
+    y0 = min(top, top + dy)
+    return Rect(int(x0) - 1, int(y0) - 1, int(width + abs(dx)) + 3, int(height + abs(dy)) + 3)
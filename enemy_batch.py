@@ -0,0 +1,281 @@
+import numpy as np
+from pygame import Rect
+
+from collision import sweep_aabb, swept_rect
+
+# INIMIGOS EM LOTE (NUMPY)
+#
+# Posição, velocidade, limites de patrulha e animação de todos os inimigos
+# ficam em arrays paralelos (um por campo) e são atualizados com operações
+# vetorizadas. Os objetos Enemy do engine viram só um espelho para desenho,
+# sincronizados apenas para os inimigos que aparecem na tela.
+
+FIELDS = (
+    ('x', np.float64, 0.0),
+    ('y', np.float64, 0.0),
+    ('prev_x', np.float64, 0.0),
+    ('prev_y', np.float64, 0.0),
+    ('vx', np.float64, 0.0),
+    ('limit_left', np.float64, -np.inf),
+    ('limit_right', np.float64, np.inf),
+    ('flip_x', np.bool_, False),
+    ('frame_timer', np.float64, 0.0),
+    ('frame_rate', np.float64, 1.0),
+    ('frame_index', np.int32, 0),
+    ('frame_count', np.int32, 1),
+    ('frame_set', np.int32, 0),
+)
+
+
+class EnemyBatch:
+    def __init__(self, sprite_size, capacity=64):
+        self.sprite_size = sprite_size
+        self.count = 0
+        self.capacity = 0
+        # Listas de nomes de quadros; frame_set aponta para uma delas
+        self.frame_sets = []
+        self._frame_set_ids = {}
+        # Teto da velocidade e do deslocamento de um inimigo no último
+        # step(), para o sweep(). A patrulha só inverte o sinal de vx, então
+        # o teto só muda quando entra inimigo (e zera no clear)
+        self.max_speed = 0.0
+        self.max_move = 0.0
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        count = self.count
+        for name, dtype, default in FIELDS:
+            array = np.full(capacity, default, dtype=dtype)
+            if count:
+                array[:count] = getattr(self, '_' + name)[:count]
+            setattr(self, '_' + name, array)
+        self._mask = np.zeros(capacity, dtype=bool)
+        self._mask2 = np.zeros(capacity, dtype=bool)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._scratch = np.zeros(capacity)
+        self.capacity = capacity
+        self._refresh_views()
+
+    # Os atributos públicos (x, vx, ...) são views do tamanho exato do lote
+    def _refresh_views(self):
+        count = self.count
+        for name, _, _ in FIELDS:
+            setattr(self, name, getattr(self, '_' + name)[:count])
+        self.mask = self._mask[:count]
+        self.mask2 = self._mask2[:count]
+        self.active = self._active[:count]
+        self.scratch = self._scratch[:count]
+
+    def __len__(self):
+        return self.count
+
+    def add(self, pos, vx, frames, frame_rate, limit_left=None, limit_right=None):
+        if self.count == self.capacity:
+            self._grow(self.capacity * 2)
+
+        frames = tuple(frames)
+        set_id = self._frame_set_ids.get(frames)
+        if set_id is None:
+            set_id = len(self.frame_sets)
+            self.frame_sets.append(frames)
+            self._frame_set_ids[frames] = set_id
+
+        i = self.count
+        self._x[i], self._y[i] = pos
+        self._prev_x[i], self._prev_y[i] = pos
+        self._vx[i] = vx
+        self.max_speed = max(self.max_speed, abs(vx))
+        self._limit_left[i] = -np.inf if limit_left is None else limit_left
+        self._limit_right[i] = np.inf if limit_right is None else limit_right
+        self._flip_x[i] = False
+        self._frame_timer[i] = 0.0
+        self._frame_rate[i] = frame_rate
+        self._frame_index[i] = 0
+        self._frame_count[i] = len(frames)
+        self._frame_set[i] = set_id
+
+        self.count += 1
+        self._refresh_views()
+        return i
+
+    def clear(self):
+        self.count = 0
+        self.max_speed = 0.0
+        self._refresh_views()
+
+    def append(self, enemy):
+        limit_left = getattr(enemy, 'limit_left', None)
+        limit_right = getattr(enemy, 'limit_right', None)
+        # O Enemy base só anima; quem anda são os que têm limites de patrulha
+        vx = enemy.vx if limit_left is not None else 0.0
+        i = self.add(enemy.pos, vx, enemy.frames, enemy.frame_rate, limit_left, limit_right)
+        self.flip_x[i] = enemy.flip_x
+        self.frame_index[i] = enemy.current_frame_index
+        self.frame_timer[i] = enemy.frame_timer
+        return i
+
+    def load(self, enemies):
+        self.clear()
+        for enemy in enemies:
+            self.append(enemy)
+
+    # Remove trocando com o último, então só o último muda de índice
+    def remove(self, i):
+        last = self.count - 1
+        if i != last:
+            for name, _, _ in FIELDS:
+                array = getattr(self, '_' + name)
+                array[i] = array[last]
+        self.count = last
+        self._refresh_views()
+
+    def store_previous(self):
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+        self.max_move = 0.0
+
+    # active (opcional) limita o passo aos inimigos marcados; os outros ficam
+    # parados onde estão até voltarem para perto da câmera
+    def step(self, dt, active=None):
+        x = self.x
+        vx = self.vx
+        mask = self.mask
+
+        # Animação
+        if active is None:
+            self.frame_timer += dt
+        else:
+            np.add(self.frame_timer, dt, out=self.frame_timer, where=active)
+        np.greater_equal(self.frame_timer, self.frame_rate, out=mask)
+        np.copyto(self.frame_timer, 0.0, where=mask)
+        self.frame_index += mask
+        np.remainder(self.frame_index, self.frame_count, out=self.frame_index)
+
+        # Patrulha com rebote nos limites
+        np.multiply(vx, dt, out=self.scratch)
+        if active is not None:
+            self.scratch *= active
+        x += self.scratch
+        # O rebote nos limites só encurta o passo, então isso é um teto
+        self.max_move = self.max_speed * dt
+
+        np.greater(x, self.limit_right, out=mask)
+        np.copyto(x, self.limit_right, where=mask)
+        np.negative(vx, out=vx, where=mask)
+
+        np.less(x, self.limit_left, out=mask)
+        np.copyto(x, self.limit_left, where=mask)
+        np.negative(vx, out=vx, where=mask)
+
+        np.greater(vx, 0, out=mask)
+        np.copyto(self.flip_x, False, where=mask)
+        np.less(vx, 0, out=mask)
+        np.copyto(self.flip_x, True, where=mask)
+
+    # Mesmo resultado de Rect(x - meia, y - meia, tam, tam).colliderect(rect),
+    # inclusive o truncamento das coordenadas que o Rect faz
+    def _overlap_mask(self, rect, margin=0):
+        half = self.sprite_size / 2
+        size = self.sprite_size
+        mask = self.mask
+        mask2 = self.mask2
+        left = self.scratch
+
+        np.subtract(self.x, half, out=left)
+        np.trunc(left, out=left)
+        np.less(left, rect.right + margin, out=mask)
+        np.greater(left, rect.left - margin - size, out=mask2)
+        mask &= mask2
+
+        np.subtract(self.y, half, out=left)
+        np.trunc(left, out=left)
+        np.less(left, rect.bottom + margin, out=mask2)
+        mask &= mask2
+        np.greater(left, rect.top - margin - size, out=mask2)
+        mask &= mask2
+        return mask
+
+    # Guarda o resultado em self.active, que não é usado como rascunho
+    def active_mask(self, rect, margin=0):
+        np.copyto(self.active, self._overlap_mask(rect, margin))
+        return self.active
+
+    def overlaps(self, rect):
+        if not self.count:
+            return False
+        return bool(self._overlap_mask(rect).any())
+
+    def overlapping(self, rect, margin=0):
+        if not self.count:
+            return np.zeros(0, dtype=np.intp)
+        return np.flatnonzero(self._overlap_mask(rect, margin))
+
+    # Inimigos que podem ter encostado na caixa (left, top, width, height)
+    # enquanto ela andava (dx, dy) no passo, com folga para o quanto eles
+    # mesmos andaram; inclui os que sobrepõem a posição final. Lista de
+    # índices
+    def near_path(self, box, dx, dy):
+        if not self.count:
+            return ()
+        mask = self._overlap_mask(swept_rect(box, dx, dy), int(self.max_move) + 1)
+        # Quase sempre não há ninguém perto; any() é bem mais barato
+        if not mask.any():
+            return ()
+        return np.flatnonzero(mask).tolist()
+
+    def _sweep_one(self, i, box, dx, dy):
+        half = self.sprite_size / 2
+        x = float(self.x[i])
+        y = float(self.y[i])
+        prev_x = float(self.prev_x[i])
+        prev_y = float(self.prev_y[i])
+        return sweep_aabb(box, dx - (x - prev_x), dy - (y - prev_y),
+                          (prev_x - half, prev_y - half, self.sprite_size, self.sprite_size))
+
+    # Primeiro toque da caixa deslocada por (dx, dy) com algum inimigo, cada
+    # um com o próprio deslocamento do passo (x - prev_x). Devolve
+    # (t, nx, ny, índice) ou None
+    def sweep(self, box, dx, dy):
+        first = None
+        for i in self.near_path(box, dx, dy):
+            contact = self._sweep_one(i, box, dx, dy)
+            if contact is not None and (first is None or contact[0] < first[0]):
+                first = contact + (i,)
+        return first
+
+    # overlaps(hitbox) ou sweep() não vazio, com uma passada só pelo lote:
+    # hitbox é a posição final da caixa que saiu de box e andou (dx, dy)
+    def touches(self, hitbox, box, dx, dy):
+        half = self.sprite_size / 2
+        size = self.sprite_size
+        for i in self.near_path(box, dx, dy):
+            if hitbox.colliderect(Rect(int(self.x[i] - half), int(self.y[i] - half), size, size)):
+                return True
+            if self._sweep_one(i, box, dx, dy) is not None:
+                return True
+        return False
+
+    # Copia o estado do lote para os objetos Enemy indicados
+    def sync(self, enemies, indices):
+        if not len(indices):
+            return
+        xs = self.x[indices].tolist()
+        ys = self.y[indices].tolist()
+        prev_xs = self.prev_x[indices].tolist()
+        prev_ys = self.prev_y[indices].tolist()
+        vxs = self.vx[indices].tolist()
+        flips = self.flip_x[indices].tolist()
+        frames = self.frame_index[indices].tolist()
+        timers = self.frame_timer[indices].tolist()
+
+        for n, i in enumerate(indices.tolist()):
+            enemy = enemies[i]
+            enemy.x = xs[n]
+            enemy.y = ys[n]
+            enemy.prev_x = prev_xs[n]
+            enemy.prev_y = prev_ys[n]
+            if hasattr(enemy, 'limit_left'):
+                enemy.vx = vxs[n]
+            enemy.flip_x = flips[n]
+            enemy.current_frame_index = frames[n]
+            enemy.frame_timer = timers[n]
@@ -0,0 +1,824 @@
+import random
+
+from pygame import Rect
+
+from camera import Camera
+from collision import SpatialHash, sweep_aabb, swept_rect
+from enemy_batch import EnemyBatch
+from profiler import Profiler, PHASE_INPUT, PHASE_PHYSICS, PHASE_COLLISION, PHASE_ENEMIES, PHASE_CHECKS
+
+# NÚCLEO DE SIMULAÇÃO (SEM JANELA)
+#
+# Toda a lógica do jogo vive aqui e não depende de keyboard, sounds, music
+# nem screen do pgzero. O main.py só converte o teclado em Input, chama
+# World.step() e desenha o estado resultante.
+
+
+# CONFIGURAÇÕES GLOBAIS
+
+WIDTH = 800
+HEIGHT = 600
+
+C_PLATFORM = (100, 100, 100)
+
+# A simulação roda sempre com passo fixo, independente do FPS da janela
+SIM_HZ = 120
+SIM_DT = 1.0 / SIM_HZ
+# Máximo de passos recuperados num único quadro (evita a "espiral da morte")
+MAX_CATCHUP_STEPS = 8
+
+# Velocidades em px/s e acelerações em px/s² (antes eram px por quadro a 60 FPS)
+GRAVITY = 2880
+JUMP_FORCE = -840
+# O pulo duplo tem 80% da força do primeiro
+DOUBLE_JUMP_FACTOR = 0.8
+SPEED = 300
+# O dash é um deslocamento instantâneo, com recarga em segundos
+DASH_DISTANCE = 15
+DASH_COOLDOWN = 0.5
+BUMP_MIN_VY = 120
+TILE_SIZE = 50
+GROUND_Y = 550
+
+# Todas as imagens de personagens em images/ têm 52x52
+SPRITE_SIZE = 52
+# A colisão do jogador usa uma caixa menor que o sprite
+HITBOX_SIZE = 30
+
+PLAYER_SPAWN = (50, 50)
+# A fase padrão tem três telas de largura; a câmera acompanha o jogador
+LEVEL_WIDTH = 3 * WIDTH
+
+# Quadros do jogador; o estado guarda só o índice
+PLAYER_FRAMES = ('player_idle0', 'player_run0', 'player_jump0', 'player_down0')
+PLAYER_IDLE, PLAYER_RUN, PLAYER_JUMP, PLAYER_DOWN = range(len(PLAYER_FRAMES))
+
+COLLISION_CELL_SIZE = 128
+# A hitbox do jogador é reposicionada durante a resolução das colisões, então
+# a consulta ao broadphase pega também o que está logo ao redor dela
+COLLISION_QUERY_MARGIN = 32
+
+# Área da fase que aparece na tela; só os inimigos dentro dela (mais a margem)
+# têm o objeto Enemy atualizado para o desenho
+VIEW_MARGIN = 64
+# Margem padrão ao redor da tela em que inimigos e plataformas móveis
+# continuam sendo simulados quando World.sim_margin está ligado
+SIM_MARGIN = 400
+
+
+# ENTRADA
+
+
+class Input:
+    __slots__ = ('left', 'right', 'jump', 'dash', 'down', 'pause')
+
+    def __init__(self, left=False, right=False, jump=False, dash=False, down=False, pause=False):
+        self.left = left
+        self.right = right
+        self.jump = jump
+        self.dash = dash
+        self.down = down
+        self.pause = pause
+
+
+NO_INPUT = Input()
+
+
+# PASSO FIXO
+
+
+def lerp(a, b, t):
+    return a + (b - a) * t
+
+
+class FixedTimestep:
+    def __init__(self, step_dt=SIM_DT, max_steps=MAX_CATCHUP_STEPS):
+        self.step_dt = step_dt
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.alpha = 0.0
+
+    def advance(self, dt):
+        # Se a máquina atrasar demais, o excesso é descartado e o jogo
+        # desacelera em vez de tentar recuperar tudo de uma vez
+        self.accumulator = min(self.accumulator + dt, self.max_steps * self.step_dt)
+        steps = int(self.accumulator / self.step_dt)
+        self.accumulator -= steps * self.step_dt
+        self.alpha = self.accumulator / self.step_dt
+        return steps
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.alpha = 0.0
+
+
+# CLASSES
+
+
+# As entidades usam __slots__: sem __dict__ por instância, cada uma ocupa bem
+# menos memória e a leitura dos atributos no passo fica mais barata.
+# Plataformas e inimigos aceitam weakref por causa das views do main.py.
+
+
+class Player:
+    __slots__ = ('spawn', 'x', 'y', 'prev_x', 'prev_y', 'hitbox', 'frames', 'current_frame_index', 'flip_x',
+                 'vy', 'grounded', 'alive', 'can_double_jump', 'dash_cooldown', 'dash_speed', 'jump_pressed')
+
+    def __init__(self, pos):
+        self.spawn = pos
+        self.x, self.y = pos
+        self.prev_x, self.prev_y = pos
+        half = HITBOX_SIZE / 2
+        self.hitbox = Rect(self.x - half, self.y - half, HITBOX_SIZE, HITBOX_SIZE)
+        self.frames = PLAYER_FRAMES
+        self.current_frame_index = PLAYER_IDLE
+        self.flip_x = False
+        self.vy = 0
+        self.grounded = False
+        self.alive = True
+        self.can_double_jump = True
+        self.dash_cooldown = 0
+        self.dash_speed = DASH_DISTANCE
+        self.jump_pressed = False
+
+    @property
+    def pos(self):
+        return (self.x, self.y)
+
+    @property
+    def image(self):
+        return self.frames[self.current_frame_index]
+
+    @property
+    def top(self):
+        return self.y - SPRITE_SIZE / 2
+
+    def store_previous(self):
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def render_pos(self, alpha):
+        return (lerp(self.prev_x, self.x, alpha), lerp(self.prev_y, self.y, alpha))
+
+    def handle_input(self, inp, dt, events, effects):
+        if not self.alive:
+            return
+
+        moving = False
+
+        if inp.left:
+            self.x -= SPEED * dt
+            self.flip_x = True
+            moving = True
+        if inp.right:
+            self.x += SPEED * dt
+            self.flip_x = False
+            moving = True
+
+        if inp.dash and self.dash_cooldown <= 0:
+            dash_direction = -1 if self.flip_x else 1
+            self.x += self.dash_speed * dash_direction
+            self.dash_cooldown = DASH_COOLDOWN
+            events.append('sfx_dash')
+            effects.append(('dash', self.x, self.y, dash_direction))
+
+        if inp.jump and not self.jump_pressed:
+            if self.grounded:
+                events.append('sfx_jump')
+                self.vy = JUMP_FORCE
+                self.grounded = False
+                self.can_double_jump = True
+
+            elif self.can_double_jump:
+                events.append('sfx_jump')
+                self.vy = JUMP_FORCE * DOUBLE_JUMP_FACTOR
+                self.can_double_jump = False
+                effects.append(('double_jump', self.x, self.y + SPRITE_SIZE / 2, 0))
+
+        self.jump_pressed = inp.jump
+
+        if not self.grounded:
+            self.current_frame_index = PLAYER_JUMP
+        elif moving:
+            self.current_frame_index = PLAYER_RUN
+        elif inp.down:
+            self.current_frame_index = PLAYER_DOWN
+        else:
+            self.current_frame_index = PLAYER_IDLE
+
+    def update_cooldowns(self, dt):
+        if self.dash_cooldown > 0:
+            self.dash_cooldown -= dt
+
+    def apply_physics(self, dt, level_width=WIDTH):
+        if not self.alive:
+            return
+
+        self.vy += GRAVITY * dt
+        self.y += self.vy * dt
+        self.hitbox.center = (self.x, self.y)
+
+        half = SPRITE_SIZE / 2
+        if self.x - half < 0:
+            self.x = half
+        if self.x + half > level_width:
+            self.x = level_width - half
+
+    # Hitbox no início do tick, em float, e quanto o jogador andou desde então
+    # (input, dash e gravidade juntos), para a colisão contínua
+    def motion(self):
+        half = HITBOX_SIZE / 2
+        box = (self.prev_x - half, self.prev_y - half, HITBOX_SIZE, HITBOX_SIZE)
+        return box, self.x - self.prev_x, self.y - self.prev_y
+
+    # Fração do passo (0 a 1) em que a hitbox, caindo, encosta no topo da
+    # plataforma; None se não encostar. Pega também o caso em que o passo
+    # foi longo o bastante para a posição final já estar abaixo dela
+    def platform_contact(self, platform_rect, platform_dx=0):
+        if self.vy <= 0:
+            return None
+        box, dx, dy = self.motion()
+        start = (platform_rect.x - platform_dx, platform_rect.y, platform_rect.width, platform_rect.height)
+        contact = sweep_aabb(box, dx - platform_dx, dy, start)
+        # As plataformas só seguram quem vem de cima
+        if contact is None or contact[2] >= 0:
+            return None
+        return contact[0]
+
+    def land(self, platform_rect, events, effects, platform_dx=0):
+        if self.vy > BUMP_MIN_VY:
+            events.append('sfx_bump')
+            # A poeira sai dos pés, com força proporcional à velocidade da queda
+            effects.append(('land', self.x, platform_rect.top, self.vy))
+
+        self.hitbox.center = (self.x, self.y)
+        self.hitbox.bottom = platform_rect.top
+        self.y = self.hitbox.center[1]
+        self.vy = 0
+        self.grounded = True
+
+        if platform_dx:
+            self.x += platform_dx
+            self.hitbox.center = (self.x, self.y)
+
+    # Teste só da posição final: cobre quem já estava dentro da plataforma no
+    # começo do passo (subindo por baixo dela, por exemplo)
+    def check_platform_collision(self, platform_rect, events, effects, is_moving_platform=False, platform_dx=0):
+        if not self.hitbox.colliderect(platform_rect):
+            return False
+
+        if self.vy > 0 and self.hitbox.bottom <= platform_rect.bottom:
+            self.land(platform_rect, events, effects, platform_dx if is_moving_platform else 0)
+            return True
+
+        return False
+
+    def reset(self):
+        self.x, self.y = self.spawn
+        self.store_previous()
+        self.hitbox.center = self.spawn
+        self.vy = 0
+        self.current_frame_index = PLAYER_IDLE
+        self.flip_x = False
+        self.grounded = False
+        self.alive = True
+        self.can_double_jump = True
+        self.dash_cooldown = 0
+        self.jump_pressed = False
+
+
+class Platform:
+    __slots__ = ('rect', 'color', 'use_sprite', 'tile', '__weakref__')
+
+    def __init__(self, rect, color=C_PLATFORM, use_sprite=False, tile='platformbg'):
+        self.rect = rect
+        self.color = color
+        self.use_sprite = use_sprite
+        self.tile = tile
+
+    def render_x(self, alpha):
+        return self.rect.x
+
+
+class MovingPlatform(Platform):
+    __slots__ = ('x', 'prev_x', 'vx', 'limit_left', 'limit_right')
+
+    def __init__(self, x, y, width, height, vx, limit_left, limit_right, use_sprite=False, color=C_PLATFORM,
+                 tile='platformbg'):
+        super().__init__(Rect(x, y, width, height), color, use_sprite, tile)
+        # Rect só guarda inteiros; a posição real fica em x para que
+        # deslocamentos menores que 1px por passo não se percam
+        self.x = x
+        self.prev_x = x
+        self.vx = vx
+        self.limit_left = limit_left
+        self.limit_right = limit_right
+
+    def store_previous(self):
+        self.prev_x = self.x
+
+    def render_x(self, alpha):
+        return lerp(self.prev_x, self.x, alpha)
+
+    def update(self, dt):
+        self.x += self.vx * dt
+        if self.x < self.limit_left:
+            self.x = self.limit_left
+            self.vx *= -1
+        elif self.x + self.rect.width > self.limit_right:
+            self.x = self.limit_right - self.rect.width
+            self.vx *= -1
+        self.rect.x = self.x
+
+    def reset(self):
+        self.x = self.limit_left
+        self.store_previous()
+        self.rect.x = self.x
+        self.vx = abs(self.vx)
+
+
+class Enemy:
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'flip_x', 'scale', 'frames', 'frame_rate', 'current_frame_index',
+                 'frame_timer', 'vx', 'slot', '__weakref__')
+
+    # spawn() recebe os mesmos parâmetros do __init__ e deixa a instância
+    # como nova; é o que o Pool chama ao reaproveitar um inimigo
+    def __init__(self, frames, frame_rate, pos, vx=0):
+        self.spawn(frames, frame_rate, pos, vx)
+
+    def spawn(self, frames, frame_rate, pos, vx=0):
+        # Índice em World.enemies, definido pelo add_enemy (-1 fora do World)
+        self.slot = -1
+        self.x, self.y = pos
+        self.prev_x, self.prev_y = pos
+        self.flip_x = False
+        self.scale = 1.0
+        self.frames = frames
+        self.frame_rate = frame_rate
+        self.current_frame_index = 0
+        self.frame_timer = 0.0
+        self.vx = vx
+
+    @property
+    def pos(self):
+        return (self.x, self.y)
+
+    @property
+    def image(self):
+        return self.frames[self.current_frame_index]
+
+    def store_previous(self):
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def render_pos(self, alpha):
+        return (lerp(self.prev_x, self.x, alpha), lerp(self.prev_y, self.y, alpha))
+
+    @property
+    def rect(self):
+        half = SPRITE_SIZE / 2
+        return Rect(self.x - half, self.y - half, SPRITE_SIZE, SPRITE_SIZE)
+
+    def animate(self, dt):
+        self.frame_timer += dt
+        if self.frame_timer >= self.frame_rate:
+            self.frame_timer = 0.0
+            self.current_frame_index = (self.current_frame_index + 1) % len(self.frames)
+
+    def update(self, dt):
+        self.animate(dt)
+
+    def check_collision(self, player_hitbox):
+        return player_hitbox.colliderect(self.rect)
+
+    def reset(self):
+        self.current_frame_index = 0
+        self.frame_timer = 0.0
+
+
+class SlimeEnemy(Enemy):
+    __slots__ = ('initial_pos', 'limit_left', 'limit_right')
+
+    def __init__(self, frames, frame_rate, pos, vx, limit_left, limit_right):
+        self.spawn(frames, frame_rate, pos, vx, limit_left, limit_right)
+
+    def spawn(self, frames, frame_rate, pos, vx, limit_left, limit_right):
+        super().spawn(frames, frame_rate, pos, vx)
+        self.initial_pos = pos
+        self.limit_left = limit_left
+        self.limit_right = limit_right
+
+    def update(self, dt):
+        super().update(dt)
+
+        self.x += self.vx * dt
+
+        if self.x > self.limit_right:
+            self.x = self.limit_right
+            self.vx *= -1
+        elif self.x < self.limit_left:
+            self.x = self.limit_left
+            self.vx *= -1
+
+        if self.vx > 0:
+            self.flip_x = False
+        elif self.vx < 0:
+            self.flip_x = True
+
+    def reset(self):
+        super().reset()
+        self.x, self.y = self.initial_pos
+        self.store_previous()
+        self.vx = abs(self.vx)
+
+
+class BeeEnemy(SlimeEnemy):
+    __slots__ = ()
+
+    def __init__(self, frames, frame_rate, pos, vx, limit_left, limit_right, scale=1.0):
+        self.spawn(frames, frame_rate, pos, vx, limit_left, limit_right, scale)
+
+    def spawn(self, frames, frame_rate, pos, vx, limit_left, limit_right, scale=1.0):
+        super().spawn(frames, frame_rate, pos, vx, limit_left, limit_right)
+        self.scale = scale
+
+
+# POOL DE OBJETOS
+
+
+class Pool:
+    # Instâncias devolvidas com release() voltam no próximo acquire() via
+    # spawn(), sem alocar de novo. Serve para qualquer classe com spawn()
+    # (inimigos hoje, projéteis quando houver). Acima de max_free as
+    # devolvidas são descartadas, para um pico de spawns não prender memória.
+    def __init__(self, cls, max_free=1024):
+        self.cls = cls
+        self.max_free = max_free
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.spawn(*args)
+            self.reused += 1
+            return obj
+        self.created += 1
+        return self.cls(*args)
+
+    def release(self, obj):
+        if len(self.free) < self.max_free:
+            self.free.append(obj)
+
+
+# MUNDO
+
+
+class World:
+    def __init__(self, width=LEVEL_WIDTH, height=HEIGHT, spawn=PLAYER_SPAWN, empty=False, seed=0):
+        self.width = width
+        self.height = height
+        # Toda aleatoriedade da simulação sai daqui, para os replays baterem
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Identifica a fase nos replays (preenchido pelo level.load_world)
+        self.level_name = ''
+        self.level_crc = 0
+        self.player = Player(spawn)
+        self.goal = Rect(2300, 150, 40, 40)
+        # Onde a porta é desenhada (o goal é só a área de colisão)
+        self.door_pos = (2320, 175)
+
+        self.platforms_static = []
+        self.moving_platforms = []
+        self.enemies = []
+
+        # A câmera segue o jogador a cada tick; view é o próprio retângulo dela.
+        # O main.py ainda move a câmera entre os ticks (posição interpolada),
+        # mas o tick seguinte volta a alinhar, então a simulação não depende
+        # da taxa de quadros
+        self.camera = Camera(WIDTH, HEIGHT, width, height)
+        self.view = self.camera.rect
+        # None simula a fase inteira; com um número, só o que está a essa
+        # distância da view se mexe (o resto fica congelado até voltar)
+        self.sim_margin = None
+        # Áreas onde a geometria estática mudou desde o início do último tick,
+        # para quem guarda o fundo pré-desenhado (main.py)
+        self.static_changes = []
+
+        self.platform_index = SpatialHash(COLLISION_CELL_SIZE)
+        self.enemy_batch = EnemyBatch(SPRITE_SIZE)
+        # Muda a cada inimigo ou plataforma móvel que entra ou sai, para quem
+        # guarda algo por índice (rewind.py)
+        self.entity_version = 0
+        # Um Pool por classe de inimigo, para spawn_enemy/despawn_enemy
+        self.enemy_pools = {}
+        # Carrega e descarrega partes da fase conforme o jogador anda (level.py)
+        self.streamer = None
+        # Desligado por padrão; o main.py liga com F3 ou PROFILE=1
+        self.profiler = Profiler()
+
+        self.score = 0
+        self.game_timer = 0
+        # None enquanto a fase está em andamento, depois "gameover" ou "win"
+        self.outcome = None
+        self.pause_requested = False
+        # Sons disparados no último tick, tocados (ou não) pelo main.py
+        self.events = []
+        # Efeitos visuais do último tick, (nome, x, y, valor), para as
+        # partículas do main.py. Não influenciam a simulação
+        self.effects = []
+
+        if not empty:
+            self.build_default_level()
+
+    def build_default_level(self):
+        for rect in (Rect(200, 450, 200, 20), Rect(500, 350, 200, 20), Rect(150, 250, 150, 20),
+                     Rect(420, 250, 50, 20), Rect(350, 150, 100, 20)):
+            self.add_platform(Platform(rect, use_sprite=True))
+        for rect in (Rect(900, 450, 150, 20), Rect(1100, 350, 150, 20), Rect(1300, 250, 100, 20)):
+            self.add_platform(Platform(rect, use_sprite=True))
+        for rect in (Rect(1700, 450, 200, 20), Rect(1950, 350, 150, 20), Rect(2150, 250, 100, 20),
+                     Rect(2250, 200, 150, 20)):
+            self.add_platform(Platform(rect, use_sprite=True))
+        self.add_platform(Platform(Rect(0, GROUND_Y, self.width, TILE_SIZE), C_PLATFORM, use_sprite=True,
+                                   tile='bg_ground'))
+
+        self.add_moving_platform(MovingPlatform(600, 150, 50, 20, 90, 550, 750, use_sprite=True))
+        self.add_moving_platform(MovingPlatform(1450, 300, 50, 20, 90, 1420, 1620, use_sprite=True))
+
+        self.add_enemy(BeeEnemy(
+            frames=['bee1', 'bee2', 'bee3', 'bee4'],
+            frame_rate=0.1,
+            pos=(500, 290),
+            vx=96,
+            limit_left=500,
+            limit_right=700,
+            scale=1.2
+        ))
+        self.add_enemy(SlimeEnemy(
+            frames=['slime1', 'slime2'],
+            frame_rate=0.25,
+            pos=(400, 130),
+            vx=60,
+            limit_left=360,
+            limit_right=440
+        ))
+        self.add_enemy(SlimeEnemy(
+            frames=['slime_red1', 'slime_red2'],
+            frame_rate=0.35,
+            pos=(WIDTH/2, GROUND_Y - 20),
+            vx=108,
+            limit_left=0,
+            limit_right=WIDTH
+        ))
+
+        self.add_enemy(BeeEnemy(
+            frames=['bee1', 'bee2', 'bee3', 'bee4'],
+            frame_rate=0.1,
+            pos=(1150, 290),
+            vx=96,
+            limit_left=1100,
+            limit_right=1250,
+            scale=1.2
+        ))
+        self.add_enemy(SlimeEnemy(
+            frames=['slime1', 'slime2'],
+            frame_rate=0.25,
+            pos=(1200, GROUND_Y - 20),
+            vx=84,
+            limit_left=900,
+            limit_right=1500
+        ))
+        self.add_enemy(BeeEnemy(
+            frames=['bee1', 'bee2', 'bee3', 'bee4'],
+            frame_rate=0.1,
+            pos=(1800, 390),
+            vx=96,
+            limit_left=1700,
+            limit_right=1900,
+            scale=1.2
+        ))
+        self.add_enemy(SlimeEnemy(
+            frames=['slime_red1', 'slime_red2'],
+            frame_rate=0.35,
+            pos=(2025, 330),
+            vx=60,
+            limit_left=1960,
+            limit_right=2090
+        ))
+
+    # ENTIDADES
+
+    def add_platform(self, platform):
+        self.platforms_static.append(platform)
+        self.platform_index.insert(platform, platform.rect)
+        self.static_changes.append(platform.rect)
+
+    def remove_platform(self, platform):
+        self.platforms_static.remove(platform)
+        self.platform_index.remove(platform)
+        self.static_changes.append(platform.rect)
+
+    def add_moving_platform(self, platform):
+        self.moving_platforms.append(platform)
+        self.platform_index.insert(platform, platform.rect)
+        self.entity_version += 1
+
+    def remove_moving_platform(self, platform):
+        self.moving_platforms.remove(platform)
+        self.platform_index.remove(platform)
+        self.entity_version += 1
+
+    def add_enemy(self, enemy):
+        assert enemy.slot == -1, "inimigo já está no World"
+        enemy.slot = len(self.enemies)
+        self.enemies.append(enemy)
+        self.enemy_batch.append(enemy)
+        self.entity_version += 1
+
+    def remove_enemy(self, enemy):
+        # Remoção por troca com o último, igual ao EnemyBatch.remove. slot = -1
+        # marca que ele saiu, para uma segunda remoção não tirar outro inimigo
+        i = enemy.slot
+        assert i >= 0 and self.enemies[i] is enemy, "inimigo não está no World"
+        last = self.enemies.pop()
+        if last is not enemy:
+            self.enemies[i] = last
+            last.slot = i
+        enemy.slot = -1
+        self.enemy_batch.remove(i)
+        self.entity_version += 1
+
+    # Como add_enemy/remove_enemy, mas reaproveitando instâncias
+    def spawn_enemy(self, cls, *args):
+        pool = self.enemy_pools.get(cls)
+        if pool is None:
+            pool = self.enemy_pools[cls] = Pool(cls)
+        enemy = pool.acquire(*args)
+        self.add_enemy(enemy)
+        return enemy
+
+    def despawn_enemy(self, enemy):
+        self.remove_enemy(enemy)
+        pool = self.enemy_pools.get(type(enemy))
+        if pool is not None:
+            pool.release(enemy)
+
+    def sync_visible_enemies(self):
+        batch = self.enemy_batch
+        batch.sync(self.enemies, batch.overlapping(self.view, VIEW_MARGIN))
+
+    # Libera o que a fase mantém aberto (o arquivo do streamer); chame ao
+    # descartar o World
+    def close(self):
+        if self.streamer is not None:
+            self.streamer.close()
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seed = seed
+        self.rng.seed(self.seed)
+        self.static_changes.clear()
+        self.player.reset()
+        if self.streamer is not None:
+            self.streamer.reset()
+            self.streamer.update(self.player.x, self.player.y)
+
+        for moving in self.moving_platforms:
+            moving.reset()
+            self.platform_index.update(moving, moving.rect)
+        for enemy in self.enemies:
+            enemy.reset()
+        self.enemy_batch.load(self.enemies)
+
+        self.score = 0
+        self.game_timer = 0
+        self.outcome = None
+        self.pause_requested = False
+        self.events.clear()
+        self.effects.clear()
+
+    def resolve_platform_collisions(self):
+        player = self.player
+        events = self.events
+        effects = self.effects
+        player.grounded = False
+
+        margin = COLLISION_QUERY_MARGIN
+        box, dx, dy = player.motion()
+        nearby = swept_rect(box, dx, dy).inflate(2 * margin, 2 * margin)
+        candidates = self.platform_index.query(nearby)
+
+        # Primeiro o topo que a hitbox cruzou mais cedo no passo, para um
+        # dash ou uma queda rápida não atravessar plataformas finas
+        first = None
+        first_t = 2.0
+        first_dx = 0
+        for plat_obj in candidates:
+            platform_dx = plat_obj.x - plat_obj.prev_x if isinstance(plat_obj, MovingPlatform) else 0
+            t = player.platform_contact(plat_obj.rect, platform_dx)
+            if t is not None and t < first_t:
+                first, first_t, first_dx = plat_obj, t, platform_dx
+        if first is not None:
+            player.land(first.rect, events, effects, first_dx)
+            player.can_double_jump = True
+            return
+
+        for plat_obj in candidates:
+            if isinstance(plat_obj, MovingPlatform):
+                landed = player.check_platform_collision(plat_obj.rect, events, effects, is_moving_platform=True,
+                                                         platform_dx=plat_obj.x - plat_obj.prev_x)
+            else:
+                landed = player.check_platform_collision(plat_obj.rect, events, effects)
+            if landed:
+                player.can_double_jump = True
+
+    def update_enemies(self, dt, active_area=None):
+        if active_area is None:
+            self.enemy_batch.step(dt)
+        else:
+            self.enemy_batch.step(dt, self.enemy_batch.active_mask(active_area))
+        self.sync_visible_enemies()
+
+    def step(self, inp, dt):
+        player = self.player
+        events = self.events
+        effects = self.effects
+        profiler = self.profiler
+        events.clear()
+        effects.clear()
+        self.static_changes.clear()
+        self.pause_requested = False
+
+        if self.streamer is not None:
+            self.streamer.update(player.x, player.y)
+        self.camera.follow(player.pos)
+
+        player.store_previous()
+        for moving in self.moving_platforms:
+            moving.store_previous()
+        self.enemy_batch.store_previous()
+
+        self.game_timer += dt
+        self.score = int(self.game_timer * 10)
+
+        if inp.pause:
+            self.pause_requested = True
+            return
+
+        start = profiler.begin()
+        player.handle_input(inp, dt, events, effects)
+        player.update_cooldowns(dt)
+        profiler.end(PHASE_INPUT, start)
+
+        start = profiler.begin()
+        player.apply_physics(dt, self.width)
+
+        if self.sim_margin is None:
+            active_area = None
+        else:
+            active_area = self.view.inflate(2 * self.sim_margin, 2 * self.sim_margin)
+
+        for moving in self.moving_platforms:
+            if active_area is not None and not active_area.colliderect(moving.rect):
+                continue
+            moving.update(dt)
+            self.platform_index.update(moving, moving.rect)
+        profiler.end(PHASE_PHYSICS, start)
+
+        start = profiler.begin()
+        self.resolve_platform_collisions()
+        profiler.end(PHASE_COLLISION, start)
+
+        start = profiler.begin()
+        self.update_enemies(dt, active_area)
+        profiler.end(PHASE_ENEMIES, start)
+
+        start = profiler.begin()
+        death_occurred = False
+        if player.top > self.height:
+            death_occurred = True
+
+        # A posição final e o caminho até ela, para um passo longo não pular
+        # por cima de um inimigo
+        box, dx, dy = player.motion()
+        if self.enemy_batch.touches(player.hitbox, box, dx, dy):
+            death_occurred = True
+            effects.append(('hit', player.x, player.y, 0))
+
+        if death_occurred:
+            self.outcome = "gameover"
+            events.append('sfx_hurt')
+
+        goal = self.goal
+        if player.hitbox.colliderect(goal) or sweep_aabb(box, dx, dy, (goal.x, goal.y, goal.w, goal.h)):
+            self.outcome = "win"
+
+            time_bonus = max(0, int((60 - self.game_timer) * 20))
+            self.score += time_bonus + 1000
+
+            events.append('sfx_gem')
+            effects.append(('win', goal.centerx, goal.centery, 0))
+        profiler.end(PHASE_CHECKS, start)
@@ -0,0 +1,262 @@
+import bisect
+import os
+import queue
+import struct
+import threading
+import time
+
+# RANKING PERSISTENTE
+#
+# Por fase, dois arquivos em scores/:
+#
+#   fase.log   histórico de todas as vitórias, só cresce (append): LOG_HEADER
+#              seguido de um ENTRY por partida
+#   fase.top   o TOP_N atual já ordenado, mais até onde do .log ele cobre
+#
+# Ao abrir, lê o .top e só o pedaço do .log gravado depois dele, nunca o
+# histórico inteiro. O ranking fica em memória; add() só atualiza a lista e
+# põe a partida numa fila, e uma thread grava em lotes (um write por lote no
+# .log) e reescreve o .top a cada COMPACT_EVERY partidas e no close(). Assim
+# chegar no objetivo nunca espera o disco.
+#
+# Um .log só é começado do zero se não existe ou está vazio. Com um cabeçalho
+# que não é o nosso, ele é renomeado para .bad (e um novo começa); se não dá
+# para ler (permissão, por exemplo), o histórico não é gravado nesta sessão.
+# Nunca é truncado no lugar, a não ser um registro cortado no fim.
+
+MAGIC_LOG = b'PGSL'
+MAGIC_TOP = b'PGST'
+VERSION = 1
+
+# magic, versão
+LOG_HEADER = struct.Struct('<4sH')
+# magic, versão, partidas no ranking, bytes do .log já incluídos
+TOP_HEADER = struct.Struct('<4sHHQ')
+# score, tempo de jogo (s), data (unix, s)
+ENTRY = struct.Struct('<idq')
+
+TOP_N = 10
+COMPACT_EVERY = 32
+
+SCORES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scores')
+
+
+# Maior score primeiro; no empate, quem terminou mais rápido, depois quem fez antes
+def rank_key(entry):
+    score, game_time, date = entry
+    return (-score, game_time, date)
+
+
+class Ranking:
+    # As top_n melhores partidas (score, tempo, data), da melhor para a pior
+    def __init__(self, top_n=TOP_N, entries=()):
+        self.top_n = top_n
+        self.entries = []
+        self.keys = []
+        for entry in entries:
+            self.insert(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def copy(self):
+        return Ranking(self.top_n, self.entries)
+
+    # Posição em que a partida entrou (1 = melhor) ou None se ficou de fora
+    def insert(self, entry):
+        key = rank_key(entry)
+        index = bisect.bisect_right(self.keys, key)
+        if index >= self.top_n:
+            return None
+        self.keys.insert(index, key)
+        self.entries.insert(index, entry)
+        del self.keys[self.top_n:], self.entries[self.top_n:]
+        return index + 1
+
+
+class Leaderboard:
+    def __init__(self, name, directory=SCORES_DIR, top_n=TOP_N):
+        base = os.path.join(directory, name)
+        self.log_path = base + '.log'
+        self.top_path = base + '.top'
+        self.ranking = Ranking(top_n)
+        # Tamanho válido do .log e quanto dele o .top já cobre
+        self.log_size = 0
+        self.compacted_size = 0
+        # False quando o .log existe mas não pôde ser lido: nada é gravado
+        self.log_enabled = True
+        self._load()
+
+        # O que já está no .log, só da thread: é o que vai para o .top (o
+        # ranking em memória pode ter partidas que ainda estão na fila)
+        self._saved = self.ranking.copy()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"leaderboard-{name}", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def for_world(cls, world, directory=SCORES_DIR):
+        name = os.path.splitext(world.level_name)[0] or 'padrao'
+        return cls(name, directory)
+
+    def _load(self):
+        try:
+            with open(self.top_path, 'rb') as f:
+                data = f.read()
+            magic, version, count, self.compacted_size = TOP_HEADER.unpack_from(data)
+            if magic != MAGIC_TOP or version != VERSION:
+                raise ValueError("formato desconhecido")
+            for n in range(count):
+                self.ranking.insert(ENTRY.unpack_from(data, TOP_HEADER.size + n * ENTRY.size))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, struct.error) as e:
+            # Sem o .top, o .log inteiro é relido
+            print(f"AVISO: Ranking {self.top_path} ignorado - {e}")
+            self.ranking = Ranking(self.ranking.top_n)
+            self.compacted_size = 0
+
+        try:
+            with open(self.log_path, 'rb') as f:
+                header = f.read(LOG_HEADER.size)
+                end = f.seek(0, os.SEEK_END)
+                valid = len(header) == LOG_HEADER.size and LOG_HEADER.unpack(header) == (MAGIC_LOG, VERSION)
+                if valid:
+                    start = self._log_start(end)
+                    f.seek(start)
+                    tail = f.read()
+        except FileNotFoundError:
+            self.compacted_size = 0
+            return
+        except OSError as e:
+            # Existe mas não dá para ler agora: o histórico fica intacto e
+            # esta sessão não grava nele
+            print(f"AVISO: Histórico {self.log_path} não pôde ser lido; vitórias não serão gravadas - {e}")
+            self.log_enabled = False
+            return
+
+        if not valid:
+            self.compacted_size = 0
+            if end:
+                self._set_aside()
+            return
+
+        # Um registro cortado no fim (o jogo fechou no meio do write) é
+        # descartado; a thread trunca o arquivo antes do próximo append
+        whole = len(tail) - len(tail) % ENTRY.size
+        for entry in ENTRY.iter_unpack(tail[:whole]):
+            self.ranking.insert(entry)
+        self.log_size = start + whole
+
+    # Onde começar a ler o .log: depois do que o .top cobre, se ele bate com
+    # o .log; senão (.top de outro .log ou estragado) o .log é relido inteiro
+    def _log_start(self, end):
+        covered = self.compacted_size
+        if covered and LOG_HEADER.size <= covered <= end and (covered - LOG_HEADER.size) % ENTRY.size == 0:
+            return covered
+        if covered or len(self.ranking):
+            print(f"AVISO: Ranking {self.top_path} não bate com {self.log_path}; relendo o histórico")
+            self.ranking = Ranking(self.ranking.top_n)
+            self.compacted_size = 0
+        return LOG_HEADER.size
+
+    # Tira do caminho um .log com formato desconhecido, sem apagar nada
+    def _set_aside(self):
+        target = self.log_path + '.bad'
+        n = 1
+        while os.path.exists(target):
+            target = f"{self.log_path}.bad{n}"
+            n += 1
+        try:
+            os.rename(self.log_path, target)
+        except OSError as e:
+            print(f"AVISO: Histórico {self.log_path} em formato desconhecido e não pôde ser movido; "
+                  f"vitórias não serão gravadas - {e}")
+            self.log_enabled = False
+            return
+        print(f"AVISO: Histórico {self.log_path} em formato desconhecido; guardado como {target}")
+
+    @property
+    def entries(self):
+        return self.ranking.entries
+
+    def best(self):
+        entries = self.ranking.entries
+        return entries[0][0] if entries else 0
+
+    # Registra uma vitória; devolve a posição no ranking (1 = melhor) ou None
+    def add(self, score, game_time, date=None):
+        entry = (int(score), float(game_time), int(time.time() if date is None else date))
+        rank = self.ranking.insert(entry)
+        self._queue.put(entry)
+        return rank
+
+    # Espera a thread gravar tudo que já foi enviado
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    # THREAD DE GRAVAÇÃO
+
+    def _run(self):
+        pending = 0
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            closing = None in batch
+            entries = [entry for entry in batch if entry is not None]
+            try:
+                if entries and self.log_enabled:
+                    self._append(entries)
+                    pending += len(entries)
+                if pending and (closing or pending >= COMPACT_EVERY):
+                    self._compact()
+                    pending = 0
+            except OSError as e:
+                print(f"AVISO: Ranking não gravado - {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if closing:
+                return
+
+    def _append(self, entries):
+        data = b''.join(ENTRY.pack(*entry) for entry in entries)
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        with open(self.log_path, 'ab') as f:
+            if self.log_size < LOG_HEADER.size:
+                # Só um arquivo novo (ou vazio) ganha o cabeçalho; um que
+                # apareceu com conteúdo desde a abertura não é tocado
+                if f.tell():
+                    self.log_enabled = False
+                    raise OSError(f"{self.log_path} mudou desde a abertura; vitórias não serão gravadas")
+                f.write(LOG_HEADER.pack(MAGIC_LOG, VERSION))
+            elif f.tell() != self.log_size:
+                # Registro cortado no fim, descartado na leitura
+                f.truncate(self.log_size)
+            f.write(data)
+            self.log_size = f.tell()
+        for entry in entries:
+            self._saved.insert(entry)
+
+    def _compact(self):
+        entries = self._saved.entries
+        data = TOP_HEADER.pack(MAGIC_TOP, VERSION, len(entries), self.log_size)
+        data += b''.join(ENTRY.pack(*entry) for entry in entries)
+        # Grava num temporário e troca, para o .top nunca ficar pela metade
+        tmp = self.top_path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, self.top_path)
+        self.compacted_size = self.log_size
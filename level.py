@@ -0,0 +1,364 @@
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from pygame import Rect
+
+from engine import World, Platform, MovingPlatform, Enemy, SlimeEnemy, BeeEnemy
+
+# FORMATO DE FASE EM ARQUIVO
+#
+# Arquivo binário little-endian:
+#
+#   cabeçalho     HEADER
+#   strings       (H tamanho + utf-8) * num_strings
+#   frame sets    (B n + H id_string * n) * num_frame_sets
+#   tabela        (I início, H plataformas, H móveis, H inimigos) por chunk,
+#                 linha a linha (cy, cx)
+#   chunks        registros PLATFORM, MOVING e ENEMY de cada chunk
+#
+# A fase é dividida numa grade de chunks de CHUNK_SIZE px. Cada entidade é
+# gravada em todos os chunks que a sua área (ou a faixa de patrulha) toca, com
+# o mesmo id; o ChunkStreamer conta as referências para criar cada entidade
+# uma vez só. O arquivo é aberto com mmap e só os chunks perto do jogador são
+# lidos, então a memória usada não depende do tamanho da fase.
+
+MAGIC = b'PGLV'
+VERSION = 1
+CHUNK_SIZE = 1024
+
+LEVELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'levels')
+DEFAULT_LEVEL = os.path.join(LEVELS_DIR, 'level1.lvl')
+
+# magic, versão, tamanho do chunk, largura, altura, colunas, linhas,
+# spawn (x, y), goal (x, y, w, h), porta (x, y), strings, frame sets
+HEADER = struct.Struct('<4sHHIIHH2i4i2iHH')
+CHUNK_ENTRY = struct.Struct('<IHHH')
+# id, x, y, w, h, r, g, b, flags, tile
+PLATFORM = struct.Struct('<I4i4BH')
+# id, x, y, w, h, vx, limite esq., limite dir., r, g, b, flags, tile
+MOVING = struct.Struct('<I4if2i4BH')
+# id, tipo, x, y, vx, limite esq., limite dir., frame set, ms por quadro, escala %
+ENEMY = struct.Struct('<IB2if2iHHH')
+
+FLAG_SPRITE = 1
+
+KIND_ENEMY, KIND_SLIME, KIND_BEE = range(3)
+
+
+# ESCRITA
+
+
+def _chunk_span(rect, chunk_size, cols, rows):
+    x0 = min(max(rect.left // chunk_size, 0), cols - 1)
+    y0 = min(max(rect.top // chunk_size, 0), rows - 1)
+    x1 = min(max((rect.right - 1) // chunk_size, 0), cols - 1)
+    y1 = min(max((rect.bottom - 1) // chunk_size, 0), rows - 1)
+    return [(cx, cy) for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1)]
+
+
+def _enemy_area(enemy, sprite_size=52):
+    half = sprite_size // 2
+    left = getattr(enemy, 'limit_left', enemy.x)
+    right = getattr(enemy, 'limit_right', enemy.x)
+    return Rect(left - half, enemy.y - half, right - left + sprite_size, sprite_size)
+
+
+def write_level(path, world, chunk_size=CHUNK_SIZE):
+    cols = max(1, -(-world.width // chunk_size))
+    rows = max(1, -(-world.height // chunk_size))
+
+    strings = []
+    string_ids = {}
+
+    def string_id(text):
+        if text not in string_ids:
+            string_ids[text] = len(strings)
+            strings.append(text)
+        return string_ids[text]
+
+    frame_sets = []
+    frame_set_ids = {}
+
+    def frame_set_id(frames):
+        frames = tuple(frames)
+        if frames not in frame_set_ids:
+            frame_set_ids[frames] = len(frame_sets)
+            frame_sets.append([string_id(name) for name in frames])
+        return frame_set_ids[frames]
+
+    chunks = {(cx, cy): ([], [], []) for cy in range(rows) for cx in range(cols)}
+    next_id = 0
+
+    for platform in world.platforms_static:
+        r, g, b = platform.color[:3]
+        record = PLATFORM.pack(next_id, *platform.rect, r, g, b, FLAG_SPRITE if platform.use_sprite else 0,
+                               string_id(platform.tile))
+        for key in _chunk_span(platform.rect, chunk_size, cols, rows):
+            chunks[key][0].append(record)
+        next_id += 1
+
+    for moving in world.moving_platforms:
+        r, g, b = moving.color[:3]
+        rect = moving.rect
+        record = MOVING.pack(next_id, rect.x, rect.y, rect.width, rect.height, moving.vx,
+                             moving.limit_left, moving.limit_right, r, g, b,
+                             FLAG_SPRITE if moving.use_sprite else 0, string_id(moving.tile))
+        area = Rect(moving.limit_left, rect.y, moving.limit_right - moving.limit_left, rect.height)
+        for key in _chunk_span(area, chunk_size, cols, rows):
+            chunks[key][1].append(record)
+        next_id += 1
+
+    for enemy in world.enemies:
+        if isinstance(enemy, BeeEnemy):
+            kind = KIND_BEE
+        elif isinstance(enemy, SlimeEnemy):
+            kind = KIND_SLIME
+        else:
+            kind = KIND_ENEMY
+        x, y = getattr(enemy, 'initial_pos', enemy.pos)
+        record = ENEMY.pack(next_id, kind, int(x), int(y), enemy.vx,
+                            int(getattr(enemy, 'limit_left', 0)), int(getattr(enemy, 'limit_right', 0)),
+                            frame_set_id(enemy.frames), round(enemy.frame_rate * 1000), round(enemy.scale * 100))
+        for key in _chunk_span(_enemy_area(enemy), chunk_size, cols, rows):
+            chunks[key][2].append(record)
+        next_id += 1
+
+    blob = bytearray()
+    for text in strings:
+        data = text.encode('utf-8')
+        blob += struct.pack('<H', len(data)) + data
+    for frame_set in frame_sets:
+        blob += struct.pack(f'<B{len(frame_set)}H', len(frame_set), *frame_set)
+
+    table_start = HEADER.size + len(blob)
+    offset = table_start + CHUNK_ENTRY.size * cols * rows
+    table = bytearray()
+    payload = bytearray()
+    for cy in range(rows):
+        for cx in range(cols):
+            platforms, movings, enemies = chunks[(cx, cy)]
+            table += CHUNK_ENTRY.pack(offset + len(payload), len(platforms), len(movings), len(enemies))
+            for record in platforms + movings + enemies:
+                payload += record
+
+    header = HEADER.pack(MAGIC, VERSION, chunk_size, world.width, world.height, cols, rows,
+                         int(world.player.spawn[0]), int(world.player.spawn[1]), *world.goal,
+                         int(world.door_pos[0]), int(world.door_pos[1]), len(strings), len(frame_sets))
+
+    with open(path, 'wb') as f:
+        f.write(header + blob + table + payload)
+
+
+# LEITURA
+
+
+class LevelFile:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self.chunk_size, self.width, self.height, self.cols, self.rows,
+         spawn_x, spawn_y, gx, gy, gw, gh, door_x, door_y, num_strings, num_frame_sets) = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} não é uma fase válida")
+
+        self.spawn = (spawn_x, spawn_y)
+        self.goal = Rect(gx, gy, gw, gh)
+        self.door_pos = (door_x, door_y)
+
+        offset = HEADER.size
+        self.strings = []
+        for _ in range(num_strings):
+            size, = struct.unpack_from('<H', self.data, offset)
+            offset += 2
+            self.strings.append(self.data[offset:offset + size].decode('utf-8'))
+            offset += size
+
+        self.frame_sets = []
+        for _ in range(num_frame_sets):
+            n, = struct.unpack_from('<B', self.data, offset)
+            ids = struct.unpack_from(f'<{n}H', self.data, offset + 1)
+            self.frame_sets.append([self.strings[i] for i in ids])
+            offset += 1 + 2 * n
+
+        self.table_offset = offset
+
+    def close(self):
+        self.data.close()
+        self._file.close()
+
+    def chunk_at(self, x, y):
+        return int(x // self.chunk_size), int(y // self.chunk_size)
+
+    def has_chunk(self, cx, cy):
+        return 0 <= cx < self.cols and 0 <= cy < self.rows
+
+    # Registros (tipo, campos) do chunk, sem criar nenhum objeto ainda
+    def read_chunk(self, cx, cy):
+        data = self.data
+        entry = self.table_offset + CHUNK_ENTRY.size * (cy * self.cols + cx)
+        offset, num_platforms, num_moving, num_enemies = CHUNK_ENTRY.unpack_from(data, entry)
+
+        records = []
+        for _ in range(num_platforms):
+            records.append(('platform', PLATFORM.unpack_from(data, offset)))
+            offset += PLATFORM.size
+        for _ in range(num_moving):
+            records.append(('moving', MOVING.unpack_from(data, offset)))
+            offset += MOVING.size
+        for _ in range(num_enemies):
+            records.append(('enemy', ENEMY.unpack_from(data, offset)))
+            offset += ENEMY.size
+        return records
+
+    # Todos os registros da fase, cada entidade uma vez (na ordem dos chunks)
+    def all_records(self):
+        seen = set()
+        for cy in range(self.rows):
+            for cx in range(self.cols):
+                for kind, record in self.read_chunk(cx, cy):
+                    if record[0] not in seen:
+                        seen.add(record[0])
+                        yield kind, record
+
+    def build(self, kind, record):
+        if kind == 'platform':
+            _, x, y, w, h, r, g, b, flags, tile = record
+            return Platform(Rect(x, y, w, h), (r, g, b), bool(flags & FLAG_SPRITE), self.strings[tile])
+
+        if kind == 'moving':
+            _, x, y, w, h, vx, left, right, r, g, b, flags, tile = record
+            return MovingPlatform(x, y, w, h, vx, left, right, bool(flags & FLAG_SPRITE), (r, g, b),
+                                  self.strings[tile])
+
+        cls, args = self.enemy_args(record)
+        return cls(*args)
+
+    # Classe e argumentos do inimigo, para o streamer criar pelo pool do World
+    def enemy_args(self, record):
+        _, enemy_kind, x, y, vx, left, right, frame_set, frame_ms, scale = record
+        frames = self.frame_sets[frame_set]
+        if enemy_kind == KIND_BEE:
+            return BeeEnemy, (frames, frame_ms / 1000, (x, y), vx, left, right, scale / 100)
+        if enemy_kind == KIND_SLIME:
+            return SlimeEnemy, (frames, frame_ms / 1000, (x, y), vx, left, right)
+        return Enemy, (frames, frame_ms / 1000, (x, y), vx)
+
+    # Escalas dos inimigos da fase, para gerar as variantes do atlas antes
+    # do jogo começar
+    def enemy_scales(self):
+        scales = {1.0}
+        for kind, record in self.all_records():
+            if kind == 'enemy' and record[1] == KIND_BEE:
+                scales.add(record[9] / 100)
+        return scales
+
+
+# STREAMING
+
+
+class ChunkStreamer:
+    def __init__(self, level_file, world, radius=1):
+        self.level = level_file
+        self.world = world
+        self.radius = radius
+        self.center = None
+        self.loaded_chunks = {}
+        # id -> [objeto, tipo, quantos chunks carregados o referenciam]
+        self.entities = {}
+
+    def update(self, x, y):
+        center = self.level.chunk_at(x, y)
+        if center == self.center:
+            return
+        self.center = center
+
+        cx, cy = center
+        radius = self.radius
+        wanted = {
+            (cx + dx, cy + dy)
+            for dx in range(-radius, radius + 1)
+            for dy in range(-radius, radius + 1)
+            if self.level.has_chunk(cx + dx, cy + dy)
+        }
+
+        for key in [key for key in self.loaded_chunks if key not in wanted]:
+            self._unload(key)
+        for key in wanted:
+            if key not in self.loaded_chunks:
+                self._load(key)
+
+    # Fecha o arquivo da fase; o streamer não carrega mais nada depois disso
+    def close(self):
+        self.level.close()
+
+    # Descarrega tudo; o próximo update carrega de novo na mesma ordem de uma
+    # fase recém-aberta, então um reset é idêntico a começar do zero
+    def reset(self):
+        for key in list(self.loaded_chunks):
+            self._unload(key)
+        self.center = None
+
+    def _load(self, key):
+        records = self.level.read_chunk(*key)
+        ids = []
+        for kind, record in records:
+            entity_id = record[0]
+            ids.append(entity_id)
+            entry = self.entities.get(entity_id)
+            if entry is not None:
+                entry[2] += 1
+                continue
+
+            if kind == 'platform':
+                obj = self.level.build(kind, record)
+                self.world.add_platform(obj)
+            elif kind == 'moving':
+                obj = self.level.build(kind, record)
+                self.world.add_moving_platform(obj)
+            else:
+                cls, args = self.level.enemy_args(record)
+                obj = self.world.spawn_enemy(cls, *args)
+            self.entities[entity_id] = [obj, kind, 1]
+        self.loaded_chunks[key] = ids
+
+    def _unload(self, key):
+        for entity_id in self.loaded_chunks.pop(key):
+            entry = self.entities[entity_id]
+            entry[2] -= 1
+            if entry[2]:
+                continue
+
+            del self.entities[entity_id]
+            obj, kind, _ = entry
+            if kind == 'platform':
+                self.world.remove_platform(obj)
+            elif kind == 'moving':
+                self.world.remove_moving_platform(obj)
+            else:
+                self.world.despawn_enemy(obj)
+
+
+def load_world(path=DEFAULT_LEVEL, radius=1):
+    level_file = LevelFile(path)
+    world = World(level_file.width, level_file.height, level_file.spawn, empty=True)
+    world.goal = level_file.goal
+    world.door_pos = level_file.door_pos
+    world.level_name = os.path.basename(path)
+    world.level_crc = zlib.crc32(level_file.data)
+    world.streamer = ChunkStreamer(level_file, world, radius)
+    world.streamer.update(world.player.x, world.player.y)
+    return world
+
+
+# Regrava levels/level1.lvl a partir da fase padrão do engine:
+#   python level.py [caminho]
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_LEVEL
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    write_level(target, World())
+    print(f"Fase gravada em {target} ({os.path.getsize(target)} bytes)")
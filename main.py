@@ -1,38 +1,59 @@
+import atexit
+import os
+import weakref
+
 import pgzrun
 from pygame import Rect
-from pgzero.actor import Actor
+
+from atlas import build_atlas
+from assets import AssetManager
+from audio import SoundMixer, effect_sounds
+from particles import ParticleSystem
+from render import (BackgroundCache, TextCache, TextWidget, ProfilerOverlay, FrameCapture, FrozenFrame,
+                    blit_batch, fill_translucent)
+from profiler import PHASE_UPDATE, PHASE_INPUT, PHASE_DRAW, PHASE_WORLD_DRAW, PHASE_HUD_DRAW
+from engine import (Input, FixedTimestep, MovingPlatform, SIM_DT, SIM_MARGIN, WIDTH, HEIGHT, TILE_SIZE,
+                    VIEW_MARGIN, PLAYER_FRAMES)
+from level import load_world
+from replay import Recording
+from rewind import RewindBuffer
+from leaderboard import Leaderboard
+from net import NetClient, apply_snapshot
 
 # CONFIGURAÇÕES GLOBAIS
 
-WIDTH = 800
-HEIGHT = 600
 TITLE = "Test for Tutor Game - Robson William Silva Abreu"
 
 C_SKY = (100, 200, 255)
-C_PLATFORM = (100, 100, 100)
 
-GRAVITY = 0.8
-JUMP_FORCE = -14
-SPEED = 5
-TILE_SIZE = 50 
-GROUND_Y = 550 
+MENU_MUSIC = 'sound_bg1'
 
 
 # VARIÁVEIS DO JOGO
 
-game_state = "menu"
+game_state = "loading"
 music_on = True
 win_timer = 0
 WIN_DELAY = 3.0
-score = 0
-high_score = 0
-game_timer = 0
+# Posição da última vitória no ranking da fase (None se não entrou)
+win_rank = None
+
+
+# TEXTO
+
+
+text_cache = TextCache()
+
+def draw_text(text, **kwargs):
+    text_cache.draw(screen.surface, text, **kwargs)
 
 
 # CLASSES
 
 
 class Button:
+    __slots__ = ('rect', 'text', 'action', 'font_size', 'color', 'bg_color')
+
     def __init__(self, rect, text, action, font_size=40, color=(255, 255, 255), bg_color=(0, 0, 0, 150)):
         self.rect = rect
         self.text = text
@@ -43,335 +64,191 @@ class Button:
 
     def draw(self, screen):
         screen.draw.filled_rect(self.rect, self.bg_color)
-        screen.draw.text(self.text, center=self.rect.center, fontsize=self.font_size, color=self.color)
+        draw_text(self.text, center=self.rect.center, fontsize=self.font_size, color=self.color)
 
     def is_clicked(self, pos):
         return self.rect.collidepoint(pos)
 
 
-class Player:
-    def __init__(self, pos):
-        try:
-            self.actor = Actor('player_idle0', pos=pos)
-        except Exception:
-            print("AVISO: Imagens do player não encontradas")
-            self.actor = Actor('player_idle0', pos=pos)
-            
-        self.hitbox = Rect(self.actor.x - 15, self.actor.y - 15, 30, 30)
-        self.vy = 0
-        self.grounded = False
-        self.alive = True
-        self.can_double_jump = True
-        self.dash_cooldown = 0
-        self.dash_speed = 15
-        self.jump_pressed = False
-
-    def handle_input(self):
-        if not self.alive: 
-            return
-
-        moving = False
-        
-        if keyboard.left or keyboard.a: 
-            self.actor.x -= SPEED
-            self.actor.flip_x = True
-            moving = True
-        if keyboard.right or keyboard.d: 
-            self.actor.x += SPEED
-            self.actor.flip_x = False
-            moving = True
-        
-        if (keyboard.lshift or keyboard.rshift) and self.dash_cooldown <= 0:
-            dash_direction = -1 if self.actor.flip_x else 1
-            self.actor.x += self.dash_speed * dash_direction
-            self.dash_cooldown = 0.5
-            if music_on:
-                try: 
-                    sounds.sfx_jump.play()
-                except: 
-                    pass
-        
-        jump_key_down = keyboard.space or keyboard.up
-        
-        if jump_key_down and not self.jump_pressed:
-            if self.grounded:
-                if music_on: 
-                    try: 
-                        sounds.sfx_jump.play()
-                    except: 
-                        pass
-                
-                self.vy = JUMP_FORCE
-                self.actor.image = 'player_jump0'
-                self.grounded = False
-                self.can_double_jump = True
-                
-            elif self.can_double_jump:
-                if music_on: 
-                    try: 
-                        sounds.sfx_jump.play()
-                    except: 
-                        pass
-                self.vy = JUMP_FORCE * 0.8
-                self.can_double_jump = False
-        
-        self.jump_pressed = jump_key_down
-            
-        if not self.grounded: 
-            self.actor.image = 'player_jump0'
-        elif moving: 
-            self.actor.image = 'player_run0'
-        elif keyboard.down or keyboard.s:
-            self.actor.image = 'player_down0'
+class SpriteView:
+    def __init__(self, body):
+        self.body = body
+        self.bind()
+
+    # Inimigos vêm de um pool e podem voltar com outros quadros ou escala
+    def bind(self):
+        body = self.body
+        self.frames = body.frames
+        self.scale = getattr(body, 'scale', 1.0)
+        self.frame_ids = atlas.frame_ids(self.frames)
+        self.variants = atlas.variants(self.scale)
+
+    def draw(self, alpha, view):
+        body = self.body
+        if body.frames is not self.frames or getattr(body, 'scale', 1.0) != self.scale:
+            self.bind()
+        surf = self.variants[self.frame_ids[body.current_frame_index]][body.flip_x]
+        x, y = body.render_pos(alpha)
+        screen.surface.blit(surf, (x - view.x - surf.get_width() / 2, y - view.y - surf.get_height() / 2))
+
+
+class PlatformView:
+    def __init__(self, platform):
+        self.platform = platform
+        self.num_tiles = 0
+
+        if platform.use_sprite:
+            self.num_tiles = int(platform.rect.width / TILE_SIZE)
+            if platform.rect.width % TILE_SIZE != 0:
+                self.num_tiles += 1
+            self.tile = atlas.surface(platform.tile)
+
+    def tiles_at(self, x, y):
+        tile_size = TILE_SIZE
+        tile = self.tile
+        return [(tile, (x + (i * tile_size), y)) for i in range(self.num_tiles)]
+
+    def bake(self, surface, area):
+        rect = self.platform.rect.move(-area.x, -area.y)
+        if self.num_tiles:
+            blit_batch(surface, self.tiles_at(rect.x, rect.y))
         else:
-            self.actor.image = 'player_idle0'
-    
-    def update_cooldowns(self, dt):
-        if self.dash_cooldown > 0:
-            self.dash_cooldown -= dt
+            surface.fill(self.platform.color, rect)
 
-    def apply_physics(self):
-        if not self.alive:
-            return
-
-        self.vy += GRAVITY
-        self.actor.y += self.vy
-        self.hitbox.center = (self.actor.x, self.actor.y)
-        
-        if self.actor.left < 0: 
-            self.actor.left = 0
-        if self.actor.right > WIDTH: 
-            self.actor.right = WIDTH
-
-    def check_platform_collision(self, platform_rect, is_moving_platform=False, platform_vx=0):
-        if not self.hitbox.colliderect(platform_rect):
-            return False
-
-        if self.vy > 0:
-            if self.hitbox.bottom <= platform_rect.bottom:
-                if music_on and self.vy > 2: 
-                    try: 
-                        sounds.sfx_bump.play()
-                    except: 
-                        pass
-
-                self.hitbox.bottom = platform_rect.top
-                self.actor.y = self.hitbox.center[1] 
-                self.vy = 0
-                self.grounded = True
-                
-                if is_moving_platform:
-                    self.actor.x += platform_vx 
-                    self.hitbox.center = (self.actor.x, self.actor.y)
-                return True
-        
-        return False
-
-    def draw(self):
-        self.actor.draw()
-        
-    def reset(self):
-        self.actor.pos = (50, 50)
-        self.hitbox.center = (50, 50) 
-        self.vy = 0
-        self.actor.image = 'player_idle0'
-        self.grounded = False
-        self.alive = True
-        self.can_double_jump = True
-        self.dash_cooldown = 0
-        self.jump_pressed = False
-        
-
-class Platform:
-    def __init__(self, rect, color=C_PLATFORM, use_sprite=False):
-        self.rect = rect
-        self.color = color
-        self.use_sprite = use_sprite
-        
-        if self.use_sprite:
-            self.tiles = []
-            tile_size = 50
-            num_tiles_x = int(self.rect.width / tile_size)
-            if self.rect.width % tile_size != 0:
-                num_tiles_x += 1
-            
-            for i in range(num_tiles_x):
-                tile_x = self.rect.x + (i * tile_size)
-                tile_y = self.rect.y
-                try:
-                    tile = Actor('platformbg', topleft=(tile_x, tile_y))
-                except:
-                    print("AVISO: Sprite 'platformbg' não encontrado")
-                    tile = None
-                self.tiles.append(tile)
-
-    def draw(self):
-        if self.use_sprite and self.tiles:
-            for tile in self.tiles:
-                if tile:
-                    tile.draw()
+    def draw(self, alpha, view):
+        rect = self.platform.rect.move(-view.x, -view.y)
+        if self.num_tiles:
+            blit_batch(screen.surface, self.tiles_at(self.platform.render_x(alpha) - view.x, rect.y))
         else:
-            screen.draw.filled_rect(self.rect, self.color)
-
-
-class MovingPlatform(Platform):
-    def __init__(self, x, y, width, height, vx, limit_left, limit_right, use_sprite=False):
-        super().__init__(Rect(x, y, width, height), use_sprite=use_sprite)
-        self.vx = vx
-        self.limit_left = limit_left
-        self.limit_right = limit_right
-
-    def update(self):
-        self.rect.x += self.vx
-        if self.rect.left < self.limit_left:
-            self.rect.left = self.limit_left
-            self.vx *= -1
-        elif self.rect.right > self.limit_right:
-            self.rect.right = self.limit_right
-            self.vx *= -1
-        
-        if self.use_sprite and self.tiles:
-            tile_size = 50
-            for i, tile in enumerate(self.tiles):
-                if tile:
-                    tile.x = self.rect.x + (i * tile_size) + (tile_size / 2)
-                    tile.y = self.rect.y + (tile_size / 2)
-
-
-class Enemy:
-    def __init__(self, frames, frame_rate, pos, vx=0):
-        try:
-            self.actor = Actor(frames[0], pos=pos)
-        except Exception:
-            print(f"AVISO: Imagens do inimigo {frames[0]} não encontradas")
-            self.actor = Actor('slime1', pos=pos) 
-            
-        self.frames = frames
-        self.frame_rate = frame_rate
-        self.current_frame_index = 0
-        self.frame_timer = 0.0
-        self.vx = vx
-
-    def animate(self, dt):
-        self.frame_timer += dt 
-        if self.frame_timer >= self.frame_rate:
-            self.frame_timer = 0.0
-            self.current_frame_index = (self.current_frame_index + 1) % len(self.frames)
-            self.actor.image = self.frames[self.current_frame_index]
-            
-    def update(self, dt):
-        self.animate(dt)
-
-    def draw(self):
-        self.actor.draw()
-        
-    def check_collision(self, player_hitbox):
-        return player_hitbox.colliderect(self.actor._rect)
-        
-    def reset(self):
-        self.current_frame_index = 0
-        self.frame_timer = 0.0
-        self.actor.image = self.frames[0]
-
-
-class SlimeEnemy(Enemy):
-    def __init__(self, frames, frame_rate, pos, vx, limit_left, limit_right):
-        super().__init__(frames, frame_rate, pos, vx)
-        self.initial_pos = pos
-        self.limit_left = limit_left
-        self.limit_right = limit_right
-        
-    def update(self, dt):
-        super().update(dt)
-        
-        self.actor.x += self.vx
-        
-        if self.actor.x > self.limit_right:
-            self.actor.x = self.limit_right
-            self.vx *= -1
-        elif self.actor.x < self.limit_left:
-            self.actor.x = self.limit_left
-            self.vx *= -1
-            
-        if self.vx > 0: 
-            self.actor.flip_x = False 
-        elif self.vx < 0: 
-            self.actor.flip_x = True
-
-    def reset(self):
-        super().reset()
-        self.actor.pos = self.initial_pos
-        self.vx = abs(self.vx) 
-
-
-class BeeEnemy(SlimeEnemy): 
-    def __init__(self, frames, frame_rate, pos, vx, limit_left, limit_right, scale=1.0):
-        super().__init__(frames, frame_rate, pos, vx, limit_left, limit_right)
-        self.actor.scale = scale
+            screen.draw.filled_rect(rect, self.platform.color)
 
 
 # OBJETOS DO JOGO
 
 
-player = Player((50, 50))
-
-try:
-    goal_actor = Actor('door1', pos=(720, 125))
-    goal_actor.scale = 1.0
-except Exception:
-    print("AVISO: Sprite 'door1' não encontrado")
-    goal_actor = Actor('door1', pos=(720, 125))
-
-goal = Rect(700, 100, 40, 40)
-
-platforms_static = [
-    Platform(Rect(200, 450, 200, 20), use_sprite=True),
-    Platform(Rect(500, 350, 200, 20), use_sprite=True),
-    Platform(Rect(150, 250, 150, 20), use_sprite=True),
-    Platform(Rect(420, 250, 50, 20), use_sprite=True),
-    Platform(Rect(350, 150, 100, 20), use_sprite=True), 
-    Platform(Rect(0, GROUND_Y, WIDTH, TILE_SIZE), C_PLATFORM, use_sprite=False)
-]
-
-moving_platform_obj = MovingPlatform(600, 150, 50, 20, 1.5, 550, 750, use_sprite=True)
-
-bee_enemy = BeeEnemy(
-    frames=['bee1', 'bee2', 'bee3', 'bee4'], 
-    frame_rate=0.1, 
-    pos=(500, 290), 
-    vx=1.6, 
-    limit_left=500, 
-    limit_right=700,
-    scale=1.2
-)
-
-slime_enemy = SlimeEnemy(
-    frames=['slime1', 'slime2'], 
-    frame_rate=0.25, 
-    pos=(400, 130), 
-    vx=1.0, 
-    limit_left=360, 
-    limit_right=440
-)
-
-lava_slime = SlimeEnemy(
-    frames=['slime_red1', 'slime_red2'], 
-    frame_rate=0.35, 
-    pos=(WIDTH/2, GROUND_Y - 20), 
-    vx=1.8, 
-    limit_left=0, 
-    limit_right=WIDTH
-)
-
-enemies = [bee_enemy, slime_enemy, lava_slime]
+world = load_world()
+atexit.register(world.close)
+sim_clock = FixedTimestep()
+
+player = world.player
+
+camera = world.camera
+world.sim_margin = SIM_MARGIN
+
+# F3 mostra/esconde o overlay do profiler, F4 grava os últimos segundos como
+# trace do Chrome. Com PROFILE=1 no ambiente já começa gravando.
+profiler = world.profiler
+profiler.enable(bool(os.environ.get('PROFILE')))
+PROFILE_EXPORT_SECONDS = 10
+
+# As entidades entram e saem com o streaming da fase; a view de cada uma é
+# criada no primeiro desenho e some junto com ela
+views = weakref.WeakKeyDictionary()
+
+def view_for(entity, view_class):
+    view = views.get(entity)
+    if view is None:
+        view = views[entity] = view_class(entity)
+    return view
+
+
+# ASSETS
+#
+# Imagens e sons são carregados em segundo plano enquanto a LoadingScene é
+# desenhada (ver assets.py); o que falta é avisado uma vez, no começo. O
+# atlas e o que depende dele são montados em finish_loading(). Com
+# HOT_RELOAD=1 no ambiente, imagens e sons alterados no disco são trocados
+# com o jogo rodando.
+
+HOT_RELOAD = bool(os.environ.get('HOT_RELOAD'))
+
+assets = AssetManager()
+assets.require('images', PLAYER_FRAMES + ('door1', 'bg_menu'))
+if world.streamer is not None:
+    # Os nomes da fase são só quadros e tiles
+    assets.require('images', world.streamer.level.strings)
+assets.require('sounds', effect_sounds())
+assets.require('music', (MENU_MUSIC,))
+assets.start()
+
+atlas = None
+goal_surface = None
+goal_rect = None
+player_view = None
+# Quadros do jogador translúcidos, para os fantasmas da corrida em rede
+ghost_frames = None
+GHOST_ALPHA = 110
+
+def ghost_surface(surf):
+    surf = surf.copy()
+    surf.set_alpha(GHOST_ALPHA)
+    return surf
+
+def finish_loading():
+    global atlas, goal_surface, goal_rect, player_view, ghost_frames
+    assets.wait()
+    atlas = build_atlas(images=assets.assets['images'])
+    goal_surface = atlas.surface('door1')
+    goal_rect = goal_surface.get_rect(center=world.door_pos)
+    player_view = SpriteView(player)
+    # Inimigos escalados (abelhas) usam variantes próprias do atlas: geradas
+    # aqui, e não no primeiro desenho de um deles no meio da partida
+    if world.streamer is not None:
+        scales = world.streamer.level.enemy_scales()
+    else:
+        scales = {getattr(enemy, 'scale', 1.0) for enemy in world.enemies}
+    for scale in scales:
+        atlas.variants(scale)
+    variants = atlas.variants()
+    ghost_frames = [[ghost_surface(surf) for surf in variants[frame_id]]
+                    for frame_id in atlas.frame_ids(PLAYER_FRAMES)]
+    if HOT_RELOAD:
+        assets.watch()
+    set_scene(menu_scene)
+
+def apply_reloads():
+    changed = assets.swap()
+    for kind, name, asset in changed:
+        if kind == 'images' and name in atlas and not atlas.replace(name, asset):
+            print(f"AVISO: {name} mudou de tamanho; reinicie o jogo para ver a imagem nova")
+    if changed:
+        background.invalidate()
+        for scene in scenes:
+            if isinstance(scene, StaticScene):
+                scene.invalidate()
+
+
+# PARTÍCULAS
+#
+# Os efeitos visuais que o World marca a cada tick (dash, pulo duplo, pouso,
+# batida, vitória) viram partículas (particles.py). Elas andam uma vez por
+# quadro e continuam nas telas de game over e vitória, por cima delas.
+
+particles = ParticleSystem(seed=world.seed)
+
+def draw_particles():
+    start = profiler.begin()
+    particles.draw(screen.surface, camera.rect)
+    profiler.end(PHASE_WORLD_DRAW, start)
 
 
 # FUNÇÕES DE MÚSICA
+#
+# Os efeitos passam pelo SoundMixer (audio.py): play_sfx só marca o pedido, e
+# o que foi pedido no quadro toca uma vez só, no fim do update.
+
+sfx = SoundMixer(assets)
 
+def play_sfx(name):
+    if music_on:
+        sfx.trigger(name)
 
 def play_menu_music():
+    # Sem o arquivo (já avisado no começo) não há o que tocar
+    if assets.music(MENU_MUSIC) is None:
+        return
     try:
-        music.play('sound_bg1')
+        music.play(MENU_MUSIC)
         music.set_volume(0.5)
     except Exception as e:
         print(f"AVISO: Música não carregada - {e}")
@@ -381,32 +258,34 @@ def play_menu_music():
 
 
 def start_game():
-    global game_state, win_timer, score, game_timer
-    game_state = "playing"
+    global win_timer
+    set_scene(game_scene)
     win_timer = 0
-    score = 0
-    game_timer = 0
+    world.score = 0
+    world.game_timer = 0
+    sim_clock.reset()
+    begin_run()
     music.stop()
     if music_on: 
         play_menu_music()
 
 def pause_game():
-    global game_state
     if game_state == "playing":
-        game_state = "paused"
+        push_scene(pause_scene)
         
 def resume_game():
-    global game_state
-    game_state = "playing"
+    if game_state == "paused":
+        pop_scene()
 
 def show_controls():
-    global game_state
-    game_state = "controls"
+    push_scene(controls_scene)
+
+def hide_controls():
+    pop_scene()
     
 def return_to_menu():
-    global game_state
     reset_game()
-    game_state = "menu"
+    set_scene(menu_scene)
     music.stop()
     if music_on:
         play_menu_music()
@@ -414,17 +293,17 @@ def return_to_menu():
 def toggle_sound():
     global music_on
     music_on = not music_on
+    # O texto do botão de som está nas telas congeladas
+    menu_scene.invalidate()
+    pause_scene.invalidate()
     
     if not music_on:
         music.stop()
+        sfx.stop()
     elif game_state == "menu":
         play_menu_music()
     
-    if music_on:
-        try: 
-            sounds.sfx_select.play() 
-        except: 
-            pass
+    play_sfx('sfx_select')
 
 def quit_game():
     import sys
@@ -462,7 +341,7 @@ pause_buttons = [
 controls_button = Button(
     Rect(WIDTH/2 - 100, HEIGHT - 100, 200, 50), 
     "VOLTAR", 
-    lambda: setattr(__builtins__, 'game_state', "paused") or pause_game(),
+    hide_controls,
     font_size=35
 )
 
@@ -476,169 +355,236 @@ pause_button_ingame = Button(
 )
 
 
-# CALLBACKS PYGAME ZERO
+# HUD
 
 
-def on_mouse_down(pos):
-    global game_state
-    
-    if game_state == "menu":
-        for button in menu_buttons:
-            if button.is_clicked(pos):
-                button.action()
-                return
-    
-    elif game_state == "paused":
-        for button in pause_buttons:
+hud_score = TextWidget(text_cache, fontsize=30, color="white", owidth=1, ocolor="black", topleft=(10, 10))
+hud_time = TextWidget(text_cache, fontsize=25, color="white", owidth=1, ocolor="black", topleft=(10, 45))
+hud_dash = TextWidget(text_cache, fontsize=20, owidth=1, ocolor="black", topleft=(10, 75))
+hud_double_jump = TextWidget(text_cache, fontsize=20, color=(100, 200, 255), owidth=1, ocolor="black",
+                             topleft=(10, 100))
+hud_rewind = TextWidget(text_cache, fontsize=30, color=(255, 220, 80), owidth=1, ocolor="black",
+                        midtop=(WIDTH/2, 10))
+profiler_overlay = ProfilerOverlay(profiler, text_cache, topleft=(WIDTH - 260, 60))
+
+
+# CENAS
+#
+# As telas ficam numa pilha e só a do topo recebe update, draw e cliques.
+# Pausa e controles entram por cima do jogo (push_scene) e saem com
+# pop_scene, sem mexer em quem está embaixo. As telas que não mudam sozinhas
+# são montadas uma vez (compose) numa FrozenFrame, já com o último quadro do
+# jogo escurecido por baixo quando for o caso; nos quadros seguintes custam
+# um blit mais o que muda (draw_dynamic). game_state é o nome da cena do topo.
+
+
+class Scene:
+    name = None
+
+    def __init__(self, buttons=()):
+        self.buttons = buttons
+
+    def enter(self):
+        pass
+
+    def update(self, dt):
+        pass
+
+    def draw(self):
+        pass
+
+    def on_mouse_down(self, pos):
+        for button in self.buttons:
             if button.is_clicked(pos):
                 button.action()
                 return
-    
-    elif game_state == "controls":
-        if controls_button.is_clicked(pos):
-            game_state = "paused"
-            return
-    
-    elif game_state == "playing":
-        if pause_button_ingame.is_clicked(pos):
-            pause_button_ingame.action()
-            return
 
-def update(dt):
-    global game_state, music_on, win_timer, score, game_timer, high_score
-    
-    if game_state == "menu":
-        if music_on and not music.is_playing("sound_bg1"):
-             play_menu_music()
-        elif not music_on and music.is_playing("sound_bg1"):
-             music.stop()
-        return
-    
-    elif game_state == "paused" or game_state == "controls":
-        if keyboard.ESCAPE or keyboard.p:
-            if game_state == "controls":
-                game_state = "paused"
-            else:
-                resume_game()
-        return
-        
-    elif game_state == "gameover":
-        if keyboard.r: 
-            if music_on: 
-                try: 
-                    sounds.sfx_select.play()
-                except: 
-                    pass
-            reset_game()
-        return
-    
-    elif game_state == "win":
-        win_timer += dt
-        
-        if win_timer >= WIN_DELAY:
-            return_to_menu()
-            return
-        
-        if keyboard.r:
-            if music_on: 
-                try: 
-                    sounds.sfx_select.play()
-                except: 
-                    pass
-            reset_game()
-        return
 
-    game_timer += dt
-    score = int(game_timer * 10)
-    
-    if keyboard.ESCAPE or keyboard.p:
-        pause_game()
-        return
-    
-    player.handle_input()
-    player.update_cooldowns(dt)
-    player.apply_physics()
-    
-    moving_platform_obj.update()
-    player.grounded = False
-    
-    for plat_obj in platforms_static:
-        if player.check_platform_collision(plat_obj.rect):
-            player.can_double_jump = True
-        
-    if player.check_platform_collision(moving_platform_obj.rect, is_moving_platform=True, platform_vx=moving_platform_obj.vx):
-        player.can_double_jump = True
+class StaticScene(Scene):
+    def __init__(self, buttons=()):
+        super().__init__(buttons)
+        self.frame = FrozenFrame((WIDTH, HEIGHT))
 
-    for enemy in enemies:
-        enemy.update(dt)
+    # Cada entrada monta a tela de novo (o jogo embaixo pode ter mudado)
+    def enter(self):
+        self.frame.invalidate()
 
-    death_occurred = False
-    if player.actor.top > HEIGHT: 
-        death_occurred = True
-        
-    for enemy in enemies:
-        if enemy.check_collision(player.hitbox):
-            death_occurred = True
-            
-    if death_occurred:
-        game_state = "gameover"
-        if music_on: 
-            try: 
-                sounds.sfx_hurt.play()
-            except: 
-                pass
-        music.stop()
-        
-    if player.hitbox.colliderect(goal):
-        game_state = "win"
-        win_timer = 0
-        
-        time_bonus = max(0, int((60 - game_timer) * 20))
-        score += time_bonus + 1000
-        
-        if score > high_score:
-            high_score = score
-        
-        if music_on: 
-            try: 
-                sounds.sfx_gem.play()
-            except: 
-                pass
-        music.stop()
+    def invalidate(self):
+        self.frame.invalidate()
 
+    def draw(self):
+        frame = self.frame
+        if frame.valid:
+            frame.draw(screen.surface)
+        else:
+            self.compose()
+            frame.capture(screen.surface)
+        self.draw_dynamic()
 
-def draw_tiles():
-    num_tiles = WIDTH // TILE_SIZE 
-    if WIDTH % TILE_SIZE != 0: 
-        num_tiles += 1
-    for i in range(num_tiles):
-        screen.blit('bg_ground', (i * TILE_SIZE, GROUND_Y))
+    def compose(self):
+        pass
 
-def draw():
-    global game_state
-    
-    if game_state == "menu":
-        try:
-            screen.blit('bg_menu', (0, 0))
-        except:
+    def draw_dynamic(self):
+        pass
+
+
+class LoadingScene(Scene):
+    name = "loading"
+
+    def update(self, dt):
+        if assets.poll():
+            finish_loading()
+
+    def draw(self):
+        screen.fill((30, 30, 30))
+        draw_text("CARREGANDO...", center=(WIDTH/2, HEIGHT/2 - 40), fontsize=40, color="white")
+        bar = Rect(WIDTH/2 - 150, HEIGHT/2, 300, 20)
+        screen.draw.rect(bar, "white")
+        filled = bar.inflate(-6, -6)
+        filled.width = round(filled.width * assets.progress)
+        screen.draw.filled_rect(filled, "white")
+
+
+class MenuScene(StaticScene):
+    name = "menu"
+
+    def update(self, dt):
+        if music_on and not music.is_playing(MENU_MUSIC):
+            play_menu_music()
+        elif not music_on and music.is_playing(MENU_MUSIC):
+            music.stop()
+
+    def compose(self):
+        background_image = assets.image('bg_menu')
+        if background_image is not None:
+            screen.blit(background_image, (0, 0))
+        else:
             screen.fill((50, 50, 50))
-            screen.draw.text(TITLE, center=(WIDTH/2, BUTTON_Y_START - 50), fontsize=70, color="white")
+            draw_text(TITLE, center=(WIDTH/2, BUTTON_Y_START - 50), fontsize=70, color="white")
         
+        high_score = leaderboard.best()
         if high_score > 0:
-            screen.draw.text(f"HIGH SCORE: {high_score}", center=(WIDTH/2, BUTTON_Y_START - 14), 
+            draw_text(f"HIGH SCORE: {high_score}", center=(WIDTH/2, BUTTON_Y_START - 14), 
                            fontsize=20, color="yellow")
             
         menu_buttons[1].text = f"SOM: {'ON' if music_on else 'OFF'}"
         
         for button in menu_buttons:
             button.draw(screen)
+
+
+class GameScene(Scene):
+    name = "playing"
+
+    def update(self, dt):
+        global win_timer, win_rank, rewinding
+
+        start = profiler.begin()
+        keys = read_input()
+        profiler.end(PHASE_INPUT, start)
+
+        if rewind_pressed():
+            rewind_time(dt)
+            return
+        rewinding = False
+
+        for _ in range(sim_clock.advance(dt)):
+            if net_client is not None:
+                # Em rede quem simula é o servidor; daqui só sai o Input
+                world.pause_requested = keys.pause
+                if not keys.pause:
+                    net_client.send_input(keys)
+                continue
+
+            if replay_inputs is not None:
+                inp = next(replay_inputs, None)
+                if inp is None:
+                    end_run()
+                    return_to_menu()
+                    return
+            else:
+                inp = keys
+                if recording is not None:
+                    recording.record(inp)
+
+            world.step(inp, SIM_DT)
+            rewinder.capture()
+            invalidate_background()
+
+            for sound_name in world.events:
+                play_sfx(sound_name)
+            for effect in world.effects:
+                particles.emit(*effect)
+
+            if world.pause_requested or world.outcome:
+                break
+
+        if net_client is not None:
+            update_net(dt)
+        particles.step(dt)
+
+        if world.pause_requested and replay_inputs is None:
+            pause_game()
+            return
+
+        if world.outcome:
+            end_run()
+
+        if world.outcome == "gameover":
+            push_scene(gameover_scene)
+            music.stop()
+
+        elif world.outcome == "win":
+            win_timer = 0
+            win_rank = record_score()
+
+            push_scene(win_scene)
+            music.stop()
+
+    def draw(self):
+        draw_world()
+        draw_particles()
+        pause_button_ingame.draw(screen)
+        draw_hud()
+
+
+class PauseScene(StaticScene):
+    name = "paused"
+
+    def update(self, dt):
+        if keyboard.ESCAPE or keyboard.p:
+            resume_game()
+
+    def compose(self):
+        draw_world()
+        draw_particles()
         
-        return
-    
-    if game_state == "controls":
+        fill_translucent(screen.surface, (0, 0, 0, 180))
+        draw_text("PAUSADO", center=(WIDTH/2, BUTTON_Y_START - 50), fontsize=70, color="white")
+        
+        pause_buttons[2].text = f"SOM: {'ON' if music_on else 'OFF'}"
+        
+        for button in pause_buttons:
+            button.draw(screen)
+        
+        draw_text("Pressione ESC ou P para continuar", center=(WIDTH/2, HEIGHT - 40), fontsize=25, color="white")
+
+
+class ControlsScene(StaticScene):
+    name = "controls"
+
+    # O conteúdo nunca muda, então a tela montada vale para sempre
+    def enter(self):
+        pass
+
+    def update(self, dt):
+        if keyboard.ESCAPE or keyboard.p:
+            hide_controls()
+
+    def compose(self):
         screen.fill((30, 30, 50))
         
-        screen.draw.text("CONTROLES", center=(WIDTH/2, 80), fontsize=60, color="white")
+        draw_text("CONTROLES", center=(WIDTH/2, 80), fontsize=60, color="white")
         
         controls_text = [
             ("MOVIMENTAÇÃO", ""),
@@ -650,6 +596,7 @@ def draw():
             ("", ""),
             ("HABILIDADES", ""),
             ("SHIFT", "Dash (corrida rápida)"),
+            ("BACKSPACE (segurar)", "Voltar no tempo"),
             ("", ""),
             ("SISTEMA", ""),
             ("ESC  ou  P", "Pausar jogo"),
@@ -658,122 +605,386 @@ def draw():
         y_pos = 150
         for title, desc in controls_text:
             if title and not desc:
-                screen.draw.text(title, center=(WIDTH/2, y_pos), fontsize=32, color="yellow")
+                draw_text(title, center=(WIDTH/2, y_pos), fontsize=32, color="yellow")
                 y_pos += 40
             elif title:
-                screen.draw.text(title, midleft=(150, y_pos), fontsize=24, color=(100, 200, 255))
-                screen.draw.text(desc, midleft=(380, y_pos), fontsize=20, color="white")
+                draw_text(title, midleft=(150, y_pos), fontsize=24, color=(100, 200, 255))
+                draw_text(desc, midleft=(380, y_pos), fontsize=20, color="white")
                 y_pos += 30
             else:
                 y_pos += 10
         
         controls_button.draw(screen)
-        screen.draw.text("Pressione ESC para voltar", center=(WIDTH/2, HEIGHT - 40), fontsize=20, color="gray")
-        return
-    
-    if game_state == "paused":
-        screen.fill(C_SKY)
-        draw_tiles()
-        
-        for platform_obj in platforms_static[:-1]: 
-            platform_obj.draw()
+        draw_text("Pressione ESC para voltar", center=(WIDTH/2, HEIGHT - 40), fontsize=20, color="gray")
 
-        moving_platform_obj.draw()
-        goal_actor.draw()
-        
-        for enemy in enemies:
-            enemy.draw()
-            
-        player.draw()
-        
-        screen.draw.filled_rect(Rect(0, 0, WIDTH, HEIGHT), (0, 0, 0, 180))
-        screen.draw.text("PAUSADO", center=(WIDTH/2, BUTTON_Y_START - 50), fontsize=70, color="white")
-        
-        pause_buttons[2].text = f"SOM: {'ON' if music_on else 'OFF'}"
-        
-        for button in pause_buttons:
-            button.draw(screen)
-        
-        screen.draw.text("Pressione ESC ou P para continuar", center=(WIDTH/2, HEIGHT - 40), fontsize=25, color="white")
-        return
-        
-    screen.fill(C_SKY)
-    draw_tiles()
-    
-    for platform_obj in platforms_static[:-1]: 
-        platform_obj.draw()
 
-    moving_platform_obj.draw()
-    goal_actor.draw()
-    
-    for enemy in enemies:
-        enemy.draw()
-        
-    player.draw()
-    
-    if game_state == "playing":
-        pause_button_ingame.draw(screen)
-        
-        screen.draw.text(f"SCORE: {score}", topleft=(10, 10), fontsize=30, color="white", 
-                        owidth=1, ocolor="black")
-        screen.draw.text(f"TIME: {int(game_timer)}s", topleft=(10, 45), fontsize=25, color="white",
-                        owidth=1, ocolor="black")
-        
-        if player.dash_cooldown > 0:
-            dash_color = (255, 100, 100)
-            dash_text = f"DASH: {player.dash_cooldown:.1f}s"
-        else:
-            dash_color = (100, 255, 100)
-            dash_text = "DASH: PRONTO"
-        
-        screen.draw.text(dash_text, topleft=(10, 75), fontsize=20, color=dash_color,
-                        owidth=1, ocolor="black")
-        
-        if player.can_double_jump and not player.grounded:
-            screen.draw.text("PULO DUPLO OK", topleft=(10, 100), fontsize=20, 
-                           color=(100, 200, 255), owidth=1, ocolor="black")
-    
-    if game_state == "gameover":
-        screen.draw.filled_rect(Rect(0, 0, WIDTH, HEIGHT), (0, 0, 0, 150))
-        screen.draw.text("GAME OVER", center=(WIDTH/2, HEIGHT/2 - 60), fontsize=60, color="red")
-        screen.draw.text(f"Score Final: {score}", center=(WIDTH/2, HEIGHT/2), fontsize=40, color="white")
-        screen.draw.text(f"Tempo: {int(game_timer)}s", center=(WIDTH/2, HEIGHT/2 + 40), fontsize=30, color="white")
-        screen.draw.text("Press R to Restart", center=(WIDTH/2, HEIGHT/2 + 80), fontsize=40, color="red")
+def restart_pressed():
+    if not keyboard.r:
+        return False
+    play_sfx('sfx_select')
+    reset_game()
+    return True
+
+
+class GameOverScene(StaticScene):
+    name = "gameover"
+
+    def update(self, dt):
+        particles.step(dt)
+        restart_pressed()
+
+    def compose(self):
+        draw_world()
+        fill_translucent(screen.surface, (0, 0, 0, 150))
+        draw_text("GAME OVER", center=(WIDTH/2, HEIGHT/2 - 60), fontsize=60, color="red")
+        draw_text(f"Score Final: {world.score}", center=(WIDTH/2, HEIGHT/2), fontsize=40, color="white")
+        draw_text(f"Tempo: {int(world.game_timer)}s", center=(WIDTH/2, HEIGHT/2 + 40), fontsize=30, color="white")
+        draw_text("Press R to Restart", center=(WIDTH/2, HEIGHT/2 + 80), fontsize=40, color="red")
+
+    def draw_dynamic(self):
+        draw_particles()
+
+
+class WinScene(StaticScene):
+    name = "win"
+
+    def __init__(self):
+        super().__init__()
+        # Só a contagem muda; o texto é refeito quando o décimo de segundo muda
+        self.countdown = TextWidget(text_cache, fontsize=30, color="green", center=(WIDTH/2, HEIGHT/2 + 60))
+
+    def update(self, dt):
+        global win_timer
+        win_timer += dt
+        particles.step(dt)
         
-    elif game_state == "win":
-        screen.draw.filled_rect(Rect(0, 0, WIDTH, HEIGHT), (255, 255, 255, 150))
-        screen.draw.text("VENCEU!", center=(WIDTH/2, HEIGHT/2 - 80), fontsize=60, color="green")
-        screen.draw.text(f"Score Final: {score}", center=(WIDTH/2, HEIGHT/2 - 20), fontsize=40, color="green")
-        screen.draw.text(f"Tempo: {int(game_timer)}s", center=(WIDTH/2, HEIGHT/2 + 20), fontsize=30, color="green")
+        if win_timer >= WIN_DELAY:
+            return_to_menu()
+            return
         
+        restart_pressed()
+
+    def compose(self):
+        draw_world()
+        fill_translucent(screen.surface, (255, 255, 255, 150))
+        draw_text("VENCEU!", center=(WIDTH/2, HEIGHT/2 - 80), fontsize=60, color="green")
+        if win_rank is not None:
+            draw_text(f"{win_rank}º lugar no ranking!", center=(WIDTH/2, HEIGHT/2 - 125), fontsize=25, color="green")
+        draw_text(f"Score Final: {world.score}", center=(WIDTH/2, HEIGHT/2 - 20), fontsize=40, color="green")
+        draw_text(f"Tempo: {int(world.game_timer)}s", center=(WIDTH/2, HEIGHT/2 + 20), fontsize=30, color="green")
+        draw_text("Press R to Restart", center=(WIDTH/2, HEIGHT/2 + 100), fontsize=25, color="green")
+
+    def draw_dynamic(self):
+        draw_particles()
         time_left = WIN_DELAY - win_timer
         if time_left > 0:
-            screen.draw.text(f"Voltando ao menu em {time_left:.1f}s...", 
-                           center=(WIDTH/2, HEIGHT/2 + 60), fontsize=30, color="green")
-        
-        screen.draw.text("Press R to Restart", center=(WIDTH/2, HEIGHT/2 + 100), fontsize=25, color="green")
+            self.countdown.draw(screen.surface, f"Voltando ao menu em {time_left:.1f}s...")
+
+
+loading_scene = LoadingScene()
+menu_scene = MenuScene(menu_buttons)
+game_scene = GameScene([pause_button_ingame])
+pause_scene = PauseScene(pause_buttons)
+controls_scene = ControlsScene([controls_button])
+gameover_scene = GameOverScene()
+win_scene = WinScene()
+
+scenes = [loading_scene]
+
+def set_scene(scene):
+    scenes.clear()
+    push_scene(scene)
+
+def push_scene(scene):
+    global game_state
+    scenes.append(scene)
+    scene.enter()
+    game_state = scene.name
+
+def pop_scene():
+    global game_state
+    scenes.pop()
+    game_state = scenes[-1].name
+
+
+# CALLBACKS PYGAME ZERO
+
+
+def on_mouse_down(pos):
+    scenes[-1].on_mouse_down(pos)
+
+def on_key_down(key):
+    if key == keys.F3:
+        profiler_overlay.toggle()
+        if profiler_overlay.visible and not profiler.enabled:
+            profiler.enable()
+        elif not profiler_overlay.visible and not os.environ.get('PROFILE'):
+            profiler.enable(False)
+
+    elif key == keys.F4:
+        if not profiler.frame_count:
+            print("AVISO: Profiler sem dados (ligue com F3 ou PROFILE=1)")
+            return
+        path = profiler.export_chrome_trace(seconds=PROFILE_EXPORT_SECONDS)
+        print(f"Trace dos últimos {PROFILE_EXPORT_SECONDS}s gravado em {path}")
+
+def read_input():
+    return Input(
+        left=keyboard.left or keyboard.a,
+        right=keyboard.right or keyboard.d,
+        jump=keyboard.space or keyboard.up,
+        dash=keyboard.lshift or keyboard.rshift,
+        down=keyboard.down or keyboard.s,
+        pause=keyboard.ESCAPE or keyboard.p
+    )
+
+def update(dt):
+    profiler.begin_frame()
+    start = profiler.begin()
+    if HOT_RELOAD and assets.ready:
+        apply_reloads()
+    update_game(dt)
+    sfx.flush()
+    profiler.end(PHASE_UPDATE, start)
+
+def update_game(dt):
+    scenes[-1].update(dt)
+
+
+# Os tiles das plataformas podem passar um pouco do rect delas (o último tile
+# não é cortado), então a busca e a invalidação usam essa folga
+BAKE_MARGIN = 2 * TILE_SIZE
+
+def bake_background(surface, area):
+    surface.fill(C_SKY)
+
+    for plat_obj in world.platform_index.query(area.inflate(BAKE_MARGIN, BAKE_MARGIN)):
+        if not isinstance(plat_obj, MovingPlatform):
+            view_for(plat_obj, PlatformView).bake(surface, area)
+
+background = BackgroundCache(bake_background)
+
+def invalidate_background():
+    for rect in world.static_changes:
+        background.invalidate(rect.inflate(BAKE_MARGIN, BAKE_MARGIN))
+    world.static_changes.clear()
+
+def draw_tiles(alpha, view):
+    background.draw(screen.surface, view)
+
+    for moving in world.moving_platforms:
+        if camera.is_visible(moving.rect, TILE_SIZE):
+            view_for(moving, PlatformView).draw(alpha, view)
+
+def draw_world():
+    start = profiler.begin()
+    alpha = sim_clock.alpha
+    camera.follow(player.render_pos(alpha))
+    view = camera.rect
+
+    draw_tiles(alpha, view)
+    if camera.is_visible(goal_rect):
+        screen.surface.blit(goal_surface, camera.world_to_screen(*goal_rect.topleft))
+
+    # Só os inimigos que o engine sincronizou (dentro da view mais VIEW_MARGIN)
+    enemies = world.enemies
+    for i in world.enemy_batch.overlapping(view, VIEW_MARGIN).tolist():
+        view_for(enemies[i], SpriteView).draw(alpha, view)
+
+    for x, y, frame, flip_x in ghosts:
+        surf = ghost_frames[frame][flip_x]
+        screen.surface.blit(surf, (x - view.x - surf.get_width() / 2, y - view.y - surf.get_height() / 2))
+
+    player_view.draw(alpha, view)
+    profiler.end(PHASE_WORLD_DRAW, start)
+
+def draw_hud():
+    start = profiler.begin()
+    hud_score.draw(screen.surface, f"SCORE: {world.score}")
+    hud_time.draw(screen.surface, f"TIME: {int(world.game_timer)}s")
+
+    if player.dash_cooldown > 0:
+        dash_color = (255, 100, 100)
+        dash_text = f"DASH: {player.dash_cooldown:.1f}s"
+    else:
+        dash_color = (100, 255, 100)
+        dash_text = "DASH: PRONTO"
+
+    hud_dash.draw(screen.surface, dash_text, dash_color)
+
+    if player.can_double_jump and not player.grounded:
+        hud_double_jump.draw(screen.surface, "PULO DUPLO OK")
+
+    if rewinding:
+        hud_rewind.draw(screen.surface, f"<< {rewinder.seconds:.1f}s")
+    profiler.end(PHASE_HUD_DRAW, start)
+
+# CAPTURA DE QUADROS
+#
+# Para testes visuais e bots que jogam pelos pixels: com a captura ligada,
+# cada quadro (sem o overlay do profiler) é copiado para um anel de arrays
+# NumPy, ver FrameCapture. Quem roda o jogo sem janela chama capture_frames()
+# e lê frame_capture.latest() depois de cada draw().
+
+frame_capture = None
+
+def capture_frames(size=(WIDTH, HEIGHT), ring=8, grayscale=False, smooth=False):
+    global frame_capture
+    frame_capture = FrameCapture(size, ring, grayscale, smooth)
+    return frame_capture
+
+def stop_capture():
+    global frame_capture
+    frame_capture = None
+
+def draw():
+    start = profiler.begin()
+    draw_screen()
+    if frame_capture is not None:
+        frame_capture.capture(screen.surface)
+    profiler_overlay.draw(screen.surface)
+    profiler.end(PHASE_DRAW, start)
+    profiler.end_frame()
+
+def draw_screen():
+    scenes[-1].draw()
+
+
+# REPLAY
+#
+# Toda partida é gravada em replays/last.rpl (junto com o resultado), para
+# reproduzir bugs sem ninguém no teclado. Com REPLAY=arquivo.rpl no ambiente
+# o jogo reproduz o arquivo em tempo real no lugar do teclado e confere o
+# resultado no fim; para rodar sem janela e sem limite use replay.py.
+
+REPLAY_FILE = os.environ.get('REPLAY')
+replay_source = Recording.load(REPLAY_FILE) if REPLAY_FILE else None
+recording = None
+replay_inputs = None
+
+def begin_run():
+    global recording, replay_inputs
+
+    if replay_source is None:
+        # O replay recomeça de world.reset(seed): a gravação parte do mesmo
+        # estado (o restart do rewinder deixa o World igual ao reset)
+        rewinder.restart()
+        invalidate_background()
+        recording = Recording.start(world)
+        return
+
+    if replay_source.level_crc != world.level_crc:
+        print(f"AVISO: o replay foi gravado em outra versão da fase ({replay_source.level_name})")
+    world.sim_margin = replay_source.sim_margin
+    world.reset(replay_source.seed)
+    rewinder.clear()
+    invalidate_background()
+    replay_inputs = replay_source.iter_inputs()
+
+def end_run():
+    global recording, replay_inputs
+
+    if replay_inputs is not None:
+        problems = replay_source.compare(world)
+        print("Replay: " + ("OK" if not problems else "DIVERGIU - " + ", ".join(problems)))
+        replay_inputs = None
+
+    elif recording is not None and len(recording):
+        recording.finish(world)
+        try:
+            recording.save()
+        except OSError as e:
+            print(f"AVISO: Replay não gravado - {e}")
+
+    recording = None
+
+
+# RANKING
+#
+# Vitórias ficam em scores/ por fase; a gravação é feita por uma thread, e o
+# atexit espera ela terminar ao fechar o jogo. Replays não entram no ranking.
+
+leaderboard = Leaderboard.for_world(world)
+atexit.register(leaderboard.close)
+
+def record_score():
+    if replay_source is not None:
+        return None
+    return leaderboard.add(world.score, world.game_timer)
+
+
+# CORRIDA EM REDE
+#
+# Com GHOST_SERVER=host:porta no ambiente o jogo vira cliente do servidor do
+# net.py: manda o Input de cada tick, desenha o estado interpolado que volta
+# dele e mostra os outros jogadores como fantasmas. Sem resposta do servidor
+# o jogo segue sozinho. Sons e partículas só existem no modo local.
+
+GHOST_SERVER = os.environ.get('GHOST_SERVER')
+net_client = None
+ghosts = []
+
+if GHOST_SERVER:
+    net_client = NetClient(NetClient.parse_address(GHOST_SERVER), world.level_crc)
+    if net_client.connect():
+        atexit.register(net_client.close)
+    else:
+        print(f"AVISO: o servidor {GHOST_SERVER} não respondeu; jogando sem rede")
+        net_client.close()
+        net_client = None
+
+def update_net(dt):
+    net_client.receive()
+    snapshot = net_client.sample(dt)
+    if snapshot is None:
+        return
+    apply_snapshot(world, snapshot, net_client.player_id)
+    invalidate_background()
+    ghosts[:] = net_client.ghosts(snapshot)
+
+
+# REWIND
+#
+# Segurando BACKSPACE o jogo volta no tempo, até REWIND_SECONDS, no ritmo da
+# simulação; soltando, continua dali. Os ticks desfeitos saem também da
+# gravação, então o replay reproduz a partida como ela terminou. O começo de
+# cada partida (begin_run) usa o mesmo buffer: volta ao snapshot do começo
+# da fase (rewind.py).
+
+rewinder = RewindBuffer(world)
+rewinding = False
+
+def rewind_pressed():
+    return keyboard.backspace and replay_inputs is None and net_client is None
+
+def rewind_time(dt):
+    global rewinding
+    rewinding = True
+    ticks = rewinder.rewind(sim_clock.advance(dt))
+    if ticks and recording is not None:
+        del recording.inputs[-ticks:]
+    invalidate_background()
 
 
 # RESET DO JOGO
 
 def reset_game():
-    global game_state, win_timer, score, game_timer
+    global win_timer
     
-    player.reset()
+    end_run()
+    particles.clear()
+    if net_client is not None:
+        net_client.restart()
+        ghosts.clear()
+    invalidate_background()
+    sim_clock.reset()
     win_timer = 0
-    score = 0
-    game_timer = 0
+    begin_run()
 
     if music_on:
         play_menu_music()
 
-    moving_platform_obj.rect.x = moving_platform_obj.limit_left
-    moving_platform_obj.vx = abs(moving_platform_obj.vx)
-    
-    for enemy in enemies:
-        enemy.reset()
-
-    game_state = "playing"
+    set_scene(game_scene)
 
 
 # THE START OF THE GAME
@@ -781,5 +992,9 @@ def reset_game():
 if music_on:
     play_menu_music()
 
+if replay_source is not None:
+    finish_loading()
+    start_game()
+
 
 pgzrun.go()
@@ -0,0 +1,636 @@
+import argparse
+import os
+import select
+import socket
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from engine import SIM_DT, SIM_HZ, SIM_MARGIN, VIEW_MARGIN
+from level import load_world, DEFAULT_LEVEL
+from replay import INPUTS, INPUT_BITS, OUTCOMES, pack_input
+
+# CORRIDA DE FANTASMAS PELA REDE (UDP)
+#
+# Vários jogadores correm a mesma fase, cada um vendo os outros como
+# fantasmas. A simulação de verdade roda num processo servidor, um World por
+# jogador; o cliente só manda o Input de cada tick e desenha o que o servidor
+# devolve. Tudo em UDP, testável em 127.0.0.1:
+#
+#   cliente -> servidor   HELLO (crc da fase), INPUT a cada tick, BYE
+#   servidor -> cliente   WELCOME (id do jogador, seed), SNAPSHOT
+#
+# O INPUT leva também os INPUT_REDUNDANCY ticks anteriores (um byte cada),
+# então um pacote perdido não trava o servidor, que só avança o World de um
+# jogador quando tem o Input do próximo tick. O INPUT confirma (ack) o último
+# snapshot que o cliente decodificou.
+#
+# O SNAPSHOT vai a cada SNAPSHOT_EVERY ticks e tem três seções de entidades,
+# cada uma ordenada pelo id: jogadores (x, y, quadro e flip de todos), as
+# plataformas móveis (x) e os inimigos (x, y, quadro e flip) perto da tela do
+# destinatário. Posições são inteiros em 1/QUANT px. Cada valor vai como a
+# diferença para o mesmo id no último snapshot confirmado pelo cliente (ou o
+# valor inteiro, se o id não estava nele ou não há confirmação), no menor
+# tipo inteiro que cabe, e o conjunto passa pelo zlib. Quase tudo fica parado
+# entre dois snapshots, então o pacote é quase só zeros.
+#
+# O cliente desenha INTERP_TICKS atrás do snapshot mais novo, interpolando
+# entre os dois que cercam esse instante.
+#
+# Servidor: python net.py [--fase ARQ] [--porta N]
+# Jogo:     GHOST_SERVER=127.0.0.1:47800 pgzrun main.py
+
+PORT = 47800
+MAGIC = b'PG'
+HELLO, WELCOME, INPUT, SNAPSHOT, BYE = range(1, 6)
+
+HEADER = struct.Struct('<2sB')
+# crc da fase
+HELLO_PACKET = struct.Struct('<2sBI')
+# id do jogador, seed, crc da fase, sim_margin (-1 = None)
+WELCOME_PACKET = struct.Struct('<2sBBIIi')
+# partida, último tick, ack, quantidade de entradas (seguidas dos bytes)
+INPUT_PACKET = struct.Struct('<2sBBIIB')
+# partida, número, base (0 = sem base), tick, score, tempo (ms), recarga do
+# dash (ms), flags (no chão, pulo duplo, resultado << 2); depois o zlib
+SNAPSHOT_PACKET = struct.Struct('<2sBBIIIiIHB')
+
+QUANT = 8
+SNAPSHOT_EVERY = 2
+INPUT_REDUNDANCY = 8
+INTERP_TICKS = 2 * SNAPSHOT_EVERY
+# Inimigos mandados ficam numa área maior que a desenhada, para a câmera do
+# cliente (interpolada) não mostrar um que ficou de fora
+NET_MARGIN = 2 * VIEW_MARGIN
+# Snapshots guardados para servir de base (servidor e cliente)
+HISTORY = 32
+CLIENT_TIMEOUT = 5.0
+CONNECT_TIMEOUT = 2.0
+
+# Seções do snapshot: nome e colunas (as que são posição são interpoladas)
+SECTIONS = (
+    ('players', ('x', 'y', 'look'), 2),
+    ('platforms', ('x',), 1),
+    ('enemies', ('x', 'y', 'look'), 2),
+)
+INT_TYPES = (np.int8, np.int16, np.int32)
+
+PAUSE_BIT = 1 << INPUT_BITS.index('pause')
+
+
+# CODIFICAÇÃO
+
+
+def pack_ints(values):
+    values = np.ascontiguousarray(values).ravel()
+    if not len(values):
+        return b'\x00'
+    low = int(values.min())
+    high = int(values.max())
+    for code, dtype in enumerate(INT_TYPES):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            break
+    return bytes((code,)) + values.astype(dtype).tobytes()
+
+
+def unpack_ints(data, offset, count):
+    dtype = np.dtype(INT_TYPES[data[offset]])
+    offset += 1
+    values = np.frombuffer(data, dtype, count, offset).astype(np.int64)
+    return values, offset + count * dtype.itemsize
+
+
+# Quadro e flip num número só
+def look(frame, flip_x):
+    return (frame << 1) | flip_x
+
+
+HUD_FIELDS = ('score', 'game_timer', 'dash_cooldown', 'grounded', 'can_double_jump', 'outcome')
+
+
+class Snapshot:
+    __slots__ = ('run', 'seq', 'tick', 'score', 'game_timer', 'dash_cooldown', 'grounded', 'can_double_jump',
+                 'outcome', 'sections')
+
+    def __init__(self, run=0, seq=0, tick=0):
+        self.run = run
+        self.seq = seq
+        self.tick = tick
+        self.score = 0
+        self.game_timer = 0.0
+        self.dash_cooldown = 0.0
+        self.grounded = False
+        self.can_double_jump = False
+        self.outcome = None
+        # nome -> (ids ordenados, valores (n, colunas)), inteiros já quantizados
+        self.sections = {}
+
+    def encode(self, base=None):
+        payload = bytearray()
+        for name, columns, _ in SECTIONS:
+            ids, values = self.sections[name]
+            delta = values.copy()
+            if base is not None:
+                found, rows = match(base.sections[name][0], ids)
+                delta[found] -= base.sections[name][1][rows[found]]
+            payload += struct.pack('<I', len(ids))
+            payload += pack_ints(np.diff(ids, prepend=0))
+            payload += pack_ints(delta)
+
+        flags = self.grounded | (self.can_double_jump << 1) | (OUTCOMES.index(self.outcome) << 2)
+        header = SNAPSHOT_PACKET.pack(MAGIC, SNAPSHOT, self.run, self.seq, base.seq if base else 0, self.tick,
+                                      self.score, round(self.game_timer * 1000),
+                                      min(0xFFFF, max(0, round(self.dash_cooldown * 1000))), flags)
+        return header + zlib.compress(payload)
+
+    # bases: seq -> Snapshot já decodificado. None se a base não existe mais
+    @classmethod
+    def decode(cls, data, bases):
+        _, _, run, seq, base_seq, tick, score, timer_ms, dash_ms, flags = SNAPSHOT_PACKET.unpack_from(data)
+        base = None
+        if base_seq:
+            base = bases.get(base_seq)
+            if base is None:
+                return None
+
+        snapshot = cls(run, seq, tick)
+        snapshot.score = score
+        snapshot.game_timer = timer_ms / 1000
+        snapshot.dash_cooldown = dash_ms / 1000
+        snapshot.grounded = bool(flags & 1)
+        snapshot.can_double_jump = bool(flags & 2)
+        snapshot.outcome = OUTCOMES[flags >> 2]
+
+        payload = zlib.decompress(data[SNAPSHOT_PACKET.size:])
+        offset = 0
+        for name, columns, _ in SECTIONS:
+            count, = struct.unpack_from('<I', payload, offset)
+            offset += 4
+            gaps, offset = unpack_ints(payload, offset, count)
+            values, offset = unpack_ints(payload, offset, count * len(columns))
+            ids = np.cumsum(gaps)
+            values = values.reshape(count, len(columns))
+            if base is not None:
+                found, rows = match(base.sections[name][0], ids)
+                values[found] += base.sections[name][1][rows[found]]
+            snapshot.sections[name] = (ids, values)
+        return snapshot
+
+
+# Para cada id, se ele está em base_ids (ordenado) e em que linha
+def match(base_ids, ids):
+    if not len(base_ids):
+        return np.zeros(len(ids), dtype=bool), np.zeros(len(ids), dtype=np.intp)
+    rows = np.minimum(np.searchsorted(base_ids, ids), len(base_ids) - 1)
+    return base_ids[rows] == ids, rows
+
+
+def section(ids, values, columns):
+    ids = np.asarray(ids, dtype=np.int64)
+    values = np.asarray(values, dtype=np.int64).reshape(len(ids), columns)
+    order = np.argsort(ids, kind='stable')
+    return ids[order], values[order]
+
+
+# O id de cada entidade carregada é o da fase (o mesmo no servidor e no
+# cliente, que abre o mesmo arquivo); objeto -> id
+def entity_ids(world):
+    return {id(entry[0]): entity_id for entity_id, entry in world.streamer.entities.items()}
+
+
+# Estado do World de um jogador, com os fantasmas (players: [(id, x, y, look)])
+def capture(world, players, run=0, seq=0, tick=0):
+    snapshot = Snapshot(run, seq, tick)
+    player = world.player
+    snapshot.score = world.score
+    snapshot.game_timer = world.game_timer
+    snapshot.dash_cooldown = max(0.0, player.dash_cooldown)
+    snapshot.grounded = player.grounded
+    snapshot.can_double_jump = player.can_double_jump
+    snapshot.outcome = world.outcome
+
+    snapshot.sections['players'] = section(
+        [p[0] for p in players], [(round(x * QUANT), round(y * QUANT), value) for _, x, y, value in players], 3)
+
+    ids = entity_ids(world)
+    area = world.view.inflate(2 * NET_MARGIN, 2 * NET_MARGIN)
+    platforms = [p for p in world.moving_platforms if area.colliderect(p.rect)]
+    snapshot.sections['platforms'] = section([ids[id(p)] for p in platforms],
+                                             [round(p.x * QUANT) for p in platforms], 1)
+
+    batch = world.enemy_batch
+    near = batch.overlapping(world.view, NET_MARGIN)
+    enemies = world.enemies
+    values = np.empty((len(near), 3), dtype=np.int64)
+    values[:, 0] = np.rint(batch.x[near] * QUANT)
+    values[:, 1] = np.rint(batch.y[near] * QUANT)
+    values[:, 2] = (batch.frame_index[near].astype(np.int64) << 1) | batch.flip_x[near]
+    snapshot.sections['enemies'] = section([ids[id(enemies[i])] for i in near.tolist()], values, 3)
+    return snapshot
+
+
+# Interpolação entre dois snapshots (a.tick <= tick <= b.tick). Devolve um
+# Snapshot com valores em float; o HUD e o resultado vêm de a
+def interpolate(a, b, tick):
+    t = 0.0 if b.tick == a.tick else (tick - a.tick) / (b.tick - a.tick)
+    result = Snapshot(a.run, a.seq, tick)
+    for name in HUD_FIELDS:
+        setattr(result, name, getattr(a, name))
+    for name, columns, lerped in SECTIONS:
+        ids, values = b.sections[name]
+        values = values.astype(np.float64)
+        a_ids, a_values = a.sections[name]
+        found, rows = match(a_ids, ids)
+        start = a_values[rows[found], :lerped]
+        values[found, :lerped] = start + (values[found, :lerped] - start) * t
+        result.sections[name] = (ids, values)
+    return result
+
+
+# Aplica um snapshot (interpolado) ao World local do cliente, só para o
+# desenho e o HUD; fantasmas ficam de fora
+def apply_snapshot(world, snapshot, player_id):
+    player = world.player
+    ids, values = snapshot.sections['players']
+    found, rows = match(ids, np.array([player_id]))
+    if found[0]:
+        x, y, frame = values[rows[0]]
+        player.x = player.prev_x = x / QUANT
+        player.y = player.prev_y = y / QUANT
+        player.current_frame_index = int(frame) >> 1
+        player.flip_x = bool(int(frame) & 1)
+        player.hitbox.center = (player.x, player.y)
+        world.camera.follow(player.pos)
+        if world.streamer is not None:
+            world.streamer.update(player.x, player.y)
+
+    player.dash_cooldown = snapshot.dash_cooldown
+    player.grounded = snapshot.grounded
+    player.can_double_jump = snapshot.can_double_jump
+    world.score = snapshot.score
+    world.game_timer = snapshot.game_timer
+    world.outcome = snapshot.outcome
+
+    entities = world.streamer.entities
+    ids, values = snapshot.sections['platforms']
+    for entity_id, (x,) in zip(ids.tolist(), (values / QUANT).tolist()):
+        entry = entities.get(entity_id)
+        if entry is not None:
+            platform = entry[0]
+            platform.x = platform.prev_x = x
+            platform.rect.x = x
+
+    batch = world.enemy_batch
+    ids, values = snapshot.sections['enemies']
+    for entity_id, (x, y, frame) in zip(ids.tolist(), values.tolist()):
+        entry = entities.get(entity_id)
+        if entry is None:
+            continue
+        enemy = entry[0]
+        enemy.x = enemy.prev_x = x / QUANT
+        enemy.y = enemy.prev_y = y / QUANT
+        frame = int(frame)
+        enemy.current_frame_index = frame >> 1
+        enemy.flip_x = bool(frame & 1)
+        i = enemy.slot
+        batch.x[i] = batch.prev_x[i] = enemy.x
+        batch.y[i] = batch.prev_y[i] = enemy.y
+
+
+# SERVIDOR
+
+
+# O número da partida é um byte que dá a volta: run é mais novo que current
+# se está até meia volta à frente dele
+def newer_run(run, current):
+    return 0 < (run - current) % 256 < 128
+
+
+class RemotePlayer:
+    def __init__(self, player_id, address, world, seed):
+        self.player_id = player_id
+        self.address = address
+        self.world = world
+        self.seed = seed
+        self.run = 0
+        self.next_tick = 0
+        # tick -> byte de entrada ainda não simulado
+        self.pending = {}
+        self.seq = 0
+        self.last_snapshot_tick = -1
+        # seq -> Snapshot mandado, para servir de base
+        self.history = {}
+        self.ack = 0
+        self.last_seen = time.monotonic()
+
+    def restart(self, run):
+        self.run = run
+        self.world.reset(self.seed)
+        self.next_tick = 0
+        self.pending.clear()
+        self.last_snapshot_tick = -1
+
+    def ghost(self):
+        player = self.world.player
+        return (self.player_id, player.x, player.y, look(player.current_frame_index, player.flip_x))
+
+
+class GhostServer:
+    def __init__(self, level=DEFAULT_LEVEL, host='127.0.0.1', port=PORT, seed=0, sim_margin=SIM_MARGIN):
+        self.level = level
+        self.seed = seed
+        self.sim_margin = sim_margin
+        world = load_world(level)
+        self.level_crc = world.level_crc
+        world.close()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.address = self.sock.getsockname()
+        self.players = {}
+        self.next_id = 0
+        # Contadores, para o benchmark
+        self.bytes_sent = 0
+        self.snapshots_sent = 0
+
+    def serve(self, duration=None):
+        end = None if duration is None else time.monotonic() + duration
+        while end is None or time.monotonic() < end:
+            readable, _, _ = select.select([self.sock], [], [], 0.5)
+            if readable:
+                self.poll()
+            self.drop_idle()
+
+    def poll(self):
+        while True:
+            try:
+                data, address = self.sock.recvfrom(2048)
+            except BlockingIOError:
+                return
+            except ConnectionResetError:
+                # Windows avisa assim que um cliente fechou a porta
+                continue
+            if len(data) < HEADER.size or data[:2] != MAGIC:
+                continue
+            kind = data[2]
+            if kind == HELLO:
+                self.on_hello(data, address)
+            elif kind == INPUT and address in self.players:
+                self.on_input(data, self.players[address])
+            elif kind == BYE:
+                self.drop(address)
+
+    def drop(self, address):
+        remote = self.players.pop(address, None)
+        if remote is not None:
+            remote.world.close()
+
+    def drop_idle(self):
+        now = time.monotonic()
+        for address in [a for a, p in self.players.items() if now - p.last_seen > CLIENT_TIMEOUT]:
+            self.drop(address)
+
+    def on_hello(self, data, address):
+        _, _, level_crc = HELLO_PACKET.unpack_from(data)
+        remote = self.players.get(address)
+        if remote is None:
+            if level_crc != self.level_crc:
+                print(f"AVISO: {address[0]}:{address[1]} está com outra versão da fase")
+            world = load_world(self.level)
+            world.sim_margin = self.sim_margin
+            world.reset(self.seed)
+            remote = self.players[address] = RemotePlayer(self.next_id % 256, address, world, self.seed)
+            self.next_id += 1
+        remote.last_seen = time.monotonic()
+        # HELLO repetido é WELCOME perdido: manda de novo
+        sim_margin = -1 if self.sim_margin is None else self.sim_margin
+        self.sock.sendto(WELCOME_PACKET.pack(MAGIC, WELCOME, remote.player_id, self.seed, self.level_crc,
+                                             sim_margin), address)
+
+    def on_input(self, data, remote):
+        _, _, run, last_tick, ack, count = INPUT_PACKET.unpack_from(data)
+        remote.last_seen = time.monotonic()
+        if run != remote.run:
+            # Pacote atrasado ou repetido de uma partida anterior: descarta,
+            # em vez de reiniciar a partida atual
+            if not newer_run(run, remote.run):
+                return
+            remote.restart(run)
+        if ack > remote.ack and ack in remote.history:
+            remote.ack = ack
+            for seq in [s for s in remote.history if s < ack]:
+                del remote.history[seq]
+
+        inputs = data[INPUT_PACKET.size:INPUT_PACKET.size + count]
+        first = last_tick - len(inputs) + 1
+        for n, bits in enumerate(inputs):
+            if first + n >= remote.next_tick:
+                remote.pending[first + n] = bits
+
+        world = remote.world
+        while world.outcome is None and remote.next_tick in remote.pending:
+            world.step(INPUTS[remote.pending.pop(remote.next_tick)], SIM_DT)
+            remote.next_tick += 1
+
+        # Terminada a partida, cada INPUT é respondido de novo, caso o
+        # último snapshot se perca
+        if remote.next_tick - remote.last_snapshot_tick >= SNAPSHOT_EVERY or world.outcome is not None:
+            self.send_snapshot(remote)
+
+    def send_snapshot(self, remote):
+        remote.seq += 1
+        remote.last_snapshot_tick = remote.next_tick
+        ghosts = [p.ghost() for p in self.players.values()]
+        snapshot = capture(remote.world, ghosts, remote.run, remote.seq, remote.next_tick)
+        data = snapshot.encode(remote.history.get(remote.ack))
+        remote.history[remote.seq] = snapshot
+        if len(remote.history) > HISTORY:
+            del remote.history[min(remote.history)]
+        self.sock.sendto(data, remote.address)
+        self.bytes_sent += len(data)
+        self.snapshots_sent += 1
+
+    def close(self):
+        for address in list(self.players):
+            self.drop(address)
+        self.sock.close()
+
+
+def serve(level=DEFAULT_LEVEL, host='127.0.0.1', port=PORT, seed=0, duration=None):
+    server = GhostServer(level, host, port, seed)
+    try:
+        server.serve(duration)
+    finally:
+        server.close()
+
+
+# CLIENTE
+
+
+class NetClient:
+    def __init__(self, address, level_crc=0):
+        self.server = address
+        self.level_crc = level_crc
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.player_id = None
+        self.seed = 0
+        self.sim_margin = None
+
+        self.run = 0
+        self.tick = 0
+        self.inputs = bytearray()
+        # Snapshots da partida atual, por tick, e todos por seq (bases)
+        self.snapshots = []
+        self.bases = {}
+        self.ack = 0
+        self.clock = None
+
+        # Estatísticas, para o benchmark: bytes e quantidade de snapshots
+        # recebidos, e quando cada tick foi mandado (para a latência)
+        self.bytes_received = 0
+        self.snapshots_received = 0
+        self.sent_at = {}
+        self.latencies = []
+
+    @staticmethod
+    def parse_address(text):
+        host, _, port = text.rpartition(':')
+        return (host or '127.0.0.1', int(port) if port else PORT)
+
+    # Manda HELLO até chegar o WELCOME; False se o servidor não responder
+    def connect(self, timeout=CONNECT_TIMEOUT):
+        end = time.monotonic() + timeout
+        hello = HELLO_PACKET.pack(MAGIC, HELLO, self.level_crc)
+        while time.monotonic() < end:
+            self.sock.sendto(hello, self.server)
+            readable, _, _ = select.select([self.sock], [], [], 0.2)
+            if readable:
+                self.receive()
+                if self.player_id is not None:
+                    return True
+        return False
+
+    def send_input(self, inp):
+        bits = pack_input(inp) & ~PAUSE_BIT
+        self.inputs.append(bits)
+        del self.inputs[:-INPUT_REDUNDANCY]
+        self.sent_at[self.tick] = time.perf_counter()
+        self.sock.sendto(INPUT_PACKET.pack(MAGIC, INPUT, self.run, self.tick, self.ack, len(self.inputs))
+                         + bytes(self.inputs), self.server)
+        self.tick += 1
+
+    # Nova partida: o servidor reinicia o World quando vê o número novo
+    def restart(self):
+        self.run = (self.run + 1) % 256
+        self.tick = 0
+        self.inputs.clear()
+        self.snapshots.clear()
+        self.sent_at.clear()
+        self.clock = None
+
+    def receive(self):
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, ConnectionResetError):
+                return
+            if len(data) < HEADER.size or data[:2] != MAGIC:
+                continue
+            kind = data[2]
+            if kind == WELCOME:
+                _, _, self.player_id, self.seed, level_crc, sim_margin = WELCOME_PACKET.unpack_from(data)
+                self.sim_margin = None if sim_margin < 0 else sim_margin
+                if level_crc != self.level_crc:
+                    print("AVISO: o servidor está com outra versão da fase")
+            elif kind == SNAPSHOT:
+                self.on_snapshot(data)
+
+    def on_snapshot(self, data):
+        snapshot = Snapshot.decode(data, self.bases)
+        if snapshot is None:
+            return
+        self.bytes_received += len(data)
+        self.snapshots_received += 1
+        self.bases[snapshot.seq] = snapshot
+        self.ack = max(self.ack, snapshot.seq)
+        for seq in [s for s in self.bases if s < self.ack - HISTORY]:
+            del self.bases[seq]
+        if snapshot.run != self.run:
+            return
+
+        # O snapshot do tick t vem depois de simular o Input de t - 1
+        sent = self.sent_at.pop(snapshot.tick - 1, None)
+        if sent is not None:
+            self.latencies.append(time.perf_counter() - sent)
+        for tick in [t for t in self.sent_at if t < snapshot.tick]:
+            del self.sent_at[tick]
+
+        snapshots = self.snapshots
+        if snapshots and snapshot.tick <= snapshots[-1].tick:
+            # Fora de ordem: só entra se for de um tick que ainda não tem
+            if any(s.tick == snapshot.tick for s in snapshots):
+                return
+            snapshots.append(snapshot)
+            snapshots.sort(key=lambda s: s.tick)
+        else:
+            snapshots.append(snapshot)
+        del snapshots[:-HISTORY]
+
+    # O que desenhar agora: o relógio anda com o quadro e é puxado para
+    # INTERP_TICKS atrás do snapshot mais novo (ou até ele, quando a partida
+    # acabou, para o resultado aparecer)
+    def sample(self, dt):
+        snapshots = self.snapshots
+        if not snapshots:
+            return None
+        latest = snapshots[-1]
+        target = latest.tick if latest.outcome is not None else latest.tick - INTERP_TICKS
+        if self.clock is None or abs(self.clock - target) > SIM_HZ / 4:
+            self.clock = float(target)
+        else:
+            self.clock += dt * SIM_HZ
+            self.clock += (target - self.clock) * 0.1
+        self.clock = min(self.clock, latest.tick)
+
+        if self.clock <= snapshots[0].tick:
+            return interpolate(snapshots[0], snapshots[0], snapshots[0].tick)
+        for a, b in zip(snapshots, snapshots[1:]):
+            if a.tick <= self.clock <= b.tick:
+                return interpolate(a, b, self.clock)
+        return interpolate(latest, latest, latest.tick)
+
+    def ghosts(self, snapshot):
+        ids, values = snapshot.sections['players']
+        return [(x / QUANT, y / QUANT, int(frame) >> 1, bool(int(frame) & 1))
+                for player_id, (x, y, frame) in zip(ids.tolist(), values.tolist()) if player_id != self.player_id]
+
+    def close(self):
+        try:
+            self.sock.sendto(HEADER.pack(MAGIC, BYE), self.server)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor da corrida de fantasmas")
+    parser.add_argument('--fase', default=DEFAULT_LEVEL)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=PORT)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    print(f"Servidor em {args.host}:{args.porta} ({os.path.basename(args.fase)})")
+    try:
+        serve(args.fase, args.host, args.porta, args.seed)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
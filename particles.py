@@ -0,0 +1,204 @@
+import numpy as np
+import pygame
+
+# PARTÍCULAS (NUMPY)
+#
+# Poeira do pouso, rastro do dash e do pulo duplo, estilhaços da batida num
+# inimigo e os fogos da vitória. O estado de todas as partículas fica em
+# arrays paralelos alocados uma vez, usados como anel: emit() escreve a
+# partir da cabeça e, com o anel cheio, por cima das mais antigas. step()
+# integra velocidade, gravidade, arrasto e idade de todas de uma vez.
+#
+# O desenho não usa blits: com dezenas de milhares de partículas só montar a
+# lista de (superfície, posição) já passa do orçamento do quadro. Cada
+# partícula é um quadrado de SIZE px pintado direto nos pixels da tela
+# (surfarray), com a cor tirada de uma rampa do emissor conforme a idade.
+#
+# As partículas são só visuais e têm o próprio gerador aleatório, então não
+# mexem no World.rng nem nos replays.
+
+CAPACITY = 65536
+SIZE = 3
+# Degraus da rampa de cor de cada emissor, do nascimento ao fim da vida
+COLOR_STEPS = 8
+# Velocidade da queda considerada "normal" no pouso (px/s); quedas mais
+# rápidas soltam mais poeira
+LAND_REFERENCE_VY = 900
+
+
+class Emitter:
+    __slots__ = ('count', 'angle', 'spread', 'speed', 'life', 'gravity', 'drag', 'colors')
+
+    # angle e spread em graus (0 aponta para a direita, 90 para baixo);
+    # speed e life são faixas (mínimo, máximo)
+    def __init__(self, count, angle, spread, speed, life, gravity=0.0, drag=0.0, colors=((255, 255, 255),)):
+        self.count = count
+        self.angle = angle
+        self.spread = spread
+        self.speed = speed
+        self.life = life
+        self.gravity = gravity
+        self.drag = drag
+        self.colors = colors
+
+
+# Nome do efeito (World.effects) -> emissor. O rastro do dash sai para trás:
+# o valor do efeito é a direção, e um valor negativo espelha o ângulo
+EMITTERS = {
+    'dash': Emitter(40, 180, 25, (120, 420), (0.15, 0.35), drag=6.0,
+                    colors=((230, 250, 255), (120, 200, 255), (40, 90, 200))),
+    'double_jump': Emitter(60, 90, 70, (60, 260), (0.2, 0.45), gravity=400, drag=3.0,
+                           colors=((255, 255, 255), (190, 230, 255), (110, 160, 230))),
+    'land': Emitter(30, -90, 80, (40, 200), (0.2, 0.5), gravity=900, drag=4.0,
+                    colors=((235, 220, 190), (190, 170, 140), (130, 120, 110))),
+    'hit': Emitter(300, -90, 180, (100, 650), (0.4, 1.2), gravity=1500, drag=1.0,
+                   colors=((255, 240, 200), (255, 90, 60), (120, 20, 20))),
+    'win': Emitter(1500, -90, 180, (80, 900), (0.8, 2.5), gravity=500, drag=1.2,
+                   colors=((255, 255, 210), (255, 210, 60), (255, 110, 40), (150, 40, 160))),
+}
+
+
+def color_ramp(colors, steps=COLOR_STEPS):
+    stops = np.asarray(colors, dtype=np.float64)
+    if len(stops) == 1:
+        return np.repeat(stops, steps, axis=0).astype(np.uint8)
+    t = np.linspace(0, len(stops) - 1, steps)
+    i = np.minimum(t.astype(np.intp), len(stops) - 2)
+    frac = (t - i)[:, None]
+    return np.rint(stops[i] * (1 - frac) + stops[i + 1] * frac).astype(np.uint8)
+
+
+class ParticleSystem:
+    def __init__(self, capacity=CAPACITY, emitters=EMITTERS, seed=0):
+        self.capacity = capacity
+        self.emitters = dict(emitters)
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+        # Uma rampa de COLOR_STEPS cores por emissor, todas numa paleta só;
+        # ramps guarda onde começa a de cada um
+        self.ramps = {name: n * COLOR_STEPS for n, name in enumerate(self.emitters)}
+        self.palette = np.concatenate([color_ramp(emitter.colors) for emitter in self.emitters.values()])
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.age = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.gravity = np.zeros(capacity)
+        self.drag = np.zeros(capacity)
+        self.ramp = np.zeros(capacity, dtype=np.intp)
+        self._scratch = np.zeros(capacity)
+
+        # Próxima posição do anel e quantas posições do começo estão em uso
+        # (depois da primeira volta, todas)
+        self.head = 0
+        self.used = 0
+        # Partículas vivas depois do último step(), para o HUD e o benchmark
+        self.live = 0
+
+    def __len__(self):
+        return self.live
+
+    def clear(self):
+        self.head = 0
+        self.used = 0
+        self.live = 0
+        self.rng = np.random.default_rng(self.seed)
+
+    def emit(self, name, x, y, value=0):
+        emitter = self.emitters.get(name)
+        if emitter is None:
+            return
+        count = emitter.count
+        angle = emitter.angle if value >= 0 else 180 - emitter.angle
+        if name == 'land':
+            # value é a velocidade da queda
+            count = int(count * min(3.0, value / LAND_REFERENCE_VY))
+        count = min(count, self.capacity)
+        if count <= 0:
+            return
+
+        rng = self.rng
+        idx = (self.head + np.arange(count)) % self.capacity
+        self.head = (self.head + count) % self.capacity
+        self.used = min(self.capacity, self.used + count)
+
+        theta = np.radians(angle + rng.uniform(-emitter.spread, emitter.spread, count))
+        speed = rng.uniform(*emitter.speed, count)
+        self.x[idx] = x + rng.uniform(-SIZE, SIZE, count)
+        self.y[idx] = y + rng.uniform(-SIZE, SIZE, count)
+        self.vx[idx] = np.cos(theta) * speed
+        self.vy[idx] = np.sin(theta) * speed
+        self.age[idx] = 0.0
+        self.life[idx] = rng.uniform(*emitter.life, count)
+        self.gravity[idx] = emitter.gravity
+        self.drag[idx] = emitter.drag
+        self.ramp[idx] = self.ramps[name]
+        self.live = min(self.used, self.live + count)
+
+    # Só visual: roda uma vez por quadro, com o dt do quadro
+    def step(self, dt):
+        n = self.used
+        if not n or not self.live:
+            return
+        age = self.age[:n]
+        vx = self.vx[:n]
+        vy = self.vy[:n]
+        scratch = self._scratch[:n]
+
+        age += dt
+        # Arrasto exponencial, igual para qualquer dt
+        np.multiply(self.drag[:n], -dt, out=scratch)
+        np.exp(scratch, out=scratch)
+        vx *= scratch
+        vy *= scratch
+        np.multiply(self.gravity[:n], dt, out=scratch)
+        vy += scratch
+
+        np.multiply(vx, dt, out=scratch)
+        self.x[:n] += scratch
+        np.multiply(vy, dt, out=scratch)
+        self.y[:n] += scratch
+
+        self.live = int(np.count_nonzero(age < self.life[:n]))
+        # Todas mortas: o anel recomeça e os próximos passos não custam nada
+        if not self.live:
+            self.head = 0
+            self.used = 0
+
+    def draw(self, target, view):
+        n = self.used
+        if not n or not self.live:
+            return
+        width, height = target.get_size()
+        idx = np.flatnonzero(self.age[:n] < self.life[:n])
+        xs = self.x[idx].astype(np.intp)
+        xs -= view.x
+        ys = self.y[idx].astype(np.intp)
+        ys -= view.y
+        visible = (xs >= 0) & (xs <= width - SIZE) & (ys >= 0) & (ys <= height - SIZE)
+        idx = idx[visible]
+        if not len(idx):
+            return
+        xs = xs[visible]
+        ys = ys[visible]
+
+        step = (self.age[idx] / self.life[idx] * COLOR_STEPS).astype(np.intp)
+        np.minimum(step, COLOR_STEPS - 1, out=step)
+        step += self.ramp[idx]
+
+        # Em 32 bits cada pixel é um inteiro só, o que deixa a escrita bem
+        # mais barata; nos outros formatos vai canal por canal
+        if target.get_bytesize() == 4:
+            colors = np.array([target.map_rgb(color) for color in self.palette.tolist()], dtype=np.uint32)[step]
+            pixels = pygame.surfarray.pixels2d(target)
+        else:
+            colors = self.palette[step]
+            pixels = pygame.surfarray.pixels3d(target)
+        for dy in range(SIZE):
+            rows = ys + dy
+            for dx in range(SIZE):
+                pixels[xs + dx, rows] = colors
+        del pixels
@@ -0,0 +1,155 @@
+import json
+import os
+import time
+
+import numpy as np
+
+# PROFILER POR QUADRO
+#
+# Cada fase de update() e draw() marca início e fim com begin()/end(). Os
+# tempos vão para buffers circulares de tamanho fixo (um por quadro e um por
+# evento), então o custo não cresce com o tempo de jogo. Desligado, begin()
+# devolve 0.0 e end() retorna na primeira linha.
+#
+#   start = profiler.begin()
+#   ...
+#   profiler.end(PHASE_PHYSICS, start)
+
+PHASES = ('update', 'input', 'physics', 'collision', 'enemies', 'checks', 'draw', 'world_draw', 'hud_draw')
+(PHASE_UPDATE, PHASE_INPUT, PHASE_PHYSICS, PHASE_COLLISION, PHASE_ENEMIES, PHASE_CHECKS,
+ PHASE_DRAW, PHASE_WORLD_DRAW, PHASE_HUD_DRAW) = range(len(PHASES))
+# Categoria de cada fase no trace do Chrome
+CATEGORIES = ('update',) * PHASE_DRAW + ('draw',) * (len(PHASES) - PHASE_DRAW)
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+
+
+class Profiler:
+    def __init__(self, frame_capacity=1200, event_capacity=32768):
+        self.enabled = False
+        self.clock = time.perf_counter
+
+        # Por quadro: início, tempo de trabalho (update + draw), intervalo
+        # desde o quadro anterior e soma de cada fase
+        self.frame_capacity = frame_capacity
+        self.frame_start = np.zeros(frame_capacity)
+        self.frame_work = np.zeros(frame_capacity)
+        self.frame_interval = np.zeros(frame_capacity)
+        self.phase_time = np.zeros((frame_capacity, len(PHASES)))
+        self.frame_count = 0
+
+        # Cada begin/end vira um evento, para o trace
+        self.event_capacity = event_capacity
+        self.event_phase = np.zeros(event_capacity, dtype=np.int16)
+        self.event_start = np.zeros(event_capacity)
+        self.event_duration = np.zeros(event_capacity)
+        self.event_count = 0
+
+        self._current = [0.0] * len(PHASES)
+        self._frame_start = 0.0
+        self._interval = 0.0
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+        self._frame_start = 0.0
+        self._current = [0.0] * len(PHASES)
+
+    def clear(self):
+        self.frame_count = 0
+        self.event_count = 0
+
+    def begin(self):
+        if not self.enabled:
+            return 0.0
+        return self.clock()
+
+    def end(self, phase, start):
+        if not start:
+            return
+        now = self.clock()
+        duration = now - start
+        self._current[phase] += duration
+
+        i = self.event_count % self.event_capacity
+        self.event_phase[i] = phase
+        self.event_start[i] = start
+        self.event_duration[i] = duration
+        self.event_count += 1
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = self.clock()
+        self._interval = now - self._frame_start if self._frame_start else 0.0
+        self._frame_start = now
+
+    def end_frame(self):
+        if not self.enabled or not self._frame_start:
+            return
+        i = self.frame_count % self.frame_capacity
+        self.frame_start[i] = self._frame_start
+        self.frame_work[i] = self.clock() - self._frame_start
+        self.frame_interval[i] = self._interval
+        self.phase_time[i] = self._current
+        self.frame_count += 1
+        self._current = [0.0] * len(PHASES)
+
+    # Índices dos últimos count quadros, do mais antigo para o mais recente
+    def recent(self, count):
+        count = min(count, self.frame_count, self.frame_capacity)
+        return np.arange(self.frame_count - count, self.frame_count) % self.frame_capacity
+
+    def frame_percentiles(self, count=600, percentiles=(50, 95, 99)):
+        idx = self.recent(count)
+        if not len(idx):
+            return [0.0] * len(percentiles)
+        return (np.percentile(self.frame_work[idx], percentiles) * 1000).tolist()
+
+    def phase_means(self, count=60):
+        idx = self.recent(count)
+        if not len(idx):
+            return [0.0] * len(PHASES)
+        return (self.phase_time[idx].mean(axis=0) * 1000).tolist()
+
+    # TRACE DO CHROME (chrome://tracing ou ui.perfetto.dev)
+
+    def chrome_trace(self, seconds=10.0):
+        frames = self.recent(self.frame_capacity)
+        if not len(frames):
+            return {'traceEvents': [], 'displayTimeUnit': 'ms'}
+        last = frames[-1]
+        cutoff = self.frame_start[last] + self.frame_work[last] - seconds
+        frames = frames[self.frame_start[frames] >= cutoff]
+        origin = self.frame_start[frames[0]]
+
+        count = min(self.event_count, self.event_capacity)
+        events = np.arange(self.event_count - count, self.event_count) % self.event_capacity
+        events = events[self.event_start[events] >= origin]
+
+        trace = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': 'jogo'}},
+                 {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 0, 'args': {'name': 'quadros'}},
+                 {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 1, 'args': {'name': 'fases'}}]
+
+        for start, work, interval in zip(((self.frame_start[frames] - origin) * 1e6).tolist(),
+                                         (self.frame_work[frames] * 1e6).tolist(),
+                                         (self.frame_interval[frames] * 1000).tolist()):
+            trace.append({'name': 'quadro', 'cat': 'frame', 'ph': 'X', 'pid': 1, 'tid': 0,
+                          'ts': start, 'dur': work, 'args': {'intervalo_ms': round(interval, 3)}})
+            trace.append({'name': 'trabalho_ms', 'ph': 'C', 'pid': 1, 'ts': start,
+                          'args': {'ms': round(work / 1000, 3)}})
+
+        for phase, start, duration in zip(self.event_phase[events].tolist(),
+                                          ((self.event_start[events] - origin) * 1e6).tolist(),
+                                          (self.event_duration[events] * 1e6).tolist()):
+            trace.append({'name': PHASES[phase], 'cat': CATEGORIES[phase], 'ph': 'X', 'pid': 1, 'tid': 1,
+                          'ts': start, 'dur': duration})
+
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path=None, seconds=10.0):
+        if path is None:
+            path = os.path.join(PROFILES_DIR, time.strftime('trace-%Y%m%d-%H%M%S.json'))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(seconds), f)
+        return path
@@ -0,0 +1,471 @@
+import os
+import sys
+import time
+import zlib
+from collections import deque
+
+import numpy as np
+from pygame import Rect
+
+from engine import (GRAVITY, JUMP_FORCE, DOUBLE_JUMP_FACTOR, SPEED, DASH_DISTANCE, DASH_COOLDOWN, SIM_DT,
+                    HITBOX_SIZE, SPRITE_SIZE)
+from level import LevelFile, LEVELS_DIR, DEFAULT_LEVEL
+
+# GRAFO DE ALCANCE DOS PULOS
+#
+# Quais plataformas dá para alcançar a partir de quais só depende da física
+# do jogador (pulo, pulo duplo, velocidade e dash) e da geometria da fase.
+# As plataformas só seguram quem vem de cima, então nada bloqueia o caminho:
+# basta saber, para cada diferença de altura, até que distância horizontal o
+# jogador ainda consegue descer sobre o topo de outra plataforma. Essa curva
+# (o envelope do pulo) é calculada uma vez simulando os mesmos passos do
+# engine para todos os momentos possíveis do pulo duplo; cada aresta vira uma
+# consulta na tabela, vetorizada com NumPy sobre as plataformas próximas.
+#
+# Plataformas móveis viram um nó que cobre toda a faixa de movimento (dá para
+# esperar o momento certo); a aresta que chega nela guarda a janela, a faixa
+# de posições da plataforma (x do lado esquerdo) em que o pouso funciona.
+#
+# O grafo fica em cache em levels/cache, com a chave calculada da geometria e
+# das constantes da física; mudar qualquer uma das duas gera outro arquivo.
+#
+# Uso: python reach.py [fase.lvl] [--sem-cache]   (valida se o objetivo é
+# alcançável; sai com código 1 se não for)
+
+VERSION = 1
+CACHE_DIR = os.path.join(LEVELS_DIR, 'cache')
+
+# Plataformas com mais que isso vezes o alcance máximo de largura não entram
+# na janela de vizinhos (ver build_graph)
+WIDE_FACTOR = 4
+
+def physics_key():
+    constants = (VERSION, GRAVITY, JUMP_FORCE, DOUBLE_JUMP_FACTOR, SPEED, DASH_DISTANCE, DASH_COOLDOWN, SIM_DT,
+                 HITBOX_SIZE, SPRITE_SIZE)
+    return zlib.crc32(repr(constants).encode('utf-8'))
+
+
+# ENVELOPE DO PULO
+
+
+class JumpEnvelope:
+    # land[dy + offset]: maior distância horizontal (px) em que o centro do
+    # jogador passa descendo pela altura dy (positivo = para baixo) a partir
+    # da decolagem; -1 se não passa. touch é igual, mas vale também subindo
+    # (para encostar no objetivo, que não precisa de pouso).
+    def __init__(self, land, touch, offset):
+        self.land = land
+        self.touch = touch
+        self.offset = offset
+
+    @classmethod
+    def simulate(cls, max_fall, from_ground=True, dt=SIM_DT):
+        # Do chão: pulo no tick 0 e pulo duplo a partir do tick 2 (a tecla
+        # precisa ser solta entre os dois). No ar (nascendo ou caindo de uma
+        # borda): parado em y e com o pulo duplo disponível desde o tick 0.
+        initial_vy = JUMP_FORCE if from_ground else 0.0
+        first_double = 2 if from_ground else 0
+        double_vy = JUMP_FORCE * DOUBLE_JUMP_FACTOR
+
+        # Quantos ticks até a trajetória sem pulo duplo passar de max_fall;
+        # depois disso um pulo duplo não leva a nenhum pouso novo
+        vy = initial_vy
+        y = 0.0
+        ticks = 0
+        while y <= max_fall:
+            vy += GRAVITY * dt
+            y += vy * dt
+            ticks += 1
+
+        # Estratégia 0 nunca usa o pulo duplo; a estratégia s usa no tick
+        # first_double + s - 1
+        double_tick = np.concatenate(([-1], np.arange(first_double, ticks)))
+        vys = np.full(len(double_tick), float(initial_vy))
+        ys = np.zeros(len(double_tick))
+
+        # Alcance horizontal depois de n ticks: andando sempre e com dash
+        # sempre que recarrega (o primeiro logo no tick 0)
+        rise = int(np.ceil((initial_vy ** 2 + double_vy ** 2) / (2 * GRAVITY))) + 2
+        offset = rise
+        size = rise + int(max_fall) + 1
+        land = np.full(size, -1.0)
+        touch = np.full(size, -1.0)
+
+        n = 0
+        x = 0.0
+        cooldown = 0.0
+        while True:
+            # Mesma ordem do engine: input (andar e dash), depois a recarga
+            x += SPEED * dt
+            if cooldown <= 0:
+                x += DASH_DISTANCE
+                cooldown = DASH_COOLDOWN
+            cooldown -= dt
+
+            np.copyto(vys, double_vy, where=double_tick == n)
+            vys += GRAVITY * dt
+            before = ys.copy()
+            ys += vys * dt
+            n += 1
+
+            lows = np.ceil(np.minimum(before, ys)).astype(int) + offset
+            highs = np.floor(np.maximum(before, ys)).astype(int) + offset + 1
+            np.clip(lows, 0, size, out=lows)
+            np.clip(highs, 0, size, out=highs)
+            falling = (ys > before).tolist()
+            # Os ticks vêm em ordem e o alcance só cresce, então sobrescrever
+            # deixa na tabela o maior alcance de cada altura
+            for low, high, down in zip(lows.tolist(), highs.tolist(), falling):
+                if low < high:
+                    touch[low:high] = x
+                    if down:
+                        land[low:high] = x
+
+            if ys.min() > max_fall:
+                break
+        return cls(land, touch, offset)
+
+    def lookup(self, table, dy):
+        index = np.floor(dy).astype(np.int64) + self.offset
+        valid = (index >= 0) & (index < len(table))
+        return np.where(valid, table[np.clip(index, 0, len(table) - 1)], -1.0)
+
+
+# GEOMETRIA DA FASE
+
+
+class Geometry:
+    # Só o que importa para o alcance, em arrays por plataforma: faixa
+    # horizontal coberta (para as móveis, toda a faixa de movimento), topo,
+    # largura e se é móvel
+    def __init__(self, width, height, spawn, goal, platforms):
+        self.width = width
+        self.height = height
+        self.spawn = spawn
+        self.goal = Rect(goal)
+        # (esquerda, direita, topo, largura, móvel)
+        rows = np.array(platforms, dtype=np.int64).reshape(-1, 5)
+        self.left = rows[:, 0]
+        self.right = rows[:, 1]
+        self.top = rows[:, 2]
+        self.platform_width = rows[:, 3]
+        self.moving = rows[:, 4].astype(bool)
+
+    def __len__(self):
+        return len(self.top)
+
+    @classmethod
+    def from_level(cls, path=DEFAULT_LEVEL):
+        level_file = LevelFile(path)
+        try:
+            platforms = []
+            for kind, record in level_file.all_records():
+                if kind == 'platform':
+                    _, x, y, w, h = record[:5]
+                    platforms.append((x, x + w, y, w, 0))
+                elif kind == 'moving':
+                    _, x, y, w, h, vx, left, right = record[:8]
+                    platforms.append((left, right, y, w, 1))
+            return cls(level_file.width, level_file.height, level_file.spawn, level_file.goal, platforms)
+        finally:
+            level_file.close()
+
+    # Fases com streaming só têm no World os chunks carregados; para elas use
+    # from_level
+    @classmethod
+    def from_world(cls, world):
+        platforms = [(p.rect.left, p.rect.right, p.rect.top, p.rect.width, 0) for p in world.platforms_static]
+        platforms += [(p.limit_left, p.limit_right, p.rect.top, p.rect.width, 1) for p in world.moving_platforms]
+        return cls(world.width, world.height, world.player.spawn, world.goal, platforms)
+
+    def key(self):
+        header = np.array([self.width, self.height, *self.spawn, *self.goal], dtype=np.int64)
+        crc = zlib.crc32(header.tobytes())
+        for array in (self.left, self.right, self.top, self.platform_width, self.moving):
+            crc = zlib.crc32(np.ascontiguousarray(array).tobytes(), crc)
+        return crc ^ physics_key()
+
+
+# GRAFO
+
+
+class ReachGraph:
+    # Grafo dirigido em formato CSR: os sucessores do nó i são
+    # indices[indptr[i]:indptr[i + 1]], com a janela de cada aresta em
+    # window_lo/window_hi (NaN quando o destino é fixa). Os nós são as
+    # plataformas, na ordem da Geometry; lo/hi é a faixa de x que o centro do
+    # jogador pode ocupar em pé sobre cada uma.
+    FIELDS = ('lo', 'hi', 'top', 'moving', 'indptr', 'indices', 'window_lo', 'window_hi', 'start', 'goal_from')
+
+    def __init__(self, lo, hi, top, moving, indptr, indices, window_lo, window_hi, start, goal_from,
+                 spawn_touches_goal=False):
+        self.lo = lo
+        self.hi = hi
+        self.top = top
+        self.moving = moving
+        self.indptr = indptr
+        self.indices = indices
+        self.window_lo = window_lo
+        self.window_hi = window_hi
+        # Nós alcançáveis direto do ponto de nascimento, e nós de onde dá
+        # para encostar no objetivo
+        self.start = start
+        self.goal_from = goal_from
+        self.spawn_touches_goal = spawn_touches_goal
+        self._reachable = None
+        self._lists = None
+
+    def __len__(self):
+        return len(self.top)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def successors(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    # As buscas andam nó a nó, e em listas Python isso é bem mais rápido que
+    # indexar os arrays; convertidos uma vez só, na primeira busca
+    def _adjacency(self):
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.indices.tolist())
+        return self._lists
+
+    def reachable(self, sources=None):
+        # Máscara dos nós alcançáveis a partir de sources (padrão: o
+        # nascimento), em largura
+        use_cache = sources is None
+        if use_cache and self._reachable is not None:
+            return self._reachable
+        if sources is None:
+            sources = self.start
+        indptr, indices = self._adjacency()
+        seen = np.zeros(len(self), dtype=bool)
+        queue = deque()
+        for node in np.asarray(sources).tolist():
+            if not seen[node]:
+                seen[node] = True
+                queue.append(node)
+        while queue:
+            node = queue.popleft()
+            for nxt in indices[indptr[node]:indptr[node + 1]]:
+                if not seen[nxt]:
+                    seen[nxt] = True
+                    queue.append(nxt)
+        if use_cache:
+            self._reachable = seen
+        return seen
+
+    def goal_reachable(self):
+        return self.spawn_touches_goal or bool((self.reachable() & self.goal_from).any())
+
+    # Menor sequência de plataformas de src até dst (inclusive), ou None;
+    # é o que um inimigo perseguidor usa para planejar os pulos
+    def path(self, src, dst):
+        if src == dst:
+            return [src]
+        indptr, indices = self._adjacency()
+        parent = {src: None}
+        queue = deque([src])
+        while queue:
+            node = queue.popleft()
+            for nxt in indices[indptr[node]:indptr[node + 1]]:
+                if nxt in parent:
+                    continue
+                parent[nxt] = node
+                if nxt == dst:
+                    route = [dst]
+                    while parent[route[-1]] is not None:
+                        route.append(parent[route[-1]])
+                    return route[::-1]
+                queue.append(nxt)
+        return None
+
+    # Plataforma sobre a qual está um corpo com a base em bottom (o topo mais
+    # alto que não fica acima dela, com tolerância de alguns px); -1 se nenhuma
+    def node_at(self, x, bottom, tolerance=2):
+        candidates = (self.lo < x) & (self.hi > x) & (self.top >= bottom - tolerance)
+        if not candidates.any():
+            return -1
+        tops = np.where(candidates, self.top, np.iinfo(self.top.dtype).max)
+        node = int(tops.argmin())
+        return node if tops[node] <= bottom + tolerance else -1
+
+    def window(self, edge):
+        return self.window_lo[edge], self.window_hi[edge]
+
+    # CACHE EM DISCO
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        arrays = {name: getattr(self, name) for name in self.FIELDS}
+        # Grava num temporário e troca, para uma leitura nunca pegar meio arquivo
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, version=VERSION, spawn_touches_goal=self.spawn_touches_goal, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != VERSION:
+                raise ValueError(f"{path}: versão do grafo não suportada")
+            return cls(*(data[name] for name in cls.FIELDS), bool(data['spawn_touches_goal']))
+
+
+def build_graph(geometry):
+    g = geometry
+    half = HITBOX_SIZE / 2
+    # O centro do jogador fica preso entre as bordas da fase
+    edge = SPRITE_SIZE / 2
+    lo = np.clip(g.left - half, edge, g.width - edge)
+    hi = np.clip(g.right + half, edge, g.width - edge)
+    top = g.top
+    count = len(g)
+
+    envelope = JumpEnvelope.simulate(g.height, from_ground=True)
+    land = envelope.land
+
+    # Vizinhos candidatos: ordenados pelo lo, só os que começam perto o
+    # bastante para algum pulo alcançar. As plataformas bem mais largas que
+    # um pulo (o chão, por exemplo) aumentariam essa janela para a fase
+    # inteira; elas ficam de fora e entram sempre como candidatas
+    max_reach = land.max()
+    span = hi - lo
+    wide = span > WIDE_FACTOR * max_reach
+    wide_nodes = np.flatnonzero(wide)
+    narrow = np.flatnonzero(~wide)
+    order = narrow[np.argsort(lo[narrow], kind='stable')]
+    sorted_lo = lo[order]
+    max_span = span[narrow].max() if len(narrow) else 0.0
+
+    counts = np.zeros(count, dtype=np.int64)
+    targets = []
+    windows_lo = []
+    windows_hi = []
+    for a in range(count):
+        a_lo = lo[a]
+        a_hi = hi[a]
+        first = np.searchsorted(sorted_lo, a_lo - max_reach - max_span, side='left')
+        last = np.searchsorted(sorted_lo, a_hi + max_reach, side='right')
+        b = np.concatenate((order[first:last], wide_nodes))
+        b = b[b != a]
+        reach = envelope.lookup(land, top[b] - top[a])
+        gap = np.maximum(np.maximum(lo[b] - a_hi, a_lo - hi[b]), 0.0)
+        ok = (reach >= 0) & (gap <= reach)
+        if not ok.any():
+            continue
+        # Sucessores em ordem de índice, como na Geometry
+        keep = np.argsort(b[ok], kind='stable')
+        b = b[ok][keep]
+        reach = reach[ok][keep]
+
+        # Janela das móveis: posições do lado esquerdo da plataforma em que
+        # a faixa de pouso dela cruza a faixa alcançável a partir de a
+        moving = g.moving[b]
+        width = g.platform_width[b]
+        w_lo = np.maximum(g.left[b], a_lo - reach - width - half)
+        w_hi = np.minimum(g.right[b] - width, a_hi + reach + half)
+        windows_lo.append(np.where(moving, w_lo, np.nan))
+        windows_hi.append(np.where(moving, w_hi, np.nan))
+        targets.append(b)
+        counts[a] = len(b)
+
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    if targets:
+        indices = np.concatenate(targets).astype(np.int32)
+        window_lo = np.concatenate(windows_lo)
+        window_hi = np.concatenate(windows_hi)
+    else:
+        indices = np.zeros(0, dtype=np.int32)
+        window_lo = np.zeros(0)
+        window_hi = np.zeros(0)
+
+    # Objetivo: o centro do jogador precisa entrar na área do goal aumentada
+    # pela meia hitbox (y em (top - meia, bottom + meia), o mesmo em x).
+    # Alcance máximo para cada faixa de alturas com uma janela deslizante.
+    goal = g.goal
+    goal_lo = goal.left - half
+    goal_hi = goal.right + half
+    span = goal.height + HITBOX_SIZE - 1
+    best_touch = touch_window(envelope, span)
+    # Centro em pé: top - meia; primeira altura dentro do goal: goal.top - meia + 1
+    first_dy = goal.top - top + 1
+    goal_reach = envelope.lookup(best_touch, first_dy)
+    goal_gap = np.maximum(np.maximum(goal_lo - hi, lo - goal_hi), 0.0)
+    goal_from = (goal_reach >= 0) & (goal_gap <= goal_reach)
+
+    # Nascimento: no ar, parado, com o pulo duplo disponível
+    air = JumpEnvelope.simulate(g.height, from_ground=False)
+    spawn_x, spawn_y = g.spawn
+    # Centro em pé sobre a plataforma: top - meia
+    reach = air.lookup(air.land, top - half - spawn_y)
+    gap = np.maximum(np.maximum(lo - spawn_x, spawn_x - hi), 0.0)
+    start = np.flatnonzero((reach >= 0) & (gap <= reach))
+    spawn_reach = air.lookup(touch_window(air, span), np.array([goal.top - half - spawn_y + 1]))[0]
+    spawn_gap = max(goal_lo - spawn_x, spawn_x - goal_hi, 0.0)
+    spawn_touches_goal = bool(spawn_reach >= 0 and spawn_gap <= spawn_reach)
+
+    return ReachGraph(lo, hi, top, g.moving, indptr, indices, window_lo, window_hi, start, goal_from,
+                      spawn_touches_goal)
+
+
+# Maior alcance em que o centro passa por alguma das span alturas seguidas a
+# partir de cada dy
+def touch_window(envelope, span):
+    padded = np.concatenate((envelope.touch, np.full(span, -1.0)))
+    return np.lib.stride_tricks.sliding_window_view(padded, span).max(axis=1)
+
+
+def cache_path(geometry, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{geometry.key():08x}.npz")
+
+
+# Grafo da geometria, do cache quando existir; use_cache=False sempre recalcula
+def graph_for(geometry, cache_dir=CACHE_DIR, use_cache=True):
+    path = cache_path(geometry, cache_dir)
+    if use_cache and os.path.exists(path):
+        try:
+            return ReachGraph.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"AVISO: Cache do grafo ignorado - {e}")
+
+    graph = build_graph(geometry)
+    if use_cache:
+        try:
+            graph.save(path)
+        except OSError as e:
+            print(f"AVISO: Cache do grafo não gravado - {e}")
+    return graph
+
+
+def graph_for_level(path=DEFAULT_LEVEL, cache_dir=CACHE_DIR, use_cache=True):
+    return graph_for(Geometry.from_level(path), cache_dir, use_cache)
+
+
+def main(args):
+    use_cache = '--sem-cache' not in args
+    paths = [arg for arg in args if not arg.startswith('--')]
+    path = paths[0] if paths else DEFAULT_LEVEL
+
+    start = time.perf_counter()
+    geometry = Geometry.from_level(path)
+    cached = use_cache and os.path.exists(cache_path(geometry))
+    graph = graph_for(geometry, use_cache=use_cache)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    reachable = graph.reachable()
+    print(f"{os.path.basename(path)}: {len(graph)} plataformas, {graph.num_edges} arestas "
+          f"({'cache' if cached else 'calculado'} em {elapsed:.1f} ms)")
+    print(f"Alcançáveis a partir do nascimento: {int(reachable.sum())} de {len(graph)}")
+    if graph.goal_reachable():
+        print("Objetivo alcançável")
+        return 0
+    print("AVISO: Objetivo inalcançável")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,340 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+from pgzero import ptext
+
+from profiler import PHASES
+
+# CACHES DE DESENHO
+#
+# Tudo aqui trabalha direto com pygame.Surface, sem depender do runtime do
+# pgzero (só do ptext, que é um módulo independente), para poder ser usado
+# também nos benchmarks e nos modos sem janela.
+
+
+# FUNDO ESTÁTICO
+
+
+class BackgroundCache:
+    # O fundo estático é dividido em blocos de tile_size px. bake(surface, area)
+    # desenha o conteúdo de uma área do mundo no bloco; cada bloco só é
+    # desenhado de novo quando algo estático dentro dele muda. Os blocos
+    # usados há mais tempo são descartados quando passam de max_tiles.
+    def __init__(self, bake, tile_size=512, max_tiles=64):
+        self.bake = bake
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self.tiles = OrderedDict()
+
+    def invalidate(self, rect=None):
+        if rect is None:
+            self.tiles.clear()
+            return
+        size = self.tile_size
+        for ty in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for tx in range(rect.left // size, (rect.right - 1) // size + 1):
+                self.tiles.pop((tx, ty), None)
+
+    def tile(self, tx, ty):
+        key = (tx, ty)
+        surface = self.tiles.get(key)
+        if surface is not None:
+            self.tiles.move_to_end(key)
+            return surface
+
+        size = self.tile_size
+        surface = pygame.Surface((size, size))
+        self.bake(surface, pygame.Rect(tx * size, ty * size, size, size))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        self.tiles[key] = surface
+        if len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+        return surface
+
+    def draw(self, target, view):
+        size = self.tile_size
+        for ty in range(view.top // size, (view.bottom - 1) // size + 1):
+            for tx in range(view.left // size, (view.right - 1) // size + 1):
+                target.blit(self.tile(tx, ty), (tx * size - view.x, ty * size - view.y))
+
+
+# TEXTO
+
+
+# Fração da largura/altura do texto usada como âncora, igual ao ptext
+ANCHORS = {
+    'topleft': (0, 0),
+    'midtop': (0.5, 0),
+    'topright': (1, 0),
+    'midleft': (0, 0.5),
+    'center': (0.5, 0.5),
+    'midright': (1, 0.5),
+    'bottomleft': (0, 1),
+    'midbottom': (0.5, 1),
+    'bottomright': (1, 1),
+}
+
+
+class TextCache:
+    # Guarda as superfícies de texto já renderizadas (contorno incluído) e
+    # descarta as usadas há mais tempo quando passa de max_entries
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, fontsize=None, color=None, owidth=None, ocolor=None, align=None):
+        key = (text, fontsize, color, owidth, ocolor, align)
+        entries = self.entries
+        surf = entries.get(key)
+        if surf is not None:
+            entries.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = ptext.getsurf(text, fontsize=fontsize, color=color, owidth=owidth, ocolor=ocolor,
+                             align=align, cache=False)
+        entries[key] = surf
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        return surf
+
+    def layout(self, text, fontsize=None, color=None, owidth=None, ocolor=None, **anchor):
+        (name, (x, y)), = anchor.items()
+        hanchor, vanchor = ANCHORS[name]
+        surf = self.render(text, fontsize, color, owidth, ocolor, hanchor)
+        x = int(round(x - hanchor * surf.get_width()))
+        y = int(round(y - vanchor * surf.get_height()))
+        return surf, (x, y)
+
+    def draw(self, surface, text, fontsize=None, color=None, owidth=None, ocolor=None, **anchor):
+        surf, pos = self.layout(text, fontsize, color, owidth, ocolor, **anchor)
+        surface.blit(surf, pos)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class TextWidget:
+    # Texto de HUD numa posição fixa: só volta ao cache quando o texto ou a
+    # cor mudam, nos outros quadros é só um blit
+    def __init__(self, cache, fontsize=None, color=None, owidth=None, ocolor=None, **anchor):
+        self.cache = cache
+        self.fontsize = fontsize
+        self.color = color
+        self.owidth = owidth
+        self.ocolor = ocolor
+        self.anchor = anchor
+        self.last = None
+        self.surf = None
+        self.pos = None
+
+    def draw(self, surface, text, color=None):
+        color = self.color if color is None else color
+        if (text, color) != self.last:
+            self.last = (text, color)
+            self.surf, self.pos = self.cache.layout(text, self.fontsize, color, self.owidth, self.ocolor,
+                                                    **self.anchor)
+        surface.blit(self.surf, self.pos)
+
+
+# PROFILER
+
+
+class ProfilerOverlay:
+    # Gráfico do tempo de trabalho dos últimos quadros, percentis e média de
+    # cada fase. Os textos só são refeitos a cada refresh_frames quadros, para
+    # o próprio overlay não encher o cache de texto nem pesar no gráfico.
+    GRAPH_SIZE = (240, 60)
+    # Tempo que ocupa a altura toda do gráfico; a linha marca 60 FPS
+    GRAPH_MAX_MS = 33.3
+    TARGET_MS = 1000 / 60
+    LINE_HEIGHT = 14
+
+    def __init__(self, profiler, text_cache, topleft, refresh_frames=15):
+        self.profiler = profiler
+        self.text_cache = text_cache
+        self.topleft = topleft
+        self.refresh_frames = refresh_frames
+        self.visible = False
+        self.lines = []
+        self.last_refresh = None
+
+        width, height = self.GRAPH_SIZE
+        self.panel = pygame.Surface((width + 10, height + 16 + self.LINE_HEIGHT * (len(PHASES) + 2)),
+                                    pygame.SRCALPHA)
+        self.panel.fill((0, 0, 0, 170))
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.last_refresh = None
+
+    def refresh(self):
+        profiler = self.profiler
+        p50, p95, p99 = profiler.frame_percentiles()
+        idx = profiler.recent(60)
+        interval = profiler.frame_interval[idx].mean() * 1000 if len(idx) else 0.0
+        fps = 1000 / interval if interval else 0.0
+        self.lines = [(f"{fps:.1f} FPS", "ms por quadro"),
+                      (f"p50 {p50:.2f}", f"p95 {p95:.2f}  p99 {p99:.2f}")]
+        for name, ms in zip(PHASES, profiler.phase_means()):
+            self.lines.append((name, f"{ms:.3f}"))
+        self.last_refresh = profiler.frame_count
+
+    def draw(self, surface):
+        if not self.visible:
+            return
+        profiler = self.profiler
+        if self.last_refresh is None or profiler.frame_count - self.last_refresh >= self.refresh_frames:
+            self.refresh()
+
+        x, y = self.topleft
+        width, height = self.GRAPH_SIZE
+        surface.blit(self.panel, (x, y))
+        gx, gy = x + 5, y + 5
+        bottom = gy + height
+
+        scale = height / self.GRAPH_MAX_MS
+        target_y = bottom - int(self.TARGET_MS * scale)
+        pygame.draw.line(surface, (255, 255, 0), (gx, target_y), (gx + width - 1, target_y))
+
+        limit = bottom - target_y
+        idx = profiler.recent(width)
+        heights = (profiler.frame_work[idx] * 1000 * scale).clip(1, height).astype(int).tolist()
+        offset = width - len(heights)
+        for i, h in enumerate(heights):
+            color = (100, 255, 100) if h <= limit else (255, 100, 100)
+            pygame.draw.line(surface, color, (gx + offset + i, bottom - 1), (gx + offset + i, bottom - h))
+
+        text_y = bottom + 6
+        for left, right in self.lines:
+            self.text_cache.draw(surface, left, fontsize=14, color="white", topleft=(gx, text_y))
+            self.text_cache.draw(surface, right, fontsize=14, color="white", topright=(gx + width, text_y))
+            text_y += self.LINE_HEIGHT
+
+
+# CAPTURA DE QUADROS
+
+
+# Pesos de luminância (BT.601) em inteiros, somando 256
+GRAY_WEIGHTS = (77, 150, 29)
+
+
+class FrameCapture:
+    # Copia cada quadro desenhado para um anel de `ring` arrays NumPy
+    # (altura, largura, 3) em RGB, ou (altura, largura) com grayscale=True,
+    # todos alocados uma vez só. A leitura usa surfarray.pixels3d, que é uma
+    # view da memória da superfície, então o custo por quadro é só a cópia
+    # (ou a conta do cinza) para o anel. Com size menor que a tela o quadro
+    # é reduzido direto numa superfície de destino fixa (transform.scale com
+    # dest), sem criar superfícies novas a cada quadro.
+    #
+    # capture() devolve o array do quadro; ele continua válido até o anel dar
+    # a volta (`ring` capturas depois). Para guardar por mais tempo, copie.
+    def __init__(self, size, ring=8, grayscale=False, smooth=False):
+        self.size = tuple(size)
+        self.grayscale = grayscale
+        self.smooth = smooth
+        self.count = 0
+
+        width, height = self.size
+        shape = (height, width) if grayscale else (height, width, 3)
+        self.frames = np.zeros((ring,) + shape, dtype=np.uint8)
+        # Somas intermediárias do cinza (cabem em 16 bits: 255 * 256)
+        self._gray = np.zeros((height, width), dtype=np.uint16)
+        self._channel = np.zeros((height, width), dtype=np.uint16)
+        self._target = None
+
+    def target_for(self, surface):
+        if surface.get_size() == self.size:
+            return surface
+        target = self._target
+        if target is None or target.get_bitsize() != surface.get_bitsize():
+            target = self._target = pygame.Surface(self.size, 0, surface)
+        if self.smooth:
+            pygame.transform.smoothscale(surface, self.size, target)
+        else:
+            pygame.transform.scale(surface, self.size, target)
+        return target
+
+    def capture(self, surface):
+        frame = self.frames[self.count % len(self.frames)]
+        # surfarray é (largura, altura); transpor cada canal não copia nada, e
+        # copiar canal por canal segue a ordem da memória da superfície
+        pixels = pygame.surfarray.pixels3d(self.target_for(surface))
+        if self.grayscale:
+            gray = self._gray
+            channel = self._channel
+            np.multiply(pixels[..., 0].T, GRAY_WEIGHTS[0], out=gray, dtype=np.uint16)
+            for c in (1, 2):
+                np.multiply(pixels[..., c].T, GRAY_WEIGHTS[c], out=channel, dtype=np.uint16)
+                gray += channel
+            np.right_shift(gray, 8, out=frame, casting='unsafe')
+        else:
+            for c in range(3):
+                np.copyto(frame[..., c], pixels[..., c].T)
+        # Solta a trava da superfície antes do próximo blit
+        del pixels
+        self.count += 1
+        return frame
+
+    def latest(self):
+        if not self.count:
+            return None
+        return self.frames[(self.count - 1) % len(self.frames)]
+
+    # Os últimos count quadros ainda no anel, do mais antigo para o mais
+    # recente (cópia, já que o anel não é contíguo na ordem do tempo)
+    def recent(self, count=None):
+        ring = len(self.frames)
+        count = min(ring if count is None else count, self.count, ring)
+        return self.frames[np.arange(self.count - count, self.count) % ring]
+
+
+# TELAS CONGELADAS
+
+
+def fill_translucent(surface, color):
+    # Mesmo efeito de um blit de uma camada RGBA inteira dessa cor, sem
+    # alocar a camada: multiplica por (1 - alfa) e soma cor * alfa
+    r, g, b, a = color
+    keep = 255 - a
+    surface.fill((keep, keep, keep), special_flags=pygame.BLEND_RGB_MULT)
+    surface.fill((r * a // 255, g * a // 255, b * a // 255), special_flags=pygame.BLEND_RGB_ADD)
+
+
+class FrozenFrame:
+    # Uma tela montada uma vez (por exemplo o último quadro do jogo,
+    # escurecido, com os textos e botões fixos por cima) e depois só copiada.
+    # A superfície é alocada no primeiro capture() e reaproveitada; quem usa
+    # chama invalidate() quando algo do conteúdo fixo muda.
+    def __init__(self, size):
+        self.size = size
+        self.surface = None
+        self.valid = False
+
+    def invalidate(self):
+        self.valid = False
+
+    def capture(self, source):
+        if self.surface is None:
+            self.surface = pygame.Surface(self.size, 0, source)
+        self.surface.blit(source, (0, 0))
+        self.valid = True
+
+    def draw(self, target):
+        target.blit(self.surface, (0, 0))
+
+
+# O pygame-ce tem fblits, mais rápido (sem montar a lista de retângulos);
+# no pygame normal fica o blits sem retorno
+if hasattr(pygame.Surface, 'fblits'):
+    def blit_batch(target, items):
+        target.fblits(items)
+else:
+    def blit_batch(target, items):
+        target.blits(items, doreturn=False)
@@ -0,0 +1,195 @@
+import os
+import struct
+import sys
+import time
+import zlib
+
+from engine import World, Input, SIM_HZ, SIM_DT
+from level import load_world, LEVELS_DIR
+
+# GRAVAÇÃO E REPLAY DE ENTRADAS
+#
+# A simulação é determinística (passo fixo, sem relógio nem aleatoriedade fora
+# do World.rng), então guardar o Input de cada tick basta para reproduzir uma
+# partida inteira. Arquivo binário little-endian:
+#
+#   cabeçalho   HEADER (inclui o resultado esperado da partida)
+#   nome da fase (utf-8)
+#   entradas    um byte por tick (bits de INPUT_BITS), comprimidos com zlib
+#
+# Uso: python replay.py arquivo.rpl [--vezes N]   (roda sem janela, o mais
+# rápido possível, e confere o resultado)
+
+MAGIC = b'PGRP'
+# 2: colisão contínua do jogador (replays da versão 1 divergem)
+VERSION = 2
+
+# magic, versão, Hz da simulação, seed, crc da fase, sim_margin (-1 = None),
+# ticks, score, game_timer, outcome, tamanho do nome, tamanho das entradas
+HEADER = struct.Struct('<4sHHIIiIidBHI')
+
+INPUT_BITS = ('left', 'right', 'jump', 'dash', 'down', 'pause')
+
+# Todas as combinações possíveis, para o replay não criar um Input por tick
+INPUTS = tuple(Input(*(bool(bits & (1 << n)) for n in range(len(INPUT_BITS))))
+               for bits in range(1 << len(INPUT_BITS)))
+
+OUTCOMES = (None, "gameover", "win")
+
+REPLAYS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'replays')
+LAST_REPLAY = os.path.join(REPLAYS_DIR, 'last.rpl')
+
+
+def pack_input(inp):
+    bits = 0
+    for n, name in enumerate(INPUT_BITS):
+        if getattr(inp, name):
+            bits |= 1 << n
+    return bits
+
+
+class Recording:
+    def __init__(self, level_name='', level_crc=0, seed=0, sim_margin=None):
+        self.level_name = level_name
+        self.level_crc = level_crc
+        self.seed = seed
+        self.sim_margin = sim_margin
+        self.inputs = bytearray()
+        # Preenchidos por finish()
+        self.score = 0
+        self.game_timer = 0.0
+        self.outcome = None
+
+    @classmethod
+    def start(cls, world):
+        return cls(world.level_name, world.level_crc, world.seed, world.sim_margin)
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def record(self, inp):
+        self.inputs.append(pack_input(inp))
+
+    def finish(self, world):
+        self.score = world.score
+        self.game_timer = world.game_timer
+        self.outcome = world.outcome
+
+    def iter_inputs(self):
+        for bits in self.inputs:
+            yield INPUTS[bits]
+
+    def save(self, path=LAST_REPLAY):
+        name = self.level_name.encode('utf-8')
+        packed = zlib.compress(bytes(self.inputs), 9)
+        sim_margin = -1 if self.sim_margin is None else self.sim_margin
+        header = HEADER.pack(MAGIC, VERSION, SIM_HZ, self.seed, self.level_crc, sim_margin, len(self.inputs),
+                             self.score, self.game_timer, OUTCOMES.index(self.outcome), len(name), len(packed))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(header)
+            f.write(name)
+            f.write(packed)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        (magic, version, sim_hz, seed, level_crc, sim_margin, ticks, score, game_timer, outcome,
+         name_size, packed_size) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} não é um replay")
+        if version != VERSION:
+            raise ValueError(f"{path}: versão {version} não suportada (esperado {VERSION})")
+        if sim_hz != SIM_HZ:
+            raise ValueError(f"{path}: gravado a {sim_hz} Hz, a simulação roda a {SIM_HZ} Hz")
+
+        offset = HEADER.size
+        level_name = data[offset:offset + name_size].decode('utf-8')
+        offset += name_size
+        inputs = zlib.decompress(data[offset:offset + packed_size])
+        if len(inputs) != ticks:
+            raise ValueError(f"{path}: {len(inputs)} ticks gravados, cabeçalho diz {ticks}")
+
+        recording = cls(level_name, level_crc, seed, None if sim_margin < 0 else sim_margin)
+        recording.inputs = bytearray(inputs)
+        recording.score = score
+        recording.game_timer = game_timer
+        recording.outcome = OUTCOMES[outcome]
+        return recording
+
+    # Lista as diferenças entre o fim gravado e o estado do mundo
+    def compare(self, world):
+        problems = []
+        if world.score != self.score:
+            problems.append(f"score {world.score} (gravado {self.score})")
+        if world.game_timer != self.game_timer:
+            problems.append(f"game_timer {world.game_timer!r} (gravado {self.game_timer!r})")
+        if world.outcome != self.outcome:
+            problems.append(f"outcome {world.outcome} (gravado {self.outcome})")
+        return problems
+
+
+# Monta o mundo no mesmo estado do início da gravação
+def world_for(recording):
+    if recording.level_name:
+        world = load_world(os.path.join(LEVELS_DIR, recording.level_name))
+        if world.level_crc != recording.level_crc:
+            print(f"AVISO: a fase {recording.level_name} mudou desde a gravação; o replay pode divergir")
+    else:
+        world = World()
+    world.sim_margin = recording.sim_margin
+    world.reset(recording.seed)
+    return world
+
+
+# Roda o replay sem janela e sem limite de velocidade
+def run(recording, world=None):
+    if world is None:
+        world = world_for(recording)
+    step = world.step
+    for inp in recording.iter_inputs():
+        step(inp, SIM_DT)
+        if world.outcome:
+            break
+    return world
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("uso: python replay.py arquivo.rpl [--vezes N]")
+        return 2
+    path = sys.argv[1]
+    repeats = int(sys.argv[sys.argv.index('--vezes') + 1]) if '--vezes' in sys.argv else 1
+
+    recording = Recording.load(path)
+    print(f"{path}: {len(recording)} ticks ({len(recording) / SIM_HZ:.1f} s de jogo), "
+          f"fase '{recording.level_name or 'padrão'}', seed {recording.seed}")
+
+    best = None
+    world = None
+    for _ in range(repeats):
+        if world is not None:
+            world.close()
+        world = world_for(recording)
+        start = time.perf_counter()
+        run(recording, world)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    world.close()
+    best = max(best, 1e-9)
+
+    print(f"Simulado em {best * 1000:.1f} ms ({len(recording) / best:,.0f} ticks/s, "
+          f"{len(recording) / SIM_HZ / best:.0f}x tempo real)")
+
+    problems = recording.compare(world)
+    if problems:
+        print("DIVERGIU: " + ", ".join(problems))
+        return 1
+    print(f"OK: score {world.score}, {world.game_timer:.2f} s, outcome {world.outcome}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+import numpy as np
+
+from engine import SIM_HZ
+from replay import OUTCOMES
+
+# REWIND E RESTART POR SNAPSHOT
+#
+# O estado que muda durante a partida (jogador, score, tempo, inimigos e
+# plataformas móveis) cabe num registro binário de layout fixo: um array
+# float64 com os campos do jogador e do World no começo, depois um bloco por
+# inimigo da fase e um por plataforma móvel da fase, carregados ou não. Com
+# streaming, o lugar de cada entidade no registro vem do id dela no arquivo
+# da fase; a flag loaded diz se ela estava carregada na captura.
+#
+# Entidades que não vieram da fase (spawn_enemy durante o jogo, benchmarks)
+# ganham um bloco novo no fim do registro na primeira vez que aparecem. O
+# registro só cresce: registros e deltas antigos continuam valendo, com as
+# palavras novas zeradas (loaded = 0). restore() não cria nem remove
+# entidades, só devolve o estado das que estão no World e estavam na captura.
+#
+# capture() e restore() copiam o World para o registro e de volta, os
+# inimigos direto dos arrays do EnemyBatch. O mesmo par serve para o restart
+# (o snapshot do começo é restaurado, sem o reset campo a campo do World) e
+# para o RewindBuffer, que guarda os últimos REWIND_SECONDS de ticks.
+#
+# O RewindBuffer guarda o registro atual e, por tick, só as palavras de 64
+# bits que mudaram: posição e XOR com o valor anterior. O XOR vale para os
+# dois lados, então voltar um tick é aplicar o último delta de novo. Os
+# deltas ficam em arrays pré-alocados usados como anel: com ele cheio (de
+# ticks ou de palavras), os mais antigos são descartados. Voltar descarta o
+# futuro, como no rewind dos jogos.
+#
+# World.rng não entra no registro: a simulação não sorteia nada depois do
+# reset (restart() volta a semente dele).
+
+REWIND_SECONDS = 10
+# Palavras de delta guardadas por tick de capacidade, em média
+POOL_WORDS_PER_TICK = 64
+
+PLAYER_FIELDS = ('x', 'y', 'prev_x', 'prev_y', 'vy', 'dash_cooldown', 'grounded', 'can_double_jump', 'flip_x',
+                 'current_frame_index', 'alive', 'jump_pressed')
+WORLD_FIELDS = ('score', 'game_timer', 'outcome')
+ENEMY_FIELDS = ('x', 'y', 'vx', 'frame_index', 'frame_timer', 'flip_x', 'loaded')
+PLATFORM_FIELDS = ('x', 'vx', 'loaded')
+
+HEAD_SIZE = len(PLAYER_FIELDS) + len(WORLD_FIELDS)
+(ENEMY_X, ENEMY_Y, ENEMY_VX, ENEMY_FRAME, ENEMY_TIMER, ENEMY_FLIP, ENEMY_LOADED) = range(len(ENEMY_FIELDS))
+PLATFORM_X, PLATFORM_VX, PLATFORM_LOADED = range(len(PLATFORM_FIELDS))
+ENEMY_WORDS = len(ENEMY_FIELDS)
+PLATFORM_WORDS = len(PLATFORM_FIELDS)
+
+
+class StateLayout:
+    def __init__(self, world):
+        self.world = world
+        streamer = world.streamer
+        if streamer is not None:
+            records = list(streamer.level.all_records())
+            enemy_keys = [record[0] for kind, record in records if kind == 'enemy']
+            platform_keys = [record[0] for kind, record in records if kind == 'moving']
+        else:
+            # Sem streaming as entidades da fase são as do World agora: a
+            # chave é o próprio objeto
+            enemy_keys = [id(enemy) for enemy in world.enemies]
+            platform_keys = [id(platform) for platform in world.moving_platforms]
+
+        # Chave da entidade na fase -> primeira palavra do bloco dela
+        self.enemy_blocks = {}
+        self.platform_blocks = {}
+        # id do objeto -> bloco, para as que não vieram da fase
+        self.dynamic_enemies = {}
+        self.dynamic_platforms = {}
+        # Posição da flag loaded de cada bloco, zeradas a cada captura
+        self._flags = []
+        self.flags = None
+        self.size = HEAD_SIZE
+        for key in enemy_keys:
+            self.enemy_blocks[key] = self._new_block(ENEMY_WORDS, ENEMY_LOADED)
+        for key in platform_keys:
+            self.platform_blocks[key] = self._new_block(PLATFORM_WORDS, PLATFORM_LOADED)
+        self.flags = np.array(self._flags, dtype=np.intp)
+
+        # Palavras do bloco de cada inimigo do lote (uma linha por inimigo)
+        # e início do bloco de cada plataforma de world.moving_platforms,
+        # refeitos quando world.entity_version muda
+        self.version = None
+        self.enemy_words = np.zeros((0, ENEMY_WORDS), dtype=np.intp)
+        self.platform_starts = []
+
+    def _new_block(self, words, flag):
+        start = self.size
+        self.size += words
+        self._flags.append(start + flag)
+        return start
+
+    @property
+    def has_dynamic(self):
+        return bool(self.dynamic_enemies or self.dynamic_platforms)
+
+    def new_record(self):
+        self.refresh()
+        return np.zeros(self.size)
+
+    def _block(self, obj, keys, blocks, dynamic, words, flag):
+        key = id(obj) if keys is None else keys.get(id(obj))
+        start = blocks.get(key)
+        if start is None:
+            start = dynamic.get(id(obj))
+            if start is None:
+                start = dynamic[id(obj)] = self._new_block(words, flag)
+        return start
+
+    def refresh(self):
+        world = self.world
+        if self.version == world.entity_version:
+            return
+        keys = None
+        if world.streamer is not None:
+            keys = {id(entry[0]): key for key, entry in world.streamer.entities.items()}
+        size = self.size
+        enemy_starts = [self._block(enemy, keys, self.enemy_blocks, self.dynamic_enemies, ENEMY_WORDS, ENEMY_LOADED)
+                        for enemy in world.enemies]
+        self.platform_starts = [self._block(platform, keys, self.platform_blocks, self.dynamic_platforms,
+                                            PLATFORM_WORDS, PLATFORM_LOADED)
+                                for platform in world.moving_platforms]
+        self.enemy_words = np.array(enemy_starts, dtype=np.intp).reshape(-1, 1) + np.arange(ENEMY_WORDS)
+        if self.size != size:
+            self.flags = np.array(self._flags, dtype=np.intp)
+        self.version = world.entity_version
+
+    # Posições no registro do cabeçalho e dos blocos das entidades carregadas
+    def watch(self):
+        platform_words = (np.array(self.platform_starts, dtype=np.intp).reshape(-1, 1)
+                          + np.arange(PLATFORM_WORDS))
+        return np.concatenate((np.arange(HEAD_SIZE), self.enemy_words.ravel(), platform_words.ravel()))
+
+
+# clear=False supõe que as flags loaded do registro já são as da última
+# captura e não varre o registro inteiro para zerá-las
+def capture(world, layout, record, clear=True):
+    layout.refresh()
+    player = world.player
+    record[:HEAD_SIZE] = (player.x, player.y, player.prev_x, player.prev_y, player.vy, player.dash_cooldown,
+                          player.grounded, player.can_double_jump, player.flip_x, player.current_frame_index,
+                          player.alive, player.jump_pressed,
+                          world.score, world.game_timer, OUTCOMES.index(world.outcome))
+
+    if clear:
+        record[layout.flags] = 0
+    batch = world.enemy_batch
+    words = layout.enemy_words
+    record[words[:, ENEMY_LOADED]] = 1
+    record[words[:, ENEMY_X]] = batch.x
+    record[words[:, ENEMY_Y]] = batch.y
+    record[words[:, ENEMY_VX]] = batch.vx
+    record[words[:, ENEMY_FRAME]] = batch.frame_index
+    record[words[:, ENEMY_TIMER]] = batch.frame_timer
+    record[words[:, ENEMY_FLIP]] = batch.flip_x
+
+    for platform, start in zip(world.moving_platforms, layout.platform_starts):
+        record[start:start + PLATFORM_WORDS] = (platform.x, platform.vx, 1)
+    return record
+
+
+def restore(world, layout, record):
+    player = world.player
+    (player.x, player.y, player.prev_x, player.prev_y, player.vy, player.dash_cooldown,
+     grounded, can_double_jump, flip_x, frame, alive, jump_pressed,
+     score, game_timer, outcome) = record[:HEAD_SIZE].tolist()
+    player.grounded = bool(grounded)
+    player.can_double_jump = bool(can_double_jump)
+    player.flip_x = bool(flip_x)
+    player.current_frame_index = int(frame)
+    player.alive = bool(alive)
+    player.jump_pressed = bool(jump_pressed)
+    player.hitbox.center = (player.x, player.y)
+    world.score = int(score)
+    world.game_timer = game_timer
+    world.outcome = OUTCOMES[int(outcome)]
+    world.pause_requested = False
+    world.events.clear()
+    world.effects.clear()
+
+    # Os chunks carregados dependem só de onde o jogador estava no começo do
+    # tick; o que entrar agora e não estava carregado na captura fica como
+    # acabou de ser criado, igual ao que o próximo tick faria
+    if world.streamer is not None:
+        world.streamer.update(player.prev_x, player.prev_y)
+    layout.refresh()
+    if len(record) < layout.size:
+        # Registro de antes de o layout crescer: os blocos novos não estavam
+        record = np.concatenate((record, np.zeros(layout.size - len(record))))
+
+    batch = world.enemy_batch
+    enemies = record[layout.enemy_words]
+    loaded = enemies[:, ENEMY_LOADED] > 0
+    np.copyto(batch.x, enemies[:, ENEMY_X], where=loaded)
+    np.copyto(batch.y, enemies[:, ENEMY_Y], where=loaded)
+    np.copyto(batch.vx, enemies[:, ENEMY_VX], where=loaded)
+    np.copyto(batch.frame_index, enemies[:, ENEMY_FRAME], where=loaded, casting='unsafe')
+    np.copyto(batch.frame_timer, enemies[:, ENEMY_TIMER], where=loaded)
+    np.copyto(batch.flip_x, enemies[:, ENEMY_FLIP], where=loaded, casting='unsafe')
+    batch.store_previous()
+
+    for platform, start in zip(world.moving_platforms, layout.platform_starts):
+        x, vx, platform_loaded = record[start:start + PLATFORM_WORDS].tolist()
+        if platform_loaded:
+            platform.x = platform.prev_x = x
+            platform.vx = vx
+            platform.rect.x = x
+            world.platform_index.update(platform, platform.rect)
+
+    world.camera.follow(player.pos)
+    world.sync_visible_enemies()
+
+
+class RewindBuffer:
+    def __init__(self, world, seconds=REWIND_SECONDS, pool_words=None):
+        self.world = world
+        self.layout = StateLayout(world)
+        self.max_ticks = int(seconds * SIM_HZ)
+        if pool_words is None:
+            pool_words = max(self.max_ticks * POOL_WORDS_PER_TICK, 4 * self.layout.size)
+
+        # Registro do último tick capturado e cópia para achar o que mudou
+        self.current = capture(world, self.layout, self.layout.new_record())
+        self._previous = self.current.copy()
+        self._changed = np.zeros(self.layout.size, dtype=bool)
+        # Enquanto as entidades carregadas não mudam, só as palavras delas e
+        # do cabeçalho podem mudar: a comparação fica só nessas posições
+        self._watch = None
+        self._version = None
+        # Snapshot do começo da partida, para o restart. Tirado no primeiro
+        # restart(), logo depois de um World.reset: é desse estado que os
+        # replays partem
+        self.initial = None
+
+        # Anel de deltas: posição da palavra e XOR dela
+        self.positions = np.zeros(pool_words, dtype=np.int32)
+        self.values = np.zeros(pool_words, dtype=np.uint64)
+        # Anel de ticks: onde começa (em palavras escritas desde o início) e
+        # quantas palavras tem o delta de cada um
+        self.tick_start = np.zeros(self.max_ticks, dtype=np.int64)
+        self.tick_words = np.zeros(self.max_ticks, dtype=np.int64)
+        self.first = 0
+        self.last = 0
+        self.written = 0
+
+    def __len__(self):
+        return self.last - self.first
+
+    @property
+    def seconds(self):
+        return len(self) / SIM_HZ
+
+    @property
+    def memory(self):
+        return (self.positions.nbytes + self.values.nbytes + self.tick_start.nbytes + self.tick_words.nbytes
+                + 2 * self.current.nbytes)
+
+    def clear(self):
+        self.layout.refresh()
+        self._fit()
+        capture(self.world, self.layout, self.current)
+        self._previous[:] = self.current
+        self._version = None
+        self.first = self.last = self.written = 0
+
+    # Snapshot avulso (bytes no layout fixo) e volta a ele
+    def snapshot(self):
+        return capture(self.world, self.layout, self.layout.new_record()).tobytes()
+
+    def restore(self, snapshot):
+        restore(self.world, self.layout, np.frombuffer(snapshot))
+        self.clear()
+
+    # Deixa o World como o World.reset(world.seed) deixaria
+    def restart(self):
+        world = self.world
+        layout = self.layout
+        layout.refresh()
+        if self.initial is not None and not layout.has_dynamic:
+            world.rng.seed(world.seed)
+            self.restore(self.initial)
+            return
+        # Sem snapshot ainda, ou com entidades que não vieram da fase (o
+        # estado inicial delas é o do reset de cada uma): reset campo a campo
+        world.reset()
+        self.clear()
+        if not layout.has_dynamic:
+            self.initial = self.snapshot()
+
+    # O layout cresceu (entidade nova fora da fase): as palavras novas
+    # começam zeradas, como se a entidade não estivesse carregada antes
+    def _fit(self):
+        extra = self.layout.size - len(self.current)
+        if extra > 0:
+            self.current = np.concatenate((self.current, np.zeros(extra)))
+            self._previous = np.concatenate((self._previous, np.zeros(extra)))
+            self._changed = np.zeros(self.layout.size, dtype=bool)
+
+    # Chamado depois de cada World.step
+    def capture(self):
+        layout = self.layout
+        layout.refresh()
+        self._fit()
+        current = self.current
+        watched = self._version == layout.version
+        capture(self.world, layout, current, clear=not watched)
+        words = current.view(np.uint64)
+        previous = self._previous.view(np.uint64)
+        if watched:
+            watch = self._watch
+            changed = watch[words[watch] != previous[watch]]
+        else:
+            # Entrou ou saiu entidade: compara o registro inteiro (as flags
+            # loaded foram refeitas) e recalcula as posições vigiadas
+            np.not_equal(words, previous, out=self._changed)
+            changed = np.flatnonzero(self._changed)
+            self._watch = layout.watch()
+            self._version = layout.version
+        values = words[changed]
+        xor = values ^ previous[changed]
+        previous[changed] = values
+        self._push(changed, xor)
+
+    def _push(self, changed, xor):
+        count = len(changed)
+        pool = len(self.positions)
+        if count > pool:
+            # Um tick maior que o anel inteiro: não dá para voltar além dele
+            self.first = self.last = self.written = 0
+            return
+        max_ticks = self.max_ticks
+        while self.last > self.first and (self.last - self.first >= max_ticks or
+                                          self.written + count - self.tick_start[self.first % max_ticks] > pool):
+            self.first += 1
+
+        start = self.written % pool
+        head = min(count, pool - start)
+        self.positions[start:start + head] = changed[:head]
+        self.values[start:start + head] = xor[:head]
+        self.positions[:count - head] = changed[head:]
+        self.values[:count - head] = xor[head:]
+
+        i = self.last % max_ticks
+        self.tick_start[i] = self.written
+        self.tick_words[i] = count
+        self.written += count
+        self.last += 1
+
+    # Volta até ticks ticks (menos, se não houver tantos guardados) e
+    # restaura o World; devolve quantos voltou
+    def rewind(self, ticks=1):
+        words = self.current.view(np.uint64)
+        previous = self._previous.view(np.uint64)
+        pool = len(self.positions)
+        done = 0
+        while done < ticks and self.last > self.first:
+            self.last -= 1
+            i = self.last % self.max_ticks
+            start = self.tick_start[i]
+            count = self.tick_words[i]
+            idx = (start + np.arange(count)) % pool
+            positions = self.positions[idx]
+            values = self.values[idx]
+            # _previous é igual a current entre capturas: volta junto
+            words[positions] ^= values
+            previous[positions] ^= values
+            self.written = start
+            done += 1
+        if done:
+            self._version = None
+            restore(self.world, self.layout, self.current)
+        return done
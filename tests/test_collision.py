@@ -0,0 +1,48 @@
+from pygame import Rect
+
+from engine import World, Input, Platform, SlimeEnemy, NO_INPUT, SIM_DT, SPEED, SPRITE_SIZE
+
+
+def test_fast_fall_lands_on_thin_platform():
+    world = World(empty=True)
+    platform = Platform(Rect(0, 400, 300, 2))
+    world.add_platform(platform)
+    player = world.player
+    # 50 px por tick, muito mais que a espessura da plataforma
+    player.vy = 6000
+    for _ in range(20):
+        world.step(NO_INPUT, SIM_DT)
+        if player.grounded:
+            break
+    assert player.grounded
+    assert player.hitbox.bottom == platform.rect.top
+
+
+def test_long_step_lands_on_thin_platform():
+    world = World(empty=True)
+    platform = Platform(Rect(0, 400, 300, 2))
+    world.add_platform(platform)
+    player = world.player
+    # Um passo só, de 0.5 s: a posição final fica bem abaixo da plataforma
+    world.step(NO_INPUT, 0.5)
+    assert player.grounded
+    assert player.hitbox.bottom == platform.rect.top
+
+
+def test_long_step_does_not_skip_an_enemy():
+    world = World(empty=True)
+    world.add_platform(Platform(Rect(0, 400, 2000, 20)))
+    player = world.player
+    player.x = player.prev_x = 100
+    player.y = player.prev_y = 400 - 15
+    player.hitbox.center = (player.x, player.y)
+    enemy_x = 100 + SPEED * 0.25
+    world.add_enemy(SlimeEnemy(['slime1'], 0.25, (enemy_x, player.y), 0, enemy_x, enemy_x))
+
+    # O passo leva o jogador para além do inimigo, sem sobrepor a posição final
+    dt = 0.5
+    assert SPEED * dt > SPEED * 0.25 + SPRITE_SIZE
+    world.step(Input(right=True), dt)
+    assert not player.hitbox.colliderect(Rect(enemy_x - SPRITE_SIZE / 2, player.y - SPRITE_SIZE / 2,
+                                              SPRITE_SIZE, SPRITE_SIZE))
+    assert world.outcome == 'gameover'
@@ -0,0 +1,86 @@
+import os
+
+from leaderboard import ENTRY, LOG_HEADER, Leaderboard
+
+
+def record(directory, scores, name='x'):
+    board = Leaderboard(name, directory=str(directory))
+    for n, score in enumerate(scores):
+        board.add(score, 1.0, n + 1)
+    board.close()
+    return board
+
+
+def test_torn_entry_is_dropped_and_truncated(tmp_path):
+    record(tmp_path, [5, 4, 3])
+    log = tmp_path / 'x.log'
+    os.remove(tmp_path / 'x.top')
+    # O jogo fechou no meio do write do quarto registro
+    with open(log, 'ab') as f:
+        f.write(ENTRY.pack(9, 1.0, 4)[:7])
+
+    board = Leaderboard('x', directory=str(tmp_path))
+    assert [entry[0] for entry in board.entries] == [5, 4, 3]
+    board.add(2, 1.0, 5)
+    board.flush()
+    # O pedaço cortado sai antes do append, sem virar um registro estranho
+    assert log.stat().st_size == LOG_HEADER.size + 4 * ENTRY.size
+    board.close()
+
+    assert [entry[0] for entry in Leaderboard('x', directory=str(tmp_path)).entries] == [5, 4, 3, 2]
+
+
+def test_stale_or_corrupt_top_rereads_log(tmp_path):
+    record(tmp_path, [5, 4, 3])
+    top = tmp_path / 'x.top'
+    stale = top.read_bytes()
+    record(tmp_path, [8, 1])
+
+    # .top de antes das duas últimas partidas, mas apontando além do .log
+    log = tmp_path / 'x.log'
+    data = log.read_bytes()
+    log.write_bytes(data[:LOG_HEADER.size + 2 * ENTRY.size])
+    top.write_bytes(stale)
+    assert [entry[0] for entry in Leaderboard('x', directory=str(tmp_path)).entries] == [5, 4]
+
+    # .top com lixo: o .log inteiro é relido
+    log.write_bytes(data)
+    top.write_bytes(b'lixo')
+    assert [entry[0] for entry in Leaderboard('x', directory=str(tmp_path)).entries] == [8, 5, 4, 3, 1]
+
+
+def test_unknown_log_format_is_set_aside(tmp_path):
+    record(tmp_path, [1, 2, 3, 4, 5])
+    log = tmp_path / 'x.log'
+    original = log.read_bytes()
+    assert len(original) == LOG_HEADER.size + 5 * ENTRY.size
+    log.write_bytes(b'\0\0\0\0' + original[4:])
+    os.remove(tmp_path / 'x.top')
+
+    record(tmp_path, [1])
+    # O arquivo antigo fica guardado inteiro e o novo só tem a partida nova
+    assert (tmp_path / 'x.log.bad').read_bytes() == b'\0\0\0\0' + original[4:]
+    assert log.stat().st_size == LOG_HEADER.size + ENTRY.size
+
+
+def test_unreadable_log_is_left_untouched(tmp_path, monkeypatch):
+    record(tmp_path, [1, 2, 3])
+    log = tmp_path / 'x.log'
+    original = log.read_bytes()
+    os.remove(tmp_path / 'x.top')
+
+    real_open = open
+
+    def denied(path, *args, **kwargs):
+        if str(path).endswith('.log'):
+            raise PermissionError(13, 'Permission denied', str(path))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr('builtins.open', denied)
+    board = Leaderboard('x', directory=str(tmp_path))
+    monkeypatch.undo()
+    # Passou a dar para abrir, mas esta sessão continua sem gravar
+    board.add(9, 1.0, 1)
+    board.close()
+    assert log.read_bytes() == original
+    assert not (tmp_path / 'x.log.bad').exists()
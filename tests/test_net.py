@@ -0,0 +1,89 @@
+import socket
+
+import numpy as np
+
+from engine import Input, SIM_DT, SIM_MARGIN
+from level import load_world
+from net import (GhostServer, Snapshot, capture, look, newer_run, HELLO, HELLO_PACKET, INPUT, INPUT_PACKET,
+                 MAGIC)
+from replay import pack_input
+
+
+def assert_same(a, b):
+    for name in ('run', 'seq', 'tick', 'score', 'grounded', 'can_double_jump', 'outcome'):
+        assert getattr(a, name) == getattr(b, name)
+    assert abs(a.game_timer - b.game_timer) <= 0.0005
+    assert abs(a.dash_cooldown - b.dash_cooldown) <= 0.0005
+    assert a.sections.keys() == b.sections.keys()
+    for name, (ids, values) in a.sections.items():
+        other_ids, other_values = b.sections[name]
+        assert np.array_equal(ids, other_ids)
+        assert np.array_equal(values, other_values)
+
+
+def snapshots(ticks=(30, 60)):
+    world = load_world()
+    world.sim_margin = SIM_MARGIN
+    world.reset()
+    result = []
+    for tick in range(max(ticks) + 1):
+        world.step(Input(right=True, jump=tick % 40 < 3), SIM_DT)
+        if tick in ticks:
+            player = world.player
+            ghosts = [(0, player.x, player.y, look(player.current_frame_index, player.flip_x)),
+                      (7, 123.5, 456.25, 3)]
+            result.append(capture(world, ghosts, run=1, seq=len(result) + 1, tick=tick))
+    world.close()
+    return result
+
+
+def test_snapshot_round_trip_full_and_delta():
+    first, second = snapshots()
+
+    decoded_first = Snapshot.decode(first.encode(), {})
+    assert_same(decoded_first, first)
+
+    delta = second.encode(first)
+    assert len(delta) < len(second.encode())
+    assert_same(Snapshot.decode(delta, {first.seq: decoded_first}), second)
+
+    # Sem a base o pacote não é decodificado
+    assert Snapshot.decode(delta, {}) is None
+
+
+def test_newer_run_wraps_around():
+    assert newer_run(1, 0)
+    assert newer_run(0, 255)
+    assert not newer_run(0, 1)
+    assert not newer_run(255, 0)
+    assert not newer_run(5, 5)
+
+
+def test_server_ignores_inputs_from_an_older_run():
+    server = GhostServer(port=0)
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.bind(('127.0.0.1', 0))
+    address = client.getsockname()
+    try:
+        server.on_hello(HELLO_PACKET.pack(MAGIC, HELLO, server.level_crc), address)
+        remote = server.players[address]
+
+        def send(run, ticks):
+            bits = bytes([pack_input(Input(right=True))] * ticks)
+            server.on_input(INPUT_PACKET.pack(MAGIC, INPUT, run, ticks - 1, 0, ticks) + bits, remote)
+
+        send(1, 20)
+        assert (remote.run, remote.next_tick) == (1, 20)
+        x = remote.world.player.x
+
+        # Atrasado, da partida anterior: não reinicia nem simula nada
+        send(0, 5)
+        assert (remote.run, remote.next_tick) == (1, 20)
+        assert remote.world.player.x == x
+
+        # Partida nova de verdade
+        send(2, 5)
+        assert (remote.run, remote.next_tick) == (2, 5)
+    finally:
+        client.close()
+        server.close()
@@ -0,0 +1,321 @@
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from engine import World, SIM_DT
+from level import load_world
+from replay import INPUTS, INPUT_BITS, OUTCOMES
+
+# AMBIENTES VETORIZADOS PARA BOTS
+#
+# API no estilo gym sobre o World, sem janela: reset() devolve (obs, info) e
+# step(actions) devolve (obs, reward, terminated, truncated, info) para N
+# partidas de uma vez. VectorEnv roda todas no processo atual;
+# ProcessVectorEnv divide as partidas entre processos. Nos dois casos as
+# saídas são arrays NumPy pré-alocados (no ProcessVectorEnv, em memória
+# compartilhada, escritos direto pelos processos), então o custo por passo é
+# só a simulação. Os arrays devolvidos são sempre os mesmos buffers: copie o
+# que precisar guardar antes do próximo step().
+#
+# Ação: inteiro de 0 a NUM_ACTIONS - 1 com os bits de INPUT_BITS (sem pausa).
+# Cada step() avança frame_skip ticks de sim_dt segundos com a mesma ação; a
+# colisão do jogador é contínua, então dá para trocar ticks por ticks maiores
+# (frame_skip=1, sim_dt=4 * SIM_DT) e simular mais rápido. Recompensa: quanto o
+# score subiu no passo. Partidas que terminam (gameover/win) ou passam de
+# max_steps recomeçam sozinhas; info['score'] e info['outcome'] guardam como
+# a partida terminou e obs já é o começo da seguinte.
+
+# Sem o bit de pausa
+NUM_ACTIONS = 1 << (len(INPUT_BITS) - 1)
+ACTION_BITS = INPUT_BITS[:-1]
+
+# Observação: jogador, objetivo e os MAX_ENEMIES inimigos mais próximos
+# (posição relativa ao jogador; present = 0 nas vagas sem inimigo)
+PLAYER_FIELDS = ('player_x', 'player_y', 'player_vy', 'grounded', 'can_double_jump', 'dash_ready',
+                 'goal_x', 'goal_y')
+ENEMY_FIELDS = ('dx', 'dy', 'present')
+MAX_ENEMIES = 8
+
+FRAME_SKIP = 4
+MAX_EPISODE_SECONDS = 60
+
+
+def obs_size(max_enemies=MAX_ENEMIES):
+    return len(PLAYER_FIELDS) + len(ENEMY_FIELDS) * max_enemies
+
+
+def make_world(level=None, seed=0):
+    world = World() if level is None else load_world(level)
+    world.reset(seed)
+    return world
+
+
+# BUFFERS
+
+
+def _layout(num_envs, max_enemies):
+    return (
+        ('actions', np.uint8, (num_envs,)),
+        ('obs', np.float32, (num_envs, obs_size(max_enemies))),
+        ('reward', np.float32, (num_envs,)),
+        ('terminated', np.bool_, (num_envs,)),
+        ('truncated', np.bool_, (num_envs,)),
+        ('score', np.int32, (num_envs,)),
+        ('outcome', np.int8, (num_envs,)),
+    )
+
+
+def _buffers_size(layout):
+    size = 0
+    for _, dtype, shape in layout:
+        size += -size % 8 + int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return size
+
+
+# Com buffer=None aloca arrays normais; senão cria views dentro do buffer
+def _buffers(layout, buffer=None):
+    arrays = {}
+    offset = 0
+    for name, dtype, shape in layout:
+        offset += -offset % 8
+        if buffer is None:
+            arrays[name] = np.zeros(shape, dtype=dtype)
+        else:
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return arrays
+
+
+# LOTE DE PARTIDAS
+
+
+class EnvBatch:
+    # Roda uma fatia das partidas escrevendo nas fatias correspondentes dos
+    # buffers; é o que VectorEnv usa direto e cada processo do
+    # ProcessVectorEnv usa para a sua parte
+    def __init__(self, levels, seeds, buffers, frame_skip=FRAME_SKIP, max_steps=None, max_enemies=MAX_ENEMIES,
+                 sim_dt=SIM_DT):
+        self.worlds = [make_world(level, seed) for level, seed in zip(levels, seeds)]
+        self.buffers = buffers
+        self.frame_skip = frame_skip
+        self.sim_dt = sim_dt
+        if max_steps is None:
+            max_steps = round(MAX_EPISODE_SECONDS / (frame_skip * sim_dt))
+        self.max_steps = max_steps
+        self.max_enemies = max_enemies
+        self.steps = [0] * len(self.worlds)
+
+    def reset(self):
+        buffers = self.buffers
+        for i, world in enumerate(self.worlds):
+            world.reset()
+            self.steps[i] = 0
+            self.observe(i, world)
+        buffers['reward'][:] = 0
+        buffers['terminated'][:] = False
+        buffers['truncated'][:] = False
+        buffers['score'][:] = 0
+        buffers['outcome'][:] = 0
+
+    def step(self):
+        buffers = self.buffers
+        actions = buffers['actions'].tolist()
+        reward = buffers['reward']
+        terminated = buffers['terminated']
+        truncated = buffers['truncated']
+        score = buffers['score']
+        outcome = buffers['outcome']
+        frame_skip = self.frame_skip
+        sim_dt = self.sim_dt
+        steps = self.steps
+
+        for i, world in enumerate(self.worlds):
+            inp = INPUTS[actions[i] % NUM_ACTIONS]
+            before = world.score
+            for _ in range(frame_skip):
+                world.step(inp, sim_dt)
+                if world.outcome:
+                    break
+
+            steps[i] += 1
+            reward[i] = world.score - before
+            score[i] = world.score
+            outcome[i] = OUTCOMES.index(world.outcome)
+            ended = world.outcome is not None
+            terminated[i] = ended
+            truncated[i] = not ended and steps[i] >= self.max_steps
+            if ended or truncated[i]:
+                world.reset()
+                steps[i] = 0
+            self.observe(i, world)
+
+    def observe(self, i, world):
+        obs = self.buffers['obs'][i]
+        player = world.player
+        obs[0] = player.x
+        obs[1] = player.y
+        obs[2] = player.vy
+        obs[3] = player.grounded
+        obs[4] = player.can_double_jump
+        obs[5] = player.dash_cooldown <= 0
+        obs[6], obs[7] = world.goal.center
+
+        enemies = obs[len(PLAYER_FIELDS):].reshape(self.max_enemies, len(ENEMY_FIELDS))
+        enemies[:] = 0
+        batch = world.enemy_batch
+        if not batch.count:
+            return
+
+        dx = batch.x - player.x
+        dy = batch.y - player.y
+        dist = dx * dx + dy * dy
+        count = min(self.max_enemies, batch.count)
+        if count < batch.count:
+            nearest = np.argpartition(dist, count - 1)[:count]
+            nearest = nearest[np.argsort(dist[nearest])]
+        else:
+            nearest = np.argsort(dist)
+        enemies[:count, 0] = dx[nearest]
+        enemies[:count, 1] = dy[nearest]
+        enemies[:count, 2] = 1
+
+    def close(self):
+        for world in self.worlds:
+            world.close()
+        self.worlds = []
+
+
+def _env_config(num_envs, levels, seed):
+    if not levels:
+        levels = [None]
+    return [levels[i % len(levels)] for i in range(num_envs)], [seed + i for i in range(num_envs)]
+
+
+class VectorEnv:
+    # levels: caminhos de .lvl distribuídos entre as partidas em rodízio
+    # (None = fase padrão do engine); a partida i usa seed + i
+    def __init__(self, num_envs, levels=None, seed=0, frame_skip=FRAME_SKIP, max_steps=None,
+                 max_enemies=MAX_ENEMIES, sim_dt=SIM_DT):
+        self.num_envs = num_envs
+        level_list, seeds = _env_config(num_envs, levels, seed)
+        self.buffers = _buffers(_layout(num_envs, max_enemies))
+        self.batch = EnvBatch(level_list, seeds, self.buffers, frame_skip, max_steps, max_enemies, sim_dt)
+
+    def reset(self):
+        self.batch.reset()
+        return self.buffers['obs'], self.info()
+
+    def step(self, actions):
+        buffers = self.buffers
+        buffers['actions'][:] = actions
+        self.batch.step()
+        return buffers['obs'], buffers['reward'], buffers['terminated'], buffers['truncated'], self.info()
+
+    def info(self):
+        return {'score': self.buffers['score'], 'outcome': self.buffers['outcome']}
+
+    def close(self):
+        self.batch.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# PROCESSOS
+
+
+def _worker(conn, shm_name, num_envs, start, stop, levels, seeds, frame_skip, max_steps, max_enemies, sim_dt):
+    # Quem cria e apaga o bloco é o processo principal (os filhos usam o
+    # mesmo resource_tracker dele, então não é preciso desregistrar aqui)
+    shm = SharedMemory(name=shm_name)
+
+    buffers = _buffers(_layout(num_envs, max_enemies), shm.buf)
+    batch = EnvBatch(levels, seeds, {name: array[start:stop] for name, array in buffers.items()},
+                     frame_skip, max_steps, max_enemies, sim_dt)
+    conn.send('ok')
+    try:
+        while True:
+            command = conn.recv()
+            if command == 'step':
+                batch.step()
+            elif command == 'reset':
+                batch.reset()
+            else:
+                break
+            conn.send('ok')
+    finally:
+        batch.close()
+        # As views precisam sumir antes de fechar o bloco
+        del batch, buffers
+        shm.close()
+
+
+class ProcessVectorEnv(VectorEnv):
+    def __init__(self, num_envs, levels=None, seed=0, frame_skip=FRAME_SKIP, max_steps=None,
+                 max_enemies=MAX_ENEMIES, sim_dt=SIM_DT, num_workers=None):
+        self.num_envs = num_envs
+        num_workers = min(num_envs, num_workers or multiprocessing.cpu_count())
+        level_list, seeds = _env_config(num_envs, levels, seed)
+
+        layout = _layout(num_envs, max_enemies)
+        self.shm = SharedMemory(create=True, size=_buffers_size(layout))
+        self.buffers = _buffers(layout, self.shm.buf)
+        self.batch = None
+
+        self.workers = []
+        self.conns = []
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int).tolist()
+        for start, stop in zip(bounds, bounds[1:]):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker, daemon=True,
+                args=(child, self.shm.name, num_envs, start, stop, level_list[start:stop], seeds[start:stop],
+                      frame_skip, max_steps, max_enemies, sim_dt))
+            process.start()
+            child.close()
+            self.workers.append(process)
+            self.conns.append(parent)
+        self._wait()
+
+    def _broadcast(self, command):
+        for conn in self.conns:
+            conn.send(command)
+        self._wait()
+
+    def _wait(self):
+        for conn in self.conns:
+            conn.recv()
+
+    def reset(self):
+        self._broadcast('reset')
+        return self.buffers['obs'], self.info()
+
+    def step(self, actions):
+        buffers = self.buffers
+        buffers['actions'][:] = actions
+        self._broadcast('step')
+        return buffers['obs'], buffers['reward'], buffers['terminated'], buffers['truncated'], self.info()
+
+    def close(self):
+        if self.shm is None:
+            return
+        for conn in self.conns:
+            try:
+                conn.send('close')
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self.conns:
+            conn.close()
+
+        self.buffers = None
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None